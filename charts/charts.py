@@ -1,10 +1,21 @@
 # charts/charts.py
 
-import numpy as np
 import logging
 from utils.utils import get_cur_location
 from datetime import datetime
-from matplotlib import pyplot as plt
+
+# matplotlib and NumPy take most of the start-up time, they are imported by load_plotting() on the first chart
+plt = None
+np = None
+
+
+# Function: Import pyplot and NumPy on first use
+def load_plotting():
+    global plt, np
+    if plt is None:
+        from matplotlib import pyplot as plt
+    if np is None:
+        import numpy as np
 
 
 # Class:: Generate and manage charts.
@@ -44,6 +55,7 @@ class ChartGenerator:
 
     # Chart Function: generate a bar chart.
     def gen_chart(self, data, labels, chart_title, xlabel, ylabel, export=False):
+        load_plotting()
         fig, ax = plt.subplots()
         ax.bar(labels, data)
         ax.set_title(chart_title)
@@ -60,16 +72,7 @@ class ChartGenerator:
 
     # Chart Function: generate a bar chart of top-selling products.
     def gen_bar_chart_top_selling_products(self, export=False):
-        product_sales = {}
-        for order in self.order_manager.get_all_orders():
-            for op in order.order_products:
-                if isinstance(op, dict):
-                    product_name = op['product_name']
-                    quantity = int(op['quantity'])
-                else:
-                    product_name = op.product_name
-                    quantity = int(op.quantity)
-                product_sales[product_name] = product_sales.get(product_name, 0) + quantity
+        product_sales = self.order_manager.get_units_sold_by_product_name()
 
         if not product_sales:
             logging.info("No sales data available.")
@@ -88,10 +91,7 @@ class ChartGenerator:
 
     # Chart Function: generate a bar chart of customer location distribution.
     def gen_customer_location_distribution_chart(self, export=False):
-        city_counts = {}
-        for customer in self.customer_manager.get_all_customers():
-            city = customer.city
-            city_counts[city] = city_counts.get(city, 0) + 1
+        city_counts = self.customer_manager.get_customer_count_by_city()
 
         if not city_counts:
             logging.info("No customer location data available.")
@@ -129,6 +129,7 @@ class ChartGenerator:
             return
 
         # Create bins/ranges of ages
+        load_plotting()
         counts, bins = np.histogram(ages, bins=10)
         labels = [f"{int(bins[i])}-{int(bins[i + 1])}" for i in range(len(bins) - 1)]
 
@@ -0,0 +1,75 @@
+# controllers/aggregates.py
+
+
+# Function: Money amount to whole cents, so running totals add up exactly whatever the order of updates
+def to_cents(amount):
+    return round(float(amount) * 100)
+
+
+# Function: Add `delta` to a counter, dropping the key once nothing refers to it any more
+def add_count(counts, key, delta):
+    count = counts.get(key, 0) + delta
+    if count:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
+
+
+# Class:: Running sales totals over a set of orders, updated with deltas as orders come and go
+class SalesAggregates:
+    def __init__(self, product_key):
+        self.product_key = product_key
+        self.order_count = 0
+        self.total_cents = 0
+        # product ID / product name -> units, line revenue (cents) and number of lines
+        self.units_by_product = {}
+        self.revenue_by_product = {}
+        self.lines_by_product = {}
+        self.units_by_product_name = {}
+        self.lines_by_product_name = {}
+
+    # Update: count orders in (sign=1) or out (sign=-1)
+    def apply(self, orders, sign=1):
+        for order in orders:
+            self.order_count += sign
+            self.total_cents += sign * to_cents(order.total_price)
+            for op in order.order_products:
+                product_key = self.product_key(op.product_id)
+                # Keys are only created or dropped by the line counters, the others follow them
+                add_count(self.lines_by_product, product_key, sign)
+                add_count(self.lines_by_product_name, op.product_name, sign)
+                if product_key in self.lines_by_product:
+                    self.units_by_product[product_key] = self.units_by_product.get(product_key, 0) + sign * op.quantity
+                    self.revenue_by_product[product_key] = (self.revenue_by_product.get(product_key, 0)
+                                                            + sign * to_cents(op.total_price))
+                else:
+                    self.units_by_product.pop(product_key, None)
+                    self.revenue_by_product.pop(product_key, None)
+                if op.product_name in self.lines_by_product_name:
+                    self.units_by_product_name[op.product_name] = (self.units_by_product_name.get(op.product_name, 0)
+                                                                   + sign * op.quantity)
+                else:
+                    self.units_by_product_name.pop(op.product_name, None)
+
+    # Create: orders added
+    def add_orders(self, orders):
+        self.apply(orders, 1)
+
+    # Delete: an order removed
+    def remove_order(self, order):
+        self.apply([order], -1)
+
+    # Read: the totals as comparable values (dicts compare without regard to order)
+    def state(self):
+        return {
+            'order_count': self.order_count,
+            'total_cents': self.total_cents,
+            'units_by_product': self.units_by_product,
+            'revenue_by_product': self.revenue_by_product,
+            'units_by_product_name': self.units_by_product_name,
+        }
+
+    # Read: names of the totals that differ from another SalesAggregates
+    def differences(self, other):
+        other_state = other.state()
+        return [name for name, value in self.state().items() if value != other_state[name]]
@@ -0,0 +1,102 @@
+# controllers/change_feed.py
+
+from collections import deque
+from itertools import islice
+import logging
+import threading
+
+
+# Class:: One change to a record: the data version it produced, the record's key and the record before and
+# after the change (None before a creation / after a deletion)
+class ChangeEvent:
+    __slots__ = ('version', 'entity', 'action', 'key', 'before', 'after')
+
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    # A product's stock fell below ProductController.LOW_STOCK_THRESHOLD (published after its update)
+    LOW_STOCK = 'low_stock'
+
+    def __init__(self, version, entity, action, key, before, after):
+        self.version = version
+        self.entity = entity
+        self.action = action
+        self.key = key
+        self.before = before
+        self.after = after
+
+    def __repr__(self):
+        return f"ChangeEvent({self.version}, {self.entity!r}, {self.action!r}, {self.key!r})"
+
+
+# Class:: Publish the controllers' changes to subscribers, numbered by a data version that only goes up.
+# Subscribers run on the writing thread while the change is applied, so they must be quick and must not call
+# back into the controllers (the event carries the records they need)
+class ChangeFeed:
+    # Number of recent events kept for changes_since()
+    HISTORY_SIZE = 10000
+
+    def __init__(self, history_size=HISTORY_SIZE):
+        self.data_version = 0
+        # (callback, entities or None for every entity)
+        self.subscribers = ()
+        self.history = deque(maxlen=history_size)
+        # Held while an event is numbered and delivered, so every subscriber sees the events in version order
+        self.lock = threading.RLock()
+
+    # Create: Call `callback(event)` for every change to the given entities ('customer', 'product', 'order';
+    # None for all of them). Returns the callback, for unsubscribe()
+    def subscribe(self, callback, entities=None):
+        with self.lock:
+            self.subscribers += ((callback, None if entities is None else frozenset(entities)),)
+        return callback
+
+    # Delete: Stop calling a callback
+    def unsubscribe(self, callback):
+        with self.lock:
+            self.subscribers = tuple(entry for entry in self.subscribers if entry[0] is not callback)
+
+    # Update: Publish a change to one record
+    def publish(self, entity, key, before, after, action=None):
+        self.publish_many(entity, ((key, before, after),), action)
+
+    # Update: Publish changes (key, before, after) to records of one entity, e.g. a bulk insert. The action
+    # follows from before/after unless given
+    def publish_many(self, entity, changes, action=None):
+        with self.lock:
+            for key, before, after in changes:
+                if before is None and after is None:
+                    continue
+                if action is not None:
+                    event_action = action
+                elif before is None:
+                    event_action = ChangeEvent.CREATED
+                elif after is None:
+                    event_action = ChangeEvent.DELETED
+                else:
+                    event_action = ChangeEvent.UPDATED
+                self.data_version += 1
+                event = ChangeEvent(self.data_version, entity, event_action, key, before, after)
+                self.history.append(event)
+                for callback, entities in self.subscribers:
+                    if entities is None or entity in entities:
+                        self.deliver(callback, event)
+
+    # Update: Call one subscriber, a failing subscriber must not fail the write
+    @staticmethod
+    def deliver(callback, event):
+        try:
+            callback(event)
+        except Exception as e:
+            logging.error(f"Change subscriber {callback!r} failed on {event!r} - {str(e)}")
+
+    # Read: The events after a data version, oldest first. None when some of them are no longer kept (the
+    # consumer has to start over from the full data)
+    def changes_since(self, version):
+        with self.lock:
+            if version >= self.data_version:
+                return []
+            if not self.history or self.history[0].version > version + 1:
+                return None
+            # Versions in the history are consecutive
+            return list(islice(self.history, version + 1 - self.history[0].version, None))
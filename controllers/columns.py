@@ -0,0 +1,225 @@
+# controllers/columns.py
+
+from datetime import date
+import numpy as np
+from controllers.date_index import NO_DATE, parse_order_date
+
+
+# Class:: Dictionary-encode repeated values (emails, product IDs, names) into small integer codes
+class CodeBook:
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    # Read: code for a value, adding it on first sight
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    # Read: code for a value without adding it, -1 when unknown
+    def lookup(self, value):
+        return self.codes.get(value, -1)
+
+
+# Class:: Growable set of equally sized NumPy columns with a validity mask
+class ColumnBlock:
+    def __init__(self, dtypes, capacity=1024):
+        self.dtypes = dtypes
+        self.size = 0
+        self.live = 0
+        self.valid = np.zeros(capacity, dtype=bool)
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in dtypes.items()}
+
+    # Read: a live view of a column, trimmed to the rows in use
+    def __getitem__(self, name):
+        return self.columns[name][:self.size]
+
+    # Read: the validity mask, trimmed to the rows in use
+    def mask(self):
+        return self.valid[:self.size]
+
+    # Create: append rows given as equally long sequences per column, return the first row number
+    def append(self, values):
+        count = len(next(iter(values.values())))
+        start = self.size
+        if start + count > len(self.valid):
+            self.grow(start + count)
+        for name, column_values in values.items():
+            self.columns[name][start:start + count] = column_values
+        self.valid[start:start + count] = True
+        self.size += count
+        self.live += count
+        return start
+
+    # Update: double the capacity until `needed` rows fit
+    def grow(self, needed):
+        capacity = max(len(self.valid), 1)
+        while capacity < needed:
+            capacity *= 2
+        self.valid = np.resize(self.valid, capacity)
+        self.valid[self.size:] = False
+        for name, column in self.columns.items():
+            self.columns[name] = np.resize(column, capacity)
+
+    # Delete: mark rows start..stop as removed
+    def discard(self, start, stop):
+        self.live -= int(self.valid[start:stop].sum())
+        self.valid[start:stop] = False
+
+    # Update: drop removed rows, return the old row number of each kept row
+    def compact(self):
+        kept = np.flatnonzero(self.mask())
+        for name, column in self.columns.items():
+            column[:len(kept)] = column[kept]
+        self.valid[:len(kept)] = True
+        self.valid[len(kept):] = False
+        self.size = self.live = len(kept)
+        return kept
+
+
+# Class:: Columnar (NumPy) copy of the orders held by an OrderController, used for analytics
+class OrderColumns:
+    NO_DATE = np.datetime64('NaT', 'D')
+    # Day ordinal of 1970-01-01, where datetime64 days count from
+    EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+    def __init__(self):
+        self.customers = CodeBook()
+        self.products = CodeBook()
+        self.product_names = CodeBook()
+        self.orders = ColumnBlock({
+            'total_price': np.float64,
+            'order_date': 'datetime64[D]',
+            'customer': np.int64,
+            'first_line': np.int64,
+            'line_count': np.int64,
+        })
+        self.lines = ColumnBlock({
+            'order': np.int64,
+            'product': np.int64,
+            'product_name': np.int64,
+            'quantity': np.int64,
+            'price_per_unit': np.float64,
+            'total_price': np.float64,
+        })
+        # order ID -> order row
+        self.rows = {}
+        # Order date -> day ordinal, see parse_order_date()
+        self.parsed_dates = {}
+
+    # Read: number of live orders
+    def __len__(self):
+        return self.orders.live
+
+    # Transfer: order dates (DD-MM-YYYY) to datetime64, NaT when invalid
+    def parse_dates(self, order_dates):
+        ordinals = np.fromiter((parse_order_date(order_date, self.parsed_dates) for order_date in order_dates),
+                               dtype=np.int64)
+        days = (ordinals - self.EPOCH_ORDINAL).astype('datetime64[D]')
+        days[ordinals == NO_DATE] = self.NO_DATE
+        return days
+
+    # Create: append an order and its lines
+    def add_order(self, order):
+        self.add_orders([order])
+
+    # Create: append many orders and their lines in one pass (the last one wins for a repeated ID)
+    def add_orders(self, orders):
+        orders = list({order.order_id: order for order in orders}.values())
+        if not orders:
+            return
+        for order in orders:
+            if order.order_id in self.rows:
+                self.remove_order(order.order_id)
+        line_counts = np.fromiter(
+            (len(order.order_products) for order in orders), dtype=np.int64, count=len(orders))
+        first_lines = self.lines.size + np.cumsum(line_counts) - line_counts
+        row = self.orders.append({
+            'total_price': [order.total_price for order in orders],
+            'order_date': self.parse_dates(order.order_date for order in orders),
+            'customer': [self.customers.encode(order.customer_email) for order in orders],
+            'first_line': first_lines,
+            'line_count': line_counts,
+        })
+        order_products = [op for order in orders for op in order.order_products]
+        if order_products:
+            self.lines.append({
+                'order': np.repeat(np.arange(row, row + len(orders)), line_counts),
+                'product': [self.products.encode(str(op.product_id).strip()) for op in order_products],
+                'product_name': [self.product_names.encode(op.product_name) for op in order_products],
+                'quantity': [op.quantity for op in order_products],
+                'price_per_unit': [op.price_per_unit for op in order_products],
+                'total_price': [op.total_price for op in order_products],
+            })
+        self.rows.update(zip((order.order_id for order in orders), range(row, row + len(orders))))
+
+    # Delete: remove an order and its lines
+    def remove_order(self, order_id):
+        row = self.rows.pop(order_id, None)
+        if row is None:
+            return
+        first_line = int(self.orders['first_line'][row])
+        self.lines.discard(first_line, first_line + int(self.orders['line_count'][row]))
+        self.orders.discard(row, row + 1)
+        if self.orders.size > 1024 and self.orders.live < self.orders.size // 2:
+            self.compact()
+
+    # Update: drop removed rows and renumber the remaining ones
+    def compact(self):
+        kept_lines = self.lines.compact()
+        kept_orders = self.orders.compact()
+        new_order_row = np.full(max(len(self.orders.valid), 1), -1, dtype=np.int64)
+        new_order_row[kept_orders] = np.arange(len(kept_orders))
+        new_line_row = np.full(max(len(self.lines.valid), 1), -1, dtype=np.int64)
+        new_line_row[kept_lines] = np.arange(len(kept_lines))
+        self.lines['order'][:] = new_order_row[self.lines['order']]
+        first_line = self.orders['first_line']
+        has_lines = self.orders['line_count'] > 0
+        first_line[has_lines] = new_line_row[first_line[has_lines]]
+        self.rows = {order_id: int(new_order_row[row]) for order_id, row in self.rows.items()}
+
+    # Read: sum of all order totals
+    def total_sales(self):
+        return float(self.orders['total_price'][self.orders.mask()].sum())
+
+    # Read: grouped sum of a line column by a coded line column, as {value: total}
+    def group_lines(self, key_column, codebook, value_column, cast):
+        mask = self.lines.mask()
+        keys = self.lines[key_column][mask]
+        if not len(keys):
+            return {}
+        size = len(codebook.values)
+        totals = np.bincount(keys, weights=self.lines[value_column][mask], minlength=size)
+        present = np.bincount(keys, minlength=size) > 0
+        return {codebook.values[code]: cast(totals[code]) for code in np.flatnonzero(present)}
+
+    # Read: units sold per product name (as written on the order lines)
+    def units_sold_by_product_name(self):
+        return self.group_lines('product_name', self.product_names, 'quantity', int)
+
+    # Read: units sold per product ID
+    def units_sold_by_product(self):
+        return self.group_lines('product', self.products, 'quantity', int)
+
+    # Read: line revenue per product ID
+    def revenue_by_product(self):
+        return self.group_lines('product', self.products, 'total_price', float)
+
+    # Read: sum of order totals per customer email
+    def sales_by_customer(self):
+        mask = self.orders.mask()
+        keys = self.orders['customer'][mask]
+        if not len(keys):
+            return {}
+        totals = np.bincount(keys, weights=self.orders['total_price'][mask], minlength=len(self.customers.values))
+        present = np.bincount(keys, minlength=len(self.customers.values)) > 0
+        return {self.customers.values[code]: float(totals[code]) for code in np.flatnonzero(present)}
+
+    # Read: sum of order totals with an order date in [start, end] (datetime.date or 'YYYY-MM-DD')
+    def total_sales_between(self, start, end):
+        dates = self.orders['order_date']
+        selected = self.orders.mask() & (dates >= np.datetime64(start, 'D')) & (dates <= np.datetime64(end, 'D'))
+        return float(self.orders['total_price'][selected].sum())
@@ -1,15 +1,86 @@
 # controllers/controllers.py
 
-from datetime import datetime
+from contextlib import ExitStack
+from copy import copy
+from datetime import date, datetime
 import logging
+import threading
 from models.models import Customer, Product, Order
+from controllers.aggregates import SalesAggregates, add_count
+from controllers.change_feed import ChangeEvent, ChangeFeed
+from controllers.date_index import DateIndex, parse_order_date
+from controllers.locks import ReadWriteLock
+from controllers.pagination import page_records, page_by_date, page_search
+from controllers.prefix_index import PrefixIndex
+from controllers.query import Queryable, bucket_path, date_range_path, key_path, RANGE_OPERATORS
+from data.storage import StorageBackend
 
 
 # Class:: Manage all operations which is related to a Customer
-class CustomerController:
-    def __init__(self, order_manager):
-        self.customers = []
+class CustomerController(Queryable):
+    MODEL = Customer
+
+    def __init__(self, order_manager, storage=None, changes=None):
+        # Keyed by email, dict keeps the insertion order for get_all_customers()
+        self.customers = {}
         self.order_manager = order_manager
+        # Every change is written through to the storage backend (in memory only by default) and published
+        # to the change feed (shared by the three controllers in the app)
+        self.storage = storage or StorageBackend()
+        self.changes = changes or ChangeFeed()
+        # Readers share the lock, writers hold it alone. Lock order: customer -> order -> product -> storage
+        self.lock = ReadWriteLock()
+        # Running number of customers per city
+        self.customers_by_city = {}
+        # Name and email search index, built on first search then kept up to date on every write.
+        # index_lock serialises the lazy build readers may trigger
+        self._search_index = None
+        self.index_lock = threading.Lock()
+
+    # Load: customers persisted in the storage backend
+    def load_from_storage(self):
+        self.restore_customers(self.storage.load_customers())
+
+    # Load: adopt already validated customers as they are (no validation, no write-through)
+    def restore_customers(self, customers):
+        with self.lock.write():
+            changes = []
+            for customer in customers:
+                changes.append((customer.email, self.customers.get(customer.email), customer))
+                self.customers[customer.email] = customer
+            self.record_changes(changes)
+
+    # Index: Count and publish changes (email, old customer, new customer), either customer may be None
+    def record_changes(self, changes):
+        added = []
+        for email, old_customer, new_customer in changes:
+            if old_customer is not None:
+                add_count(self.customers_by_city, old_customer.city, -1)
+                if self._search_index is not None:
+                    self._search_index.remove(email, self.search_terms(old_customer))
+            if new_customer is not None:
+                add_count(self.customers_by_city, new_customer.city, 1)
+                added.append((email, self.search_terms(new_customer)))
+        if self._search_index is not None:
+            self._search_index.add_many(added)
+        self.changes.publish_many('customer', changes)
+
+    # Index: first name, last name and email -> customer emails
+    @property
+    def search_index(self):
+        if self._search_index is None:
+            with self.index_lock:
+                if self._search_index is None:
+                    search_index = PrefixIndex()
+                    search_index.add_many(
+                        (email, self.search_terms(customer)) for email, customer in self.customers.items())
+                    self._search_index = search_index
+        return self._search_index
+
+    # Index: the terms a customer is found by
+    @staticmethod
+    def search_terms(customer):
+        return customer.first_name, customer.last_name, customer.email
 
     # Create: customer
     def create_customer(
@@ -37,26 +108,140 @@ class CustomerController:
             created_at,
             updated_at,
         )
-        existing_customer = self.get_customer_by_email(new_customer.email)
-        if existing_customer:
-            self.update_customer_by_email(new_customer)
-        else:
-            self.customers.append(new_customer)
+        with self.lock.write():
+            if new_customer.email in self.customers:
+                self.update_customer_by_email(new_customer)
+            else:
+                self.customers[new_customer.email] = new_customer
+                self.record_changes([(new_customer.email, None, new_customer)])
+                self.storage.save_customer(new_customer)
+
+    # Create: many customers (dicts of create_customer's arguments) in one pass, upserting by email. With
+    # `trusted`, Customer objects known to be valid, adopted as they are (the controller owns them afterwards)
+    def create_customers_bulk(self, customers, trusted=False):
+        return self.commit_customers(*self.build_customers(customers, trusted))
+
+    # Create: validate customer records without touching the controller (so it can run in another process),
+    # the customers by email and the summary so far
+    @staticmethod
+    def build_customers(customers, trusted=False):
+        summary = {'inserted': 0, 'updated': 0, 'rejected': 0}
+        accepted = {}
+        for data in customers:
+            if trusted:
+                customer = data
+            else:
+                try:
+                    customer = Customer(**data)
+                except (TypeError, ValueError) as e:
+                    logging.error(f"Error adding customer '{data.get('email')}' - {str(e)}")
+                    summary['rejected'] += 1
+                    continue
+            if customer.email in accepted:
+                summary['updated'] += 1
+            # The last record wins for a repeated email
+            accepted[customer.email] = customer
+        return accepted, summary
+
+    # Create: add the customers of build_customers() in one write
+    def commit_customers(self, accepted, summary):
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.lock.write():
+            existing_emails = accepted.keys() & self.customers.keys()
+            for email in existing_emails:
+                accepted[email].updated_at = now
+            changes = [(email, self.customers.get(email), customer) for email, customer in accepted.items()]
+            self.customers.update(accepted)
+            self.record_changes(changes)
+            self.storage.save_customers(accepted.values())
+        summary['updated'] += len(existing_emails)
+        summary['inserted'] = len(accepted) - len(existing_emails)
+        logging.info(f"Customers: {summary['inserted']} inserted, {summary['updated']} updated, "
+                     f"{summary['rejected']} rejected.")
+        return summary
 
     # Read: get a customer by email
     def get_customer_by_email(self, email):
-        return next((c for c in self.customers if c.email == email), None)
+        with self.lock.read():
+            return self.customers.get(email)
 
-    # Read: Get a list of all customers.
+    # Read: Get one page of customers, in insertion order or sorted by an attribute (e.g. 'last_name'),
+    # and the cursor of the next page.
+    def get_customers_page(self, page_size=20, cursor=None, sort_key=None, reverse=False):
+        with self.lock.read():
+            return page_records(self.customers, page_size, cursor, sort_key, reverse)
+
+    # Read: Search customers by the start of their first name, last name or email (case-insensitive). With
+    # several words, each word has to start one of them (e.g. 'jo do' finds John Doe). At most `limit`
+    # customers, in the order of the term they were found by
+    def search_customers(self, text, limit=None):
+        words = [PrefixIndex.normalise(word) for word in str(text).split()]
+        if not words:
+            return []
+        with self.lock.read():
+            search_index = self.search_index
+            # Read the shortest run of matches, check the other words on those customers only
+            word = min(words, key=lambda w: len(range(*search_index.span(w))))
+            others = [w for w in words if w != word]
+            found = []
+            for email in search_index.search(word):
+                if limit is not None and len(found) >= limit:
+                    break
+                customer = self.customers[email]
+                terms = [PrefixIndex.normalise(term) for term in self.search_terms(customer)]
+                if all(any(term.startswith(w) for term in terms) for w in others):
+                    found.append(customer)
+            return found
+
+    # Read: Get one page of the customers search_customers() finds, and the cursor of the next page.
+    def search_customers_page(self, text, page_size=20, cursor=None):
+        return page_search(self.search_customers, text, page_size, cursor)
+
+    # Read: Get the number of customers per city, in order of first appearance.
+    def get_customer_count_by_city(self):
+        with self.lock.read():
+            return dict(self.customers_by_city)
+
+    # Read: Check the running number of customers per city against a full recount, log and return the
+    # cities that differ.
+    def verify_aggregates(self):
+        with self.lock.read():
+            recount = Customer.city.count(self.customers.values())
+            differences = [city for city in recount.keys() | self.customers_by_city.keys()
+                           if recount.get(city) != self.customers_by_city.get(city)]
+        for city in differences:
+            logging.error(f"Number of customers in '{city}' does not match a full recount.")
+        return differences
+
+    # Read: Get a list of all customers (a copy, safe to iterate while others write).
     def get_all_customers(self):
+        with self.lock.read():
+            return list(self.customers.values())
+
+    # Read: Get the number of customers.
+    def get_customer_count(self):
+        with self.lock.read():
+            return len(self.customers)
+
+    # Index: the customers for query()
+    def query_records(self):
         return self.customers
 
+    # Index: email lookups for query()
+    def query_paths(self, predicates):
+        return [key_path('primary key email', self.customers, predicate)
+                for predicate in predicates if predicate.field == 'email' and predicate.op in ('==', 'in')]
+
     # Update: Update a customer's information by email.
     def update_customer_by_email(self, new_customer):
-        for idx, existing_customer in enumerate(self.customers):
-            if existing_customer.email == new_customer.email:
+        with self.lock.write():
+            if new_customer.email in self.customers:
                 new_customer.updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                self.customers[idx] = new_customer
+                old_customer = self.customers[new_customer.email]
+                # Re-assigning an existing key keeps its position in the insertion order
+                self.customers[new_customer.email] = new_customer
+                self.record_changes([(new_customer.email, old_customer, new_customer)])
+                self.storage.save_customer(new_customer)
                 logging.info(f"Customer '{new_customer.email}' updated successfully.")
                 return
         logging.error(f"Customer '{new_customer.email}' not found.")
@@ -65,21 +250,98 @@ class CustomerController:
     def delete_customer(self, email):
         existing_customer = self.get_customer_by_email(email)
         if existing_customer:
+            # No lock is held while waiting for the answer
             confirmation = input(f"Are you sure you want to delete {email}? (y/n): ")
             if confirmation.lower() == 'y':
-                self.order_manager.delete_orders_by_customer_email(email)
-                self.customers.remove(existing_customer)
+                self.delete_customer_by_email(email)
                 logging.info(f"Customer '{email}' deleted.")
             else:
                 logging.info("Deletion cancelled.")
         else:
             logging.error(f"Customer with email '{email}' does not exist.")
 
+    # Delete: a customer and their orders (their stock given back unless `return_stock` is False), without asking
+    # for confirmation (the order and product locks are taken before the storage transaction, storage always comes
+    # last in the lock order)
+    def delete_customer_by_email(self, email, return_stock=True):
+        with self.lock.write(), self.order_manager.lock.write(), self.order_manager.product_manager.lock.write(), \
+                self.storage.batch():
+            self.order_manager.delete_orders_by_customer_email(email, return_stock)
+            self.record_changes([(email, self.customers.pop(email, None), None)])
+            self.storage.delete_customer(email)
+
 
 # Class:: Manage all operations related to a Product.
-class ProductController:
-    def __init__(self):
-        self.products = []
+class ProductController(Queryable):
+    MODEL = Product
+    # Stock below this publishes a low-stock event when a product crosses it
+    LOW_STOCK_THRESHOLD = 10
+
+    def __init__(self, storage=None, changes=None):
+        # Keyed by the stripped product ID, dict keeps the insertion order for get_all_products()
+        self.products = {}
+        self.storage = storage or StorageBackend()
+        self.changes = changes or ChangeFeed()
+        self.lock = ReadWriteLock()
+        # Fuzzy name and category search index, built on first search then kept up to date on every write
+        self._search_index = None
+        self.index_lock = threading.Lock()
+        # product key -> lock serialising the stock changes of that product
+        self.stock_locks = {}
+
+    # Load: products persisted in the storage backend
+    def load_from_storage(self):
+        self.restore_products(self.storage.load_products())
+
+    # Load: adopt already validated products as they are (no validation, no write-through)
+    def restore_products(self, products):
+        with self.lock.write():
+            changes = []
+            for product in products:
+                product_key = self.product_key(product.product_id)
+                changes.append((product_key, self.products.get(product_key), product))
+                self.products[product_key] = product
+            self.record_changes(changes)
+
+    # Index: Index and publish changes (product key, old product, new product), either product may be None
+    def record_changes(self, changes):
+        if self._search_index is not None:
+            for product_key, old_product, new_product in changes:
+                if new_product is None:
+                    self._search_index.remove(product_key)
+                elif old_product is None or self.search_text(old_product) != self.search_text(new_product):
+                    self._search_index.add(product_key, self.search_text(new_product))
+        self.changes.publish_many('product', changes)
+        for product_key, old_product, new_product in changes:
+            if (old_product is not None and new_product is not None
+                    and new_product.stock_quantity < self.LOW_STOCK_THRESHOLD <= old_product.stock_quantity):
+                logging.warning(f"Low stock: '{new_product.product_name}' has {new_product.stock_quantity} "
+                                f"units left.")
+                self.changes.publish('product', product_key, old_product, new_product, ChangeEvent.LOW_STOCK)
+
+    # Index: product name and category -> product keys
+    @property
+    def search_index(self):
+        if self._search_index is None:
+            with self.index_lock:
+                if self._search_index is None:
+                    # Imported here so NumPy is only loaded by the first product search
+                    from controllers.trigram_index import TrigramIndex
+                    search_index = TrigramIndex()
+                    for product_key, product in self.products.items():
+                        search_index.add(product_key, self.search_text(product))
+                    self._search_index = search_index
+        return self._search_index
+
+    # Index: the text a product is found by
+    @staticmethod
+    def search_text(product):
+        return f"{product.product_name} {product.category}"
+
+    # Read: Normalise a product ID into its index key
+    @staticmethod
+    def product_key(product_id):
+        return str(product_id).strip()
 
     # Create: product
     def create_product(
@@ -104,32 +366,205 @@ class ProductController:
             created_at,
             updated_at,
         )
-        existing_product = self.get_product_by_id(product_id)
-        if existing_product:
-            self.update_product_by_id(product)
-        else:
-            self.products.append(product)
+        product_key = self.product_key(product_id)
+        with self.lock.write():
+            if product_key in self.products:
+                self.update_product_by_id(product)
+            else:
+                self.products[product_key] = product
+                self.record_changes([(product_key, None, product)])
+                self.storage.save_product(product)
+
+    # Create: many products (dicts of create_product's arguments) in one pass, upserting by product ID. With
+    # `trusted`, Product objects known to be valid, adopted as they are
+    def create_products_bulk(self, products, trusted=False):
+        return self.commit_products(*self.build_products(products, trusted))
+
+    # Create: validate product records without touching the controller, the products by product key and the
+    # summary so far
+    @classmethod
+    def build_products(cls, products, trusted=False):
+        summary = {'inserted': 0, 'updated': 0, 'rejected': 0}
+        accepted = {}
+        for data in products:
+            if trusted:
+                product = data
+            else:
+                try:
+                    product = Product(**data)
+                except (TypeError, ValueError) as e:
+                    logging.error(f"Error adding product '{data.get('product_id')}' - {str(e)}")
+                    summary['rejected'] += 1
+                    continue
+                if product.price < 0:
+                    logging.error(f"Invalid price for product '{product.product_id}': Price cannot be negative.")
+                    summary['rejected'] += 1
+                    continue
+            product_key = cls.product_key(product.product_id)
+            if product_key in accepted:
+                summary['updated'] += 1
+            accepted[product_key] = product
+        return accepted, summary
+
+    # Create: add the products of build_products() in one write
+    def commit_products(self, accepted, summary):
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.lock.write():
+            existing_keys = accepted.keys() & self.products.keys()
+            for product_key in existing_keys:
+                # Same as update_product_by_id: a copy of the stored product with the new details
+                new_product = accepted[product_key]
+                product = accepted[product_key] = copy(self.products[product_key])
+                product.product_name = new_product.product_name
+                product.price = new_product.price
+                product.category = new_product.category
+                product.stock_quantity = new_product.stock_quantity
+                product.updated_at = now
+            changes = [(product_key, self.products.get(product_key), product)
+                       for product_key, product in accepted.items()]
+            self.products.update(accepted)
+            self.record_changes(changes)
+            self.storage.save_products(accepted.values())
+        summary['updated'] += len(existing_keys)
+        summary['inserted'] = len(accepted) - len(existing_keys)
+        logging.info(f"Products: {summary['inserted']} inserted, {summary['updated']} updated, "
+                     f"{summary['rejected']} rejected.")
+        return summary
 
     # Read: Get a product by product ID.
     def get_product_by_id(self, product_id):
-        return next((p for p in self.products if p.product_id == str(product_id).strip()), None)
+        with self.lock.read():
+            return self.products.get(self.product_key(product_id))
+
+    # Read: Get one page of products, in insertion order or sorted by an attribute (e.g. 'price'), and the
+    # cursor of the next page.
+    def get_products_page(self, page_size=20, cursor=None, sort_key=None, reverse=False):
+        with self.lock.read():
+            return page_records(self.products, page_size, cursor, sort_key, reverse)
+
+    # Read: Search products by name and category, tolerating typos and missing words. At most `limit`
+    # products, best match first
+    def search_products(self, text, limit=10):
+        with self.lock.read():
+            return [self.products[product_key] for product_key, _ in self.search_index.search(text, limit)]
+
+    # Read: Get one page of the products search_products() finds, and the cursor of the next page.
+    def search_products_page(self, text, page_size=20, cursor=None):
+        return page_search(self.search_products, text, page_size, cursor)
 
-    # Read: Get a list of all products.
+    # Read: The given product IDs that do not exist (as index keys)
+    def get_missing_product_ids(self, product_ids):
+        keys = {self.product_key(product_id) for product_id in product_ids}
+        with self.lock.read():
+            return keys - self.products.keys()
+
+    # Read: Get a list of all products (a copy, safe to iterate while others write).
     def get_all_products(self):
+        with self.lock.read():
+            return list(self.products.values())
+
+    # Index: the products for query()
+    def query_records(self):
         return self.products
 
+    # Index: product IDs compare as index keys in query()
+    def query_field(self, field):
+        if field == 'product_id':
+            return lambda product: self.product_key(product.product_id), self.product_key
+        return super().query_field(field)
+
+    # Index: product ID lookups for query()
+    def query_paths(self, predicates):
+        return [key_path('primary key product_id', self.products, predicate, self.product_key)
+                for predicate in predicates if predicate.field == 'product_id' and predicate.op in ('==', 'in')]
+
+    # Update: Take stock for {product ID: quantity} (negative quantities give it back), all or nothing.
+    # Returns False, changing nothing, when a product does not exist or has too little stock. Only the
+    # products involved are locked, in key order so that reservations never wait on each other in a cycle,
+    # and reservations of different products run in parallel (writers of whole products still exclude them)
+    def reserve_stock(self, quantities):
+        return self.reserve_stock_many([quantities])[0]
+
+    # Update: reserve_stock() for many requests in turn, each all or nothing, with the products locked once.
+    # Returns whether each request got its stock
+    def reserve_stock_many(self, requests):
+        requests = [self.stock_request(quantities) for quantities in requests]
+        results = []
+        with self.lock.read(), ExitStack() as held:
+            for product_key in sorted(set().union(*requests)):
+                held.enter_context(self.stock_lock(product_key))
+            # product key -> stock left after the requests granted so far
+            stock = {}
+            for wanted in requests:
+                results.append(self.check_stock(wanted, stock))
+                if results[-1]:
+                    for product_key, quantity in wanted.items():
+                        left = stock.get(product_key, self.products[product_key].stock_quantity)
+                        stock[product_key] = left - quantity
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            changes = []
+            for product_key, quantity in stock.items():
+                existing_product = self.products[product_key]
+                if quantity != existing_product.stock_quantity:
+                    # Copy on write, like update_product_by_id
+                    product = copy(existing_product)
+                    product.stock_quantity = quantity
+                    product.updated_at = now
+                    self.products[product_key] = product
+                    changes.append((product_key, existing_product, product))
+            if changes:
+                self.record_changes(changes)
+                self.storage.save_products([product for _, _, product in changes])
+        return results
+
+    # Read: {product ID: quantity} as {product key: total quantity}, without zero quantities
+    def stock_request(self, quantities):
+        wanted = {}
+        for product_id, quantity in quantities.items():
+            product_key = self.product_key(product_id)
+            wanted[product_key] = wanted.get(product_key, 0) + quantity
+        return {product_key: quantity for product_key, quantity in wanted.items() if quantity}
+
+    # Read: whether every product of a request exists and has the stock (`stock` overrides what is stored)
+    def check_stock(self, wanted, stock):
+        for product_key, quantity in wanted.items():
+            existing_product = self.products.get(product_key)
+            if existing_product is None:
+                logging.error(f"Product {product_key} does not exist.")
+                return False
+            left = stock.get(product_key, existing_product.stock_quantity)
+            if left < quantity:
+                logging.error(f"Not enough stock of '{existing_product.product_name}': {left} left, "
+                              f"{quantity} wanted.")
+                return False
+        return True
+
+    # Lock: the lock of one product's stock, created on first use
+    def stock_lock(self, product_key):
+        lock = self.stock_locks.get(product_key)
+        if lock is None:
+            lock = self.stock_locks.setdefault(product_key, threading.Lock())
+        return lock
+
     # Update: Update a product's information by product ID.
     def update_product_by_id(self, new_product):
         if new_product is None:
             logging.error("Cannot update a None product.")
             return False
-        for idx, existing_product in enumerate(self.products):
-            if existing_product.product_id == new_product.product_id:
-                existing_product.product_name = new_product.product_name
-                existing_product.price = new_product.price
-                existing_product.category = new_product.category
-                existing_product.stock_quantity = new_product.stock_quantity
-                existing_product.updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        product_key = self.product_key(new_product.product_id)
+        with self.lock.write():
+            existing_product = self.products.get(product_key)
+            if existing_product:
+                # Copy on write: readers holding the old product never see it half updated
+                product = copy(existing_product)
+                product.product_name = new_product.product_name
+                product.price = new_product.price
+                product.category = new_product.category
+                product.stock_quantity = new_product.stock_quantity
+                product.updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self.products[product_key] = product
+                self.record_changes([(product_key, existing_product, product)])
+                self.storage.save_product(product)
                 logging.info(f"Product '{new_product.product_name}' updated successfully.")
                 return True
         logging.error(f"Product '{new_product.product_id}' not found.")
@@ -137,10 +572,42 @@ class ProductController:
 
 
 # Class:: Manage all operations related to an Order.
-class OrderController:
-    def __init__(self, product_manager):
-        self.orders = []
+class OrderController(Queryable):
+    MODEL = Order
+
+    def __init__(self, product_manager, storage=None, changes=None):
+        # Keyed by order ID, dict keeps the insertion order for get_all_orders()
+        self.orders = {}
+        # Secondary indexes (customer email / product ID -> {order ID: order}, order IDs by date) and the
+        # columnar (NumPy) copy of the orders are built on first use, then kept up to date on every write
+        self._orders_by_customer = None
+        self._orders_by_product = None
+        self._orders_by_date = None
+        self._columns = None
+        self._aggregates = None
         self.product_manager = product_manager
+        self.storage = storage or StorageBackend()
+        self.changes = changes or ChangeFeed()
+        # Orders are never changed in place (copy on write), so readers only need the lock while they look
+        # something up. index_lock serialises the lazy index builds readers may trigger
+        self.lock = ReadWriteLock()
+        self.index_lock = threading.Lock()
+
+    # Load: orders persisted in the storage backend
+    def load_from_storage(self):
+        self.restore_orders(self.storage.load_orders())
+
+    # Load: adopt already validated orders as they are (no validation, no write-through)
+    def restore_orders(self, orders):
+        orders = list(orders)
+        with self.lock.write():
+            changes = [(order.order_id, self.orders.get(order.order_id), order) for order in orders]
+            for _, existing_order, _ in changes:
+                if existing_order:
+                    self.unindex_order(existing_order)
+            self.orders.update((order.order_id, order) for order in orders)
+            self.index_orders(orders)
+            self.changes.publish_many('order', changes)
 
     # Create: order
     def create_order(
@@ -155,10 +622,6 @@ class OrderController:
             updated_at,
             customer_email
     ):
-        for prd in order_products:
-            if not self.product_manager.get_product_by_id(prd['product_id']):
-                logging.error(f"Product {prd['product_id']} does not exist. Order creation cancelled.")
-                return None
         order = Order(
             order_id,
             order_date,
@@ -170,35 +633,403 @@ class OrderController:
             updated_at,
             customer_email
         )
-        existing_order = self.get_order_by_id(order_id)
-        if existing_order:
-            self.update_order_by_id(order)
-        else:
-            self.orders.append(order)
+        for prd in order_products:
+            if not self.product_manager.get_product_by_id(prd['product_id']):
+                logging.error(f"Product {prd['product_id']} does not exist. Order creation cancelled.")
+                return None
+        while True:
+            # Take the stock first, without the order lock, so orders of different products go through in
+            # parallel (an update only takes or gives back the difference to the stored order)
+            existing_order = self.get_order_by_id(order.order_id)
+            quantities = self.stock_to_move(existing_order, order)
+            if not self.product_manager.reserve_stock(quantities):
+                logging.error(f"Order '{order.order_id}' cancelled.")
+                return None
+            with self.lock.write():
+                if self.orders.get(order.order_id) is existing_order:
+                    if existing_order:
+                        self.replace_order(existing_order, order)
+                        logging.info(f"Order '{order.order_id}' updated successfully.")
+                    else:
+                        self.orders[order.order_id] = order
+                        self.index_order(order)
+                        self.changes.publish('order', order.order_id, None, order)
+                        self.storage.save_order(order)
+                    return None
+            # The order changed meanwhile: give the stock back and start over
+            self.product_manager.reserve_stock({product_key: -quantity for product_key, quantity in quantities.items()})
+
+    # Read: Stock an order takes {product key: quantity}, less what the order it replaces (if any) took
+    @staticmethod
+    def stock_quantities(existing_order, new_order):
+        quantities = {}
+        for order, sign in ((existing_order, -1), (new_order, 1)):
+            if order is None:
+                continue
+            for op in order.order_products:
+                product_key = ProductController.product_key(op.product_id)
+                quantities[product_key] = quantities.get(product_key, 0) + sign * op.quantity
+        return quantities
+
+    # Read: stock_quantities() without the stock given back to products that no longer exist, what every order
+    # write (create, update, delete) takes or gives back
+    def stock_to_move(self, existing_order, new_order):
+        quantities = self.stock_quantities(existing_order, new_order)
+        missing = self.product_manager.get_missing_product_ids(
+            product_key for product_key, quantity in quantities.items() if quantity < 0)
+        return {product_key: quantity for product_key, quantity in quantities.items() if product_key not in missing}
+
+    # Create: many orders (dicts of create_order's arguments) in one pass, upserting by order ID. Each order
+    # takes its stock like create_order (an order short of stock is rejected) unless `reserve_stock` is False,
+    # for orders that already took it (e.g. the seed data). With `trusted`, Order objects known to be valid, adopted
+    # as they are (their products are still checked)
+    def create_orders_bulk(self, orders, reserve_stock=True, trusted=False):
+        return self.commit_orders(*self.build_orders(orders, trusted), reserve_stock=reserve_stock)
+
+    # Create: validate order records without touching the controller, the orders (products not checked yet)
+    # and the summary so far
+    @staticmethod
+    def build_orders(orders, trusted=False):
+        summary = {'inserted': 0, 'updated': 0, 'rejected': 0}
+        if trusted:
+            return list(orders), summary
+        built = []
+        for data in orders:
+            try:
+                built.append(Order(**data))
+            except (KeyError, TypeError, ValueError) as e:
+                logging.error(f"Error adding order '{data.get('order_id')}' - {str(e)}")
+                summary['rejected'] += 1
+        return built, summary
+
+    # Create: add the orders of build_orders() in one write, those of missing products (or short of stock when
+    # reserving it) rejected
+    def commit_orders(self, built, summary, reserve_stock=True):
+        product_key = ProductController.product_key
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.lock.write():
+            # One set difference checks the products of the whole batch
+            missing = self.product_manager.get_missing_product_ids(
+                op.product_id for order in built for op in order.order_products)
+            accepted = {}
+            for order in built:
+                if missing and any(product_key(op.product_id) in missing for op in order.order_products):
+                    logging.error(f"Order '{order.order_id}' refers to a product that does not exist. Skipping it.")
+                    summary['rejected'] += 1
+                    continue
+                if order.order_id in accepted:
+                    summary['updated'] += 1
+                accepted[order.order_id] = order
+            if reserve_stock:
+                granted = self.product_manager.reserve_stock_many(
+                    [self.stock_to_move(self.orders.get(order_id), order) for order_id, order in accepted.items()])
+                for order_id, reserved in zip(list(accepted), granted):
+                    if not reserved:
+                        logging.error(f"Order '{order_id}' cancelled.")
+                        del accepted[order_id]
+                        summary['rejected'] += 1
+            existing_ids = accepted.keys() & self.orders.keys()
+            for order_id in existing_ids:
+                self.unindex_order(self.orders[order_id])
+                accepted[order_id].updated_at = now
+            changes = [(order_id, self.orders.get(order_id), order) for order_id, order in accepted.items()]
+            self.orders.update(accepted)
+            self.index_orders(accepted.values())
+            self.changes.publish_many('order', changes)
+            self.storage.save_orders(accepted.values())
+        summary['updated'] += len(existing_ids)
+        summary['inserted'] = len(accepted) - len(existing_ids)
+        logging.info(f"Orders: {summary['inserted']} inserted, {summary['updated']} updated, "
+                     f"{summary['rejected']} rejected.")
+        return summary
+
+    # Index: customer email -> {order ID: order}
+    @property
+    def orders_by_customer(self):
+        if self._orders_by_customer is None:
+            self.build_secondary_indexes()
+        return self._orders_by_customer
+
+    # Index: product ID -> {order ID: order}
+    @property
+    def orders_by_product(self):
+        if self._orders_by_product is None:
+            self.build_secondary_indexes()
+        return self._orders_by_product
+
+    # Index: order IDs sorted by order date, newest first
+    @property
+    def orders_by_date(self):
+        if self._orders_by_date is None:
+            with self.index_lock:
+                if self._orders_by_date is None:
+                    orders_by_date = DateIndex()
+                    orders_by_date.add_orders(self.orders.values())
+                    self._orders_by_date = orders_by_date
+        return self._orders_by_date
+
+    # Index: columnar (NumPy) copy of the orders
+    @property
+    def columns(self):
+        if self._columns is None:
+            with self.index_lock:
+                if self._columns is None:
+                    # Imported here so NumPy is only loaded by the first columnar query
+                    from controllers.columns import OrderColumns
+                    columns = OrderColumns()
+                    columns.add_orders(self.orders.values())
+                    self._columns = columns
+        return self._columns
+
+    # Index: running sales totals (order count, sales, units and revenue per product)
+    @property
+    def aggregates(self):
+        if self._aggregates is None:
+            with self.index_lock:
+                if self._aggregates is None:
+                    self._aggregates = self.compute_aggregates()
+        return self._aggregates
+
+    # Index: Sales totals computed from scratch
+    def compute_aggregates(self):
+        aggregates = SalesAggregates(ProductController.product_key)
+        aggregates.add_orders(self.orders.values())
+        return aggregates
+
+    # Index: Build the secondary indexes from the current orders (published only once complete)
+    def build_secondary_indexes(self):
+        with self.index_lock:
+            if self._orders_by_customer is None:
+                orders_by_customer, orders_by_product = {}, {}
+                self.add_to_secondary_indexes(self.orders.values(), orders_by_customer, orders_by_product)
+                self._orders_by_product = orders_by_product
+                self._orders_by_customer = orders_by_customer
+
+    # Index: Add orders to the given secondary indexes
+    @staticmethod
+    def add_to_secondary_indexes(orders, orders_by_customer, orders_by_product):
+        for order in orders:
+            orders_by_customer.setdefault(order.customer_email, {})[order.order_id] = order
+            for op in order.order_products:
+                product_key = ProductController.product_key(op.product_id)
+                orders_by_product.setdefault(product_key, {})[order.order_id] = order
+
+    # Index: Add an order to the customer and product secondary indexes and the columnar store
+    def index_order(self, order):
+        self.index_orders([order])
+
+    # Index: Add many orders to the indexes that have been built so far
+    def index_orders(self, orders):
+        if self._columns is not None:
+            self._columns.add_orders(orders)
+        if self._aggregates is not None:
+            self._aggregates.add_orders(orders)
+        if self._orders_by_date is not None:
+            self._orders_by_date.add_orders(orders)
+        if self._orders_by_customer is not None:
+            self.add_to_secondary_indexes(orders, self._orders_by_customer, self._orders_by_product)
+
+    # Index: Remove an order from the secondary indexes and the columnar store (`deleted` when it is not
+    # about to be re-added by an update, which keeps its place among same-day orders)
+    def unindex_order(self, order, deleted=False):
+        if self._columns is not None:
+            self._columns.remove_order(order.order_id)
+        if self._aggregates is not None:
+            self._aggregates.remove_order(order)
+        if self._orders_by_date is not None:
+            self._orders_by_date.remove_order(order.order_id, deleted)
+        if self._orders_by_customer is None:
+            return
+        customer_orders = self.orders_by_customer.get(order.customer_email)
+        if customer_orders is not None:
+            customer_orders.pop(order.order_id, None)
+            if not customer_orders:
+                del self.orders_by_customer[order.customer_email]
+        for op in order.order_products:
+            product_key = ProductController.product_key(op.product_id)
+            product_orders = self.orders_by_product.get(product_key)
+            if product_orders is not None:
+                product_orders.pop(order.order_id, None)
+                if not product_orders:
+                    del self.orders_by_product[product_key]
+
+    # Index: the orders for query()
+    def query_records(self):
+        return self.orders
+
+    # Index: order dates compare as day ordinals in query() (None when invalid), query values are
+    # datetime.date or 'YYYY-MM-DD'
+    def query_field(self, field):
+        if field == 'order_date':
+            parsed_dates = {}
+            return lambda order: parse_order_date(order.order_date, parsed_dates) or None, DateIndex.to_ordinal
+        return super().query_field(field)
+
+    # Index: order ID, customer email and order date lookups for query()
+    def query_paths(self, predicates):
+        paths = []
+        for predicate in predicates:
+            if predicate.op not in ('==', 'in'):
+                continue
+            if predicate.field == 'order_id':
+                paths.append(key_path('primary key order_id', self.orders, predicate))
+            elif predicate.field == 'customer_email':
+                paths.append(bucket_path('index orders_by_customer', self.orders_by_customer, predicate))
+        date_predicates = [predicate for predicate in predicates
+                           if predicate.field == 'order_date' and predicate.op in RANGE_OPERATORS]
+        if date_predicates:
+            paths.append(date_range_path(self.orders_by_date, self.orders, date_predicates))
+        return paths
+
+    # Index: the dated orders in date order for query()
+    def query_order(self, field, reverse):
+        if field != 'order_date':
+            return None
+        orders_by_date = self.orders_by_date
+        lower, upper = orders_by_date.span(1, date.max.toordinal())
+        # The index is newest first
+        positions = range(lower, upper) if reverse else range(upper - 1, lower - 1, -1)
+        return 'index orders_by_date', lambda: (self.orders[orders_by_date.keys[i][2]] for i in positions)
 
     # Read: Get an order by order ID.
     def get_order_by_id(self, order_id):
-        return next((order for order in self.orders if order.order_id == order_id), None)
+        with self.lock.read():
+            return self.orders.get(order_id)
 
-    # Read: Get a list of all orders.
+    # Read: Get a list of all orders (a copy, safe to iterate while others write).
     def get_all_orders(self):
-        return self.orders
+        with self.lock.read():
+            return list(self.orders.values())
+
+    # Read: Get a list of all orders placed by a customer.
+    def get_orders_by_customer_email(self, customer_email):
+        with self.lock.read():
+            return list(self.orders_by_customer.get(customer_email, {}).values())
+
+    # Read: Get a list of all orders containing a product.
+    def get_orders_by_product_id(self, product_id):
+        with self.lock.read():
+            return list(self.orders_by_product.get(ProductController.product_key(product_id), {}).values())
+
+    # Read: Get the `count` most recent orders, newest first.
+    def get_latest_orders(self, count):
+        with self.lock.read():
+            return [self.orders[order_id] for order_id in self.orders_by_date.latest(count)]
+
+    # Read: Get the orders dated between start and end (datetime.date or 'YYYY-MM-DD', inclusive), newest
+    # first (oldest first when reversed).
+    def get_orders_between(self, start, end, reverse=False):
+        with self.lock.read():
+            return [self.orders[order_id] for order_id in self.orders_by_date.between(start, end, reverse)]
+
+    # Read: Get all orders by date, newest first (oldest first when reversed).
+    def get_orders_by_date(self, reverse=False):
+        with self.lock.read():
+            return [self.orders[order_id] for order_id in self.orders_by_date.iter_ids(reverse)]
+
+    # Read: Get one page of orders, in insertion order or sorted by an attribute ('order_date' uses the date
+    # index, newest first), and the cursor of the next page.
+    def get_orders_page(self, page_size=20, cursor=None, sort_key=None, reverse=False):
+        with self.lock.read():
+            if sort_key == 'order_date':
+                return page_by_date(self.orders_by_date, self.orders, page_size, reverse, cursor)
+            return page_records(self.orders, page_size, cursor, sort_key, reverse)
 
-    # Update: Update an order's information by order ID.
+    # Read: Get the number of orders.
+    def get_order_count(self):
+        with self.lock.read():
+            return len(self.orders)
+
+    # Read: Get the sum of all order totals.
+    def get_total_sales(self):
+        with self.lock.read():
+            return self.aggregates.total_cents / 100
+
+    # Read: Get units sold per product name.
+    def get_units_sold_by_product_name(self):
+        with self.lock.read():
+            return dict(self.aggregates.units_by_product_name)
+
+    # Read: Get units sold per product ID.
+    def get_units_sold_by_product(self):
+        with self.lock.read():
+            return dict(self.aggregates.units_by_product)
+
+    # Read: Get line revenue per product ID.
+    def get_revenue_by_product(self):
+        with self.lock.read():
+            return {product_key: cents / 100 for product_key, cents in self.aggregates.revenue_by_product.items()}
+
+    # Read: Get the sum of order totals with an order date in [start, end] (datetime.date or 'YYYY-MM-DD').
+    def get_total_sales_between(self, start, end):
+        with self.lock.read():
+            return self.columns.total_sales_between(start, end)
+
+    # Read: Get the sum of order totals per customer email.
+    def get_sales_by_customer(self):
+        with self.lock.read():
+            return self.columns.sales_by_customer()
+
+    # Read: Check the running sales totals against a full recompute, log and return the ones that differ.
+    def verify_aggregates(self):
+        with self.lock.read():
+            differences = self.aggregates.differences(self.compute_aggregates())
+        for name in differences:
+            logging.error(f"Sales aggregate '{name}' does not match a full recompute.")
+        return differences
+
+    # Update: Update an order's information by order ID, taking (or giving back) the stock of the difference to
+    # the stored order. Returns False, changing nothing, when the order does not exist or is short of stock
     def update_order_by_id(self, new_order):
-        for idx, existing_order in enumerate(self.orders):
-            if existing_order.order_id == new_order.order_id:
-                for key, value in vars(new_order).items():
-                    setattr(existing_order, key, value)
-                existing_order.updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.lock.write():
+            existing_order = self.orders.get(new_order.order_id)
+            if existing_order:
+                if not self.product_manager.reserve_stock(self.stock_to_move(existing_order, new_order)):
+                    logging.error(f"Order '{new_order.order_id}' not updated.")
+                    return False
+                self.replace_order(existing_order, new_order)
                 logging.info(f"Order '{new_order.order_id}' updated successfully.")
                 return True
         logging.error(f"Order '{new_order.order_id}' not found.")
         return False
 
-    # Delete: Delete all orders associated with a customer's email.
-    def delete_orders_by_customer_email(self, customer_email):
-        self.orders = [
-            order for order in self.orders if order.customer_email != customer_email
-        ]
+    # Update: replace a stored order, its stock already moved (hold the write lock)
+    def replace_order(self, existing_order, new_order):
+        # Copy on write: the new order replaces the old one (same position), which stays untouched
+        # for any reader still holding it
+        self.unindex_order(existing_order)
+        new_order.updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.orders[new_order.order_id] = new_order
+        self.index_order(new_order)
+        self.changes.publish('order', new_order.order_id, existing_order, new_order)
+        self.storage.save_order(new_order)
+
+    # Delete: Delete an order by order ID, giving its stock back unless `return_stock` is False (when replaying a
+    # log, whose product records already hold the stock)
+    def delete_order_by_id(self, order_id, return_stock=True):
+        with self.lock.write():
+            existing_order = self.orders.pop(order_id, None)
+            if existing_order:
+                self.unindex_order(existing_order, deleted=True)
+                self.changes.publish('order', order_id, existing_order, None)
+                self.storage.delete_order(order_id)
+                if return_stock:
+                    self.product_manager.reserve_stock(self.stock_to_move(existing_order, None))
+                logging.info(f"Order '{order_id}' deleted.")
+                return True
+        logging.error(f"Order '{order_id}' not found.")
+        return False
+
+    # Delete: Delete all orders associated with a customer's email, giving their stock back unless `return_stock`
+    # is False (as delete_order_by_id)
+    def delete_orders_by_customer_email(self, customer_email, return_stock=True):
+        with self.lock.write():
+            orders = self.get_orders_by_customer_email(customer_email)
+            for order in orders:
+                del self.orders[order.order_id]
+                self.unindex_order(order, deleted=True)
+            self.changes.publish_many('order', ((order.order_id, order, None) for order in orders))
+            self.storage.delete_orders_by_customer_email(customer_email)
+            if return_stock and orders:
+                self.product_manager.reserve_stock_many([self.stock_to_move(order, None) for order in orders])
         logging.info(f"All orders for customer '{customer_email}' have been deleted.")
@@ -0,0 +1,114 @@
+# controllers/date_index.py
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+
+# Orders without a valid date get this day ordinal
+NO_DATE = 0
+
+
+# Function: Order date (DD-MM-YYYY) to a day ordinal, NO_DATE when invalid. Order dates repeat a lot, so each
+# distinct string is parsed once and kept in `parsed_dates`
+def parse_order_date(order_date, parsed_dates):
+    ordinal = parsed_dates.get(order_date)
+    if ordinal is None:
+        try:
+            ordinal = datetime.strptime(order_date, '%d-%m-%Y').toordinal()
+        except (TypeError, ValueError):
+            ordinal = NO_DATE
+        parsed_dates[order_date] = ordinal
+    return ordinal
+
+
+# Class:: Order IDs kept sorted by order date, newest first (same-day orders in insertion order)
+class DateIndex:
+    # Orders without a valid date sort after every dated one
+    NO_DATE = NO_DATE
+    # Above this many orders per call, appending and re-sorting beats inserting one by one
+    BULK_SIZE = 64
+
+    def __init__(self):
+        # Sorted (-date ordinal, insertion number, order ID) keys
+        self.keys = []
+        # order ID -> its key, and the insertion number an order keeps while it is updated
+        self.key_of = {}
+        self.position_of = {}
+        self.next_position = 0
+        # Order date -> day ordinal, see parse_order_date()
+        self.parsed_dates = {}
+
+    # Read: number of indexed orders
+    def __len__(self):
+        return len(self.keys)
+
+    # Transfer: order date (DD-MM-YYYY) to a day ordinal, NO_DATE when invalid
+    def parse_date(self, order_date):
+        return parse_order_date(order_date, self.parsed_dates)
+
+    # Transfer: a range bound (datetime.date/datetime or 'YYYY-MM-DD') to a day ordinal
+    @staticmethod
+    def to_ordinal(day):
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        return day.toordinal()
+
+    # Create: add (or re-add after an update) orders
+    def add_orders(self, orders):
+        new_keys = []
+        for order in orders:
+            order_id = order.order_id
+            if order_id in self.key_of:
+                self.remove_order(order_id)
+            position = self.position_of.get(order_id)
+            if position is None:
+                position = self.position_of[order_id] = self.next_position
+                self.next_position += 1
+            key = self.key_of[order_id] = (-self.parse_date(order.order_date), position, order_id)
+            new_keys.append(key)
+        if len(new_keys) > self.BULK_SIZE:
+            self.keys.extend(new_keys)
+            self.keys.sort()
+        else:
+            for key in new_keys:
+                insort(self.keys, key)
+
+    # Delete: remove an order, keeping its insertion number unless it is deleted for good
+    def remove_order(self, order_id, deleted=False):
+        key = self.key_of.pop(order_id, None)
+        if key is not None:
+            del self.keys[bisect_left(self.keys, key)]
+        if deleted:
+            self.position_of.pop(order_id, None)
+
+    # Read: IDs of the `count` newest orders
+    def latest(self, count):
+        return [key[2] for key in self.keys[:max(count, 0)]]
+
+    # Read: IDs of the orders dated start..end (inclusive), newest first or oldest first when reversed
+    def between(self, start, end, reverse=False):
+        return self.ids_in_span(*self.span(self.to_ordinal(start), self.to_ordinal(end)), reverse)
+
+    # Read: (lower, upper) positions of the keys dated between two day ordinals (inclusive), so the number of
+    # matching orders is known without reading them
+    def span(self, first_ordinal, last_ordinal):
+        lower = bisect_left(self.keys, (-last_ordinal,))
+        upper = bisect_left(self.keys, (-first_ordinal + 1,))
+        return lower, max(lower, upper)
+
+    # Read: IDs of the orders between two positions returned by span()
+    def ids_in_span(self, lower, upper, reverse=False):
+        selected = self.keys[lower:upper]
+        return [key[2] for key in (reversed(selected) if reverse else selected)]
+
+    # Read: up to `count` keys following `after` (a key of this index, None to start from the first/last)
+    def keys_after(self, after, count, reverse=False):
+        if reverse:
+            stop = len(self.keys) if after is None else bisect_left(self.keys, after)
+            return self.keys[max(stop - count, 0):stop][::-1]
+        start = 0 if after is None else bisect_right(self.keys, after)
+        return self.keys[start:start + count]
+
+    # Read: iterate over all order IDs, newest first or oldest first when reversed
+    def iter_ids(self, reverse=False):
+        keys = reversed(self.keys) if reverse else self.keys
+        return (key[2] for key in keys)
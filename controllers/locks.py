@@ -0,0 +1,93 @@
+# controllers/locks.py
+
+from contextlib import contextmanager
+import threading
+
+
+# Class:: Reader/writer lock: many readers in parallel, one writer at a time, waiting writers go first
+class ReadWriteLock:
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.readers = 0
+        self.writer = None
+        self.writer_depth = 0
+        self.waiting_writers = 0
+        # Per thread stack of the locks held ('read' / 'write'), makes both locks re-entrant
+        self.local = threading.local()
+
+    # Read: the locks held by the current thread
+    def held(self):
+        if not hasattr(self.local, 'held'):
+            self.local.held = []
+        return self.local.held
+
+    # Lock: shared access (a thread holding the write lock may also read)
+    def acquire_read(self):
+        held = self.held()
+        with self.condition:
+            if self.writer == threading.get_ident():
+                self.writer_depth += 1
+                held.append('write')
+                return
+            # A thread already reading must not wait for a queued writer, the writer waits for it
+            if not held:
+                while self.writer is not None or self.waiting_writers:
+                    self.condition.wait()
+            self.readers += 1
+            held.append('read')
+
+    # Lock: release shared access
+    def release_read(self):
+        if self.held().pop() == 'write':
+            self.release_write(popped=True)
+            return
+        with self.condition:
+            self.readers -= 1
+            if not self.readers:
+                self.condition.notify_all()
+
+    # Lock: exclusive access
+    def acquire_write(self):
+        held = self.held()
+        with self.condition:
+            if self.writer == threading.get_ident():
+                self.writer_depth += 1
+                held.append('write')
+                return
+            if held:
+                raise RuntimeError("Cannot upgrade a read lock to a write lock.")
+            self.waiting_writers += 1
+            while self.writer is not None or self.readers:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writer = threading.get_ident()
+            self.writer_depth = 1
+            held.append('write')
+
+    # Lock: release exclusive access
+    def release_write(self, popped=False):
+        if not popped:
+            self.held().pop()
+        with self.condition:
+            self.writer_depth -= 1
+            if not self.writer_depth:
+                self.writer = None
+                self.condition.notify_all()
+
+    # Lock: `with lock.read():`
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    # Lock: `with lock.write():`
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -0,0 +1,110 @@
+# controllers/pagination.py
+
+from heapq import nlargest, nsmallest
+from itertools import islice
+from operator import attrgetter
+
+
+# Class:: One page of records and the cursor that continues after it (None on the last page)
+class Page:
+    __slots__ = ('items', 'next_cursor')
+
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+# Function: Check that a page holds at least one record
+def check_page_size(page_size):
+    if page_size < 1:
+        raise ValueError("The page size must be at least 1.")
+
+
+# Function: Check that a cursor was made for the same kind of listing
+def check_cursor(cursor, kind, *options):
+    if cursor is not None and cursor[:1 + len(options)] != (kind, *options):
+        raise ValueError("The cursor belongs to a different listing.")
+
+
+# Function: Page through a dict in insertion order. The cursor remembers the last key, so records removed
+# before it do not shift the next page (only removing the cursor's own record falls back to its offset)
+def page_in_insertion_order(records, page_size, cursor=None):
+    check_cursor(cursor, 'position')
+    offset = 0
+    if cursor is not None:
+        _, offset, last_key = cursor
+        if offset > len(records) or next(islice(records, offset - 1, None), None) != last_key:
+            for position, key in enumerate(records, start=1):
+                if key == last_key:
+                    offset = position
+                    break
+            else:
+                offset = min(offset, len(records))
+    items = list(islice(records.items(), offset, offset + page_size + 1))
+    next_cursor = None
+    if len(items) > page_size:
+        del items[page_size:]
+        next_cursor = ('position', offset + page_size, items[-1][0])
+    return Page([record for _, record in items], next_cursor)
+
+
+# Function: Page through a dict sorted by a record attribute (ties by key). The cursor is the last
+# (value, key) pair, so pages stay exact while records are added or removed
+def page_by_attribute(records, page_size, sort_key, reverse=False, cursor=None):
+    check_cursor(cursor, 'attribute', sort_key, reverse)
+    value_of = attrgetter(sort_key)
+    entries = ((value_of(record), key, record) for key, record in records.items())
+    if cursor is not None:
+        after = cursor[3:]
+        if reverse:
+            entries = (entry for entry in entries if entry[:2] < after)
+        else:
+            entries = (entry for entry in entries if entry[:2] > after)
+    select = nlargest if reverse else nsmallest
+    items = select(page_size + 1, entries, key=lambda entry: entry[:2])
+    next_cursor = None
+    if len(items) > page_size:
+        del items[page_size:]
+        next_cursor = ('attribute', sort_key, reverse, *items[-1][:2])
+    return Page([record for _, _, record in items], next_cursor)
+
+
+# Function: Page through orders by date with a DateIndex, newest first (oldest first when reversed). The
+# cursor is the last index key, so each page costs O(log n + page size)
+def page_by_date(date_index, orders, page_size, reverse=False, cursor=None):
+    check_page_size(page_size)
+    check_cursor(cursor, 'date', reverse)
+    keys = date_index.keys_after(None if cursor is None else cursor[2], page_size + 1, reverse)
+    next_cursor = None
+    if len(keys) > page_size:
+        del keys[page_size:]
+        next_cursor = ('date', reverse, keys[-1])
+    return Page([orders[key[2]] for key in keys], next_cursor)
+
+
+# Function: Page through a controller's dict, in insertion order or sorted by `sort_key`
+def page_records(records, page_size, cursor=None, sort_key=None, reverse=False):
+    check_page_size(page_size)
+    if sort_key is None:
+        return page_in_insertion_order(records, page_size, cursor)
+    return page_by_attribute(records, page_size, sort_key, reverse, cursor)
+
+
+# Function: Page through search results, search(text, limit) returning the first `limit` matches. The cursor
+# is the offset, each page runs the search again just far enough to fill it
+def page_search(search, text, page_size, cursor=None):
+    check_page_size(page_size)
+    check_cursor(cursor, 'search', text)
+    offset = 0 if cursor is None else cursor[2]
+    items = search(text, offset + page_size + 1)[offset:]
+    next_cursor = None
+    if len(items) > page_size:
+        del items[page_size:]
+        next_cursor = ('search', text, offset + page_size)
+    return Page(items, next_cursor)
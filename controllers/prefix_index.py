@@ -0,0 +1,63 @@
+# controllers/prefix_index.py
+
+from bisect import bisect_left, insort
+
+
+# Class:: Search terms kept sorted with the key of their record, so every record with a term starting with a
+# prefix sits in one contiguous run found by binary search (O(log n) plus the number of matches)
+class PrefixIndex:
+    # Above this many terms per call, appending and re-sorting beats inserting one by one
+    BULK_SIZE = 64
+
+    def __init__(self):
+        # Sorted (normalised term, record key) pairs
+        self.keys = []
+
+    # Read: number of indexed terms
+    def __len__(self):
+        return len(self.keys)
+
+    # Transfer: a term or prefix as it is indexed and searched (case-insensitive, no surrounding spaces)
+    @staticmethod
+    def normalise(term):
+        return str(term).strip().casefold()
+
+    # Create: add records given as (record key, terms) pairs
+    def add_many(self, records):
+        new_keys = [(self.normalise(term), record_key) for record_key, terms in records for term in terms if term]
+        if len(new_keys) > self.BULK_SIZE:
+            self.keys.extend(new_keys)
+            self.keys.sort()
+        else:
+            for key in new_keys:
+                insort(self.keys, key)
+
+    # Delete: remove a record's terms
+    def remove(self, record_key, terms):
+        for term in terms:
+            if not term:
+                continue
+            key = (self.normalise(term), record_key)
+            position = bisect_left(self.keys, key)
+            if position < len(self.keys) and self.keys[position] == key:
+                del self.keys[position]
+
+    # Read: (lower, upper) positions of the terms starting with a normalised prefix
+    def span(self, prefix):
+        lower = bisect_left(self.keys, (prefix,))
+        if not prefix:
+            return lower, len(self.keys)
+        # The first string after every string starting with the prefix
+        upper = bisect_left(self.keys, (prefix[:-1] + chr(ord(prefix[-1]) + 1),), lower)
+        return lower, upper
+
+    # Read: keys of the records with a term starting with the prefix, in term order, each record once
+    # (lazily, so a caller that stops early reads no further)
+    def search(self, prefix):
+        lower, upper = self.span(self.normalise(prefix))
+        seen = set()
+        for position in range(lower, upper):
+            record_key = self.keys[position][1]
+            if record_key not in seen:
+                seen.add(record_key)
+                yield record_key
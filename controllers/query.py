@@ -0,0 +1,239 @@
+# controllers/query.py
+
+from datetime import date
+from heapq import nlargest, nsmallest
+from operator import attrgetter, eq, ge, gt, le, lt, ne
+from models.categories import CategoricalField
+
+# Comparison operators, `record value <op> query value`
+OPERATORS = {
+    '==': eq,
+    '!=': ne,
+    '<': lt,
+    '<=': le,
+    '>': gt,
+    '>=': ge,
+    'in': lambda value, options: value in options,
+    'contains': lambda value, part: part in value,
+}
+RANGE_OPERATORS = ('==', '<', '<=', '>', '>=')
+
+
+# Class:: One filter condition on a record field
+class Predicate:
+    __slots__ = ('field', 'op', 'value', 'controller')
+
+    def __init__(self, field, op, value, controller):
+        self.field = field
+        self.op = op
+        self.value = value
+        self.controller = controller
+
+    # Read: function telling whether a record matches (built when the query runs, so category codes added
+    # since where() are known)
+    def compile(self):
+        compare = OPERATORS[self.op]
+        value = self.value
+        descriptor = getattr(self.controller.MODEL, self.field, None)
+        if isinstance(descriptor, CategoricalField) and self.op in ('==', '!=', 'in'):
+            # Compare category codes, no value is decoded (an unknown value matches no record)
+            get_value = descriptor.slot.__get__
+            codes = descriptor.categories.codes
+            target = {codes.get(option, -1) for option in value} if self.op == 'in' else codes.get(value, -1)
+        else:
+            get_value, convert = self.controller.query_field(self.field)
+            target = {convert(option) for option in value} if self.op == 'in' else convert(value)
+
+        # A record without a usable value (None) never matches
+        def test(record):
+            record_value = get_value(record)
+            return record_value is not None and compare(record_value, target)
+        return test
+
+    def __repr__(self):
+        return f"{self.field} {self.op} {self.value!r}"
+
+
+# Class:: One way of reading the candidate records: a full scan or an index lookup answering some predicates
+class AccessPath:
+    __slots__ = ('description', 'estimate', 'fetch', 'covers')
+
+    def __init__(self, description, estimate, fetch, covers=()):
+        self.description = description
+        # Number of records the path reads (exact for the indexes here)
+        self.estimate = estimate
+        # Function returning the records
+        self.fetch = fetch
+        # Predicates the index fully answers, not checked again
+        self.covers = covers
+
+
+# Class:: Filter, sort, limit and project the records of a controller. The controller supplies its records
+# and indexes through query_records(), query_field(), query_paths() and query_order()
+class Query:
+    def __init__(self, controller):
+        self.controller = controller
+        self.predicates = []
+        self.sort_key = None
+        self.reverse = False
+        self.count = None
+        self.fields = None
+
+    # Create: keep the records where `field <op> value` (op is one of OPERATORS)
+    def where(self, field, op, value):
+        self.check_field(field)
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator '{op}', use one of {', '.join(OPERATORS)}.")
+        self.predicates.append(Predicate(field, op, value, self.controller))
+        return self
+
+    # Create: sort by a field (ascending, descending when reversed)
+    def order_by(self, field, reverse=False):
+        self.check_field(field)
+        self.sort_key = field
+        self.reverse = reverse
+        return self
+
+    # Create: return at most `count` records
+    def limit(self, count):
+        if count < 0:
+            raise ValueError("The limit cannot be negative.")
+        self.count = count
+        return self
+
+    # Create: return dicts of these fields instead of the records
+    def select(self, *fields):
+        for field in fields:
+            self.check_field(field)
+        self.fields = fields
+        return self
+
+    # Read: Check that the controller's records have a field
+    def check_field(self, field):
+        if field not in self.controller.MODEL.FIELDS:
+            raise ValueError(f"Unknown field '{field}' for {self.controller.MODEL.__name__}.")
+
+    # Read: The cheapest way of reading the candidates, the index answering the most selective predicates
+    # or a full scan
+    def access_path(self):
+        records = self.controller.query_records()
+        best = AccessPath('full scan', len(records), records.values)
+        for path in self.controller.query_paths(self.predicates):
+            if path.estimate < best.estimate:
+                best = path
+        return best
+
+    # Read: How the query runs: access path, estimated records read, filters left, sort and limit
+    def explain(self):
+        with self.controller.lock.read():
+            path = self.access_path()
+            ordered_path = self.ordered_path(path)
+        sort = None
+        if self.sort_key is not None:
+            sort = f"{self.sort_key} {'descending' if self.reverse else 'ascending'}"
+            sort += f" ({ordered_path[0]})" if ordered_path else (" (top-n)" if self.count is not None else "")
+        return {
+            'access': path.description,
+            'estimated_rows': path.estimate,
+            'filter': [repr(predicate) for predicate in self.predicates if predicate not in path.covers],
+            'sort': sort,
+            'limit': self.count,
+        }
+
+    # Read: A full scan sorted on an indexed field reads the records in order from the index
+    def ordered_path(self, path):
+        if self.sort_key is None or path.covers:
+            return None
+        return self.controller.query_order(self.sort_key, self.reverse)
+
+    # Read: Run the query, the records (or dicts of the selected fields) in order
+    def execute(self):
+        with self.controller.lock.read():
+            path = self.access_path()
+            tests = [predicate.compile() for predicate in self.predicates if predicate not in path.covers]
+            ordered_path = self.ordered_path(path)
+            records = ordered_path[1]() if ordered_path else path.fetch()
+            if tests:
+                records = (record for record in records if all(test(record) for test in tests))
+            if self.count == 0:
+                records = []
+            elif self.sort_key is not None and not ordered_path:
+                sort_key = self.controller.query_field(self.sort_key)[0]
+                records = [record for record in records if sort_key(record) is not None]
+                if self.count is not None:
+                    records = (nlargest if self.reverse else nsmallest)(self.count, records, key=sort_key)
+                else:
+                    records.sort(key=sort_key, reverse=self.reverse)
+            results = []
+            for record in records:
+                if self.count is not None and len(results) == self.count:
+                    break
+                results.append(record)
+        if self.fields is not None:
+            get_fields = attrgetter(*self.fields)
+            if len(self.fields) == 1:
+                return [{self.fields[0]: get_fields(record)} for record in results]
+            return [dict(zip(self.fields, get_fields(record))) for record in results]
+        return results
+
+
+# Class:: Query hooks of a controller, by default a full scan of query_records() comparing plain field values
+class Queryable:
+    # Model class of the records
+    MODEL = None
+
+    # Read: Start a query, e.g. customer_manager.query().where('city', '==', 'Melbourne').execute()
+    def query(self):
+        return Query(self)
+
+    # Read: The records a query reads, keyed like the controller's dict
+    def query_records(self):
+        raise NotImplementedError
+
+    # Read: (function reading a field's value from a record, function converting query values to match)
+    def query_field(self, field):
+        return attrgetter(field), lambda value: value
+
+    # Read: Index access paths answering some of the predicates
+    def query_paths(self, predicates):
+        return []
+
+    # Read: (description, function returning all the records sorted by `field`) when an index keeps that order
+    def query_order(self, field, reverse):
+        return None
+
+
+# Function: The keys an equality predicate ('==' or 'in') asks for, normalised like the index keys
+def equality_keys(predicate, normalise=None):
+    keys = [predicate.value] if predicate.op == '==' else predicate.value
+    if normalise is not None:
+        keys = map(normalise, keys)
+    return dict.fromkeys(keys)
+
+
+# Function: Access path reading records by their key in a dict (primary key)
+def key_path(description, records, predicate, normalise=None):
+    found = [records[key] for key in equality_keys(predicate, normalise) if key in records]
+    return AccessPath(f"{description} ({predicate!r})", len(found), lambda: found, (predicate,))
+
+
+# Function: Access path reading the buckets of a hash index (key -> {record key: record})
+def bucket_path(description, index, predicate, normalise=None):
+    buckets = [index[key] for key in equality_keys(predicate, normalise) if key in index]
+    return AccessPath(f"{description} ({predicate!r})", sum(map(len, buckets)),
+                      lambda: [record for bucket in buckets for record in bucket.values()], (predicate,))
+
+
+# Function: Access path reading the orders dated within the range predicates on order_date from a DateIndex
+def date_range_path(date_index, orders, predicates):
+    first, last = 1, date.max.toordinal()
+    for predicate in predicates:
+        ordinal = date_index.to_ordinal(predicate.value)
+        if predicate.op in ('==', '>=', '>'):
+            first = max(first, ordinal + (predicate.op == '>'))
+        if predicate.op in ('==', '<=', '<'):
+            last = min(last, ordinal - (predicate.op == '<'))
+    lower, upper = date_index.span(first, last)
+    return AccessPath(f"index orders_by_date ({' and '.join(map(repr, predicates))})", upper - lower,
+                      lambda: [orders[order_id] for order_id in date_index.ids_in_span(lower, upper)],
+                      tuple(predicates))
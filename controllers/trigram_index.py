@@ -0,0 +1,107 @@
+# controllers/trigram_index.py
+
+from array import array
+from math import ceil
+import re
+import numpy as np
+
+# Runs of characters that separate words
+NON_WORD = re.compile(r'[\W_]+')
+
+
+# Class:: Fuzzy text search: every text is cut into its three-letter pieces (trigrams), a record matches a
+# query by the share of the query's trigrams it contains, so typos and missing words only lower the score.
+# Records get an integer ID and each trigram keeps a compact array of the IDs containing it, so one NumPy
+# bincount over the query's arrays counts the shared trigrams of every record at once
+class TrigramIndex:
+    # Share of the query's trigrams a record needs to be returned
+    MIN_SCORE = 0.4
+    # Removed IDs are left in the arrays (their size is zeroed) until they outnumber the live ones
+    COMPACT_MIN = 1024
+
+    def __init__(self):
+        # trigram -> IDs of the records containing it
+        self.postings = {}
+        # ID -> record key (None once removed) and number of distinct trigrams (0 once removed)
+        self.keys = []
+        self.sizes = array('i')
+        # record key -> its current ID
+        self.id_of = {}
+        self.removed = 0
+
+    # Read: number of indexed records
+    def __len__(self):
+        return len(self.id_of)
+
+    # Transfer: text as it is indexed and searched (case-insensitive, punctuation ignored, single spaces)
+    @staticmethod
+    def normalise(text):
+        return ' '.join(NON_WORD.sub(' ', str(text).casefold()).split())
+
+    # Transfer: trigrams of a text, each word padded so its first letters count as well
+    @classmethod
+    def trigrams(cls, text):
+        grams = set()
+        for word in cls.normalise(text).split():
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return grams
+
+    # Create: add (or replace) a record's text
+    def add(self, record_key, text):
+        if record_key in self.id_of:
+            self.remove(record_key)
+        record_id = self.id_of[record_key] = len(self.keys)
+        self.keys.append(record_key)
+        grams = self.trigrams(text)
+        self.sizes.append(len(grams))
+        for gram in grams:
+            postings = self.postings.get(gram)
+            if postings is None:
+                postings = self.postings[gram] = array('i')
+            postings.append(record_id)
+
+    # Delete: remove a record
+    def remove(self, record_key):
+        record_id = self.id_of.pop(record_key, None)
+        if record_id is None:
+            return
+        self.keys[record_id] = None
+        self.sizes[record_id] = 0
+        self.removed += 1
+        if self.removed > max(len(self.id_of), self.COMPACT_MIN):
+            self.compact()
+
+    # Update: drop the removed IDs from the arrays and number the records again from 0
+    def compact(self):
+        sizes = np.frombuffer(self.sizes, dtype=np.int32)
+        live = sizes > 0
+        new_ids = np.cumsum(live, dtype=np.int32) - 1
+        for gram, postings in list(self.postings.items()):
+            ids = np.frombuffer(postings, dtype=np.int32)
+            ids = new_ids[ids[live[ids]]]
+            if len(ids):
+                self.postings[gram] = array('i', ids.tobytes())
+            else:
+                del self.postings[gram]
+        self.keys = [record_key for record_key in self.keys if record_key is not None]
+        self.sizes = array('i', sizes[live].tobytes())
+        self.id_of = {record_key: record_id for record_id, record_key in enumerate(self.keys)}
+        self.removed = 0
+
+    # Read: up to `limit` (record key, score) pairs, best first. The score is the share of the query's trigrams
+    # found in the record, ties go to the closer match (fewer other trigrams), then to the earlier record
+    def search(self, text, limit=10, min_score=MIN_SCORE):
+        query = self.trigrams(text)
+        postings = [np.frombuffer(self.postings[gram], dtype=np.int32) for gram in query if gram in self.postings]
+        if not postings or limit <= 0:
+            return []
+        shared = np.bincount(np.concatenate(postings), minlength=len(self.keys))
+        sizes = np.frombuffer(self.sizes, dtype=np.int32)
+        ids = np.flatnonzero((shared >= max(1, ceil(min_score * len(query)))) & (sizes > 0))
+        shared = shared[ids]
+        closeness = shared / (len(query) + sizes[ids] - shared)
+        # Sorted by shared trigrams, then closeness (descending), then ID
+        order = np.lexsort((ids, -closeness, -shared))[:limit]
+        return [(self.keys[record_id], count / len(query)) for record_id, count in zip(ids[order].tolist(),
+                                                                                       shared[order].tolist())]
@@ -0,0 +1,332 @@
+# data/generator.py
+
+import argparse
+import csv
+import json
+import os
+import random
+import re
+from datetime import datetime, timedelta
+from data.data import IPCMSData
+from data.loader import dataset_path, load_dataset
+from utils.transformers import DataTransformer
+
+# Records per bulk insert when populating the controllers
+CHUNK_SIZE = 10000
+
+# A postcode format: literal characters and \d, each optionally repeated {n} times
+POSTCODE_TOKEN = re.compile(r'(\\d|[^\\{}^$])(?:\{(\d+)\})?')
+
+
+# Function: A random postcode matching a served country's postcode format (e.g. '^\d{4}$')
+def random_postcode(rng, postcode_format):
+    postcode = []
+    for token, repeat in POSTCODE_TOKEN.findall(postcode_format):
+        for _ in range(int(repeat or 1)):
+            postcode.append(str(rng.randrange(10)) if token == '\\d' else token)
+    return ''.join(postcode)
+
+
+# Class:: Deterministic synthetic datasets for scale testing. The same seed and sizes always give the same records,
+# in the formats the app checks (CheckValidator). Every dataset is drawn from its own random stream and produced one
+# record at a time, so any dataset can be regenerated alone and millions of records never have to fit in memory
+# (the orders only keep the product catalogue, the products the units ordered of each)
+class DatasetGenerator:
+    FIRST_NAMES = (
+        'Matthew', 'Brenda', 'James', 'Olivia', 'William', 'Ava', 'Lucas', 'Mia', 'Henry', 'Chloe', 'Jack', 'Grace',
+        'Noah', 'Ella', 'Oliver', 'Zoe', 'Ethan', 'Ruby', 'Liam', 'Isla', 'Wei', 'Mei', 'Arjun', 'Priya', 'Minh',
+        'Linh', 'Hafiz', 'Aisyah', 'Ka', 'Siu',
+    )
+    LAST_NAMES = (
+        'Contreras', 'Cannon', 'Smith', 'Jones', 'Williams', 'Brown', 'Wilson', 'Taylor', 'Johnson', 'White',
+        'Martin', 'Anderson', 'Thompson', 'Nguyen', 'Tran', 'Wang', 'Li', 'Zhang', 'Chen', 'Wong', 'Patel',
+        'Sharma', 'Singh', 'Tan', 'Lim', 'Abdullah', 'Rahman', 'Lee', 'Chan', 'Walker',
+    )
+    # Single words only, the city must be alphabetic
+    CITIES = {
+        'Australia': ('Melbourne', 'Sydney', 'Brisbane', 'Perth', 'Adelaide', 'Hobart', 'Darwin', 'Canberra'),
+        'Hong Kong': ('Kowloon', 'Central', 'Wanchai', 'Shatin', 'Aberdeen'),
+        'China': ('Beijing', 'Shanghai', 'Shenzhen', 'Guangzhou', 'Chengdu', 'Hangzhou'),
+        'Malaysia': ('Penang', 'Ipoh', 'Malacca', 'Putrajaya', 'Kuching'),
+        'Vietnam': ('Hanoi', 'Hue', 'Haiphong', 'Danang', 'Cantho'),
+        'India': ('Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Pune'),
+    }
+    DOMAINS = ('gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'example.com')
+    PRODUCT_LINES = (
+        ('EMO Robot', 'Personal'), ('Moxie Robot', 'Educational'), ('ROYBI Robot', 'Educational'),
+        ('Aibo Robot', 'Pet'), ('Lovot Robot', 'Love'), ('Vector Robot', 'Personal'),
+    )
+    PRODUCT_MODELS = ('Lite', 'Classic', 'Dream', 'Ultimate', 'Mini', 'Pro')
+    ORDER_STATUSES = ('Pending', 'Shipped', 'Delivered')
+    PAYMENT_METHODS = ('Credit Card', 'PayPal', 'Bank Transfer')
+    # Department -> its titles
+    TITLES = {
+        'IT Department': ('System Administrator', 'Developer', 'IT Manager'),
+        'HR Department': ('HR Manager', 'HR Specialist', 'Payroll Specialist'),
+        'Finance Department': ('Finance Manager', 'Accountant'),
+        'Sales Department': ('Sales Manager', 'Sales Executive', 'Sales Associate'),
+        'Logistics Solution': ('Logistics Manager', 'Shipping Coordinator', 'Flight Coordinator'),
+    }
+    # The first employee is the seed's administrator, so a generated dataset directory can be logged into
+    ADMIN_ID = 100000
+    # Customers, products and orders are created or updated in this period, the customers were born in the other
+    PERIOD = (datetime(2020, 1, 1), datetime(2024, 9, 1))
+    BIRTH_PERIOD = (datetime(1940, 1, 1), datetime(2005, 12, 31))
+
+    def __init__(self, seed=0, customers=10000, products=1000, orders=10000, employees=100, data_dir=None):
+        self.seed = seed
+        self.customer_count = customers
+        self.product_count = products
+        self.order_count = orders
+        self.employee_count = employees
+        # The reference tables (served countries and their postcode formats) of the seed, or of data_dir
+        self.data_dir = data_dir
+        self.reference = load_dataset('reference', data_dir)
+        self.countries = [country['Country'] for country in self.reference['served_countries']]
+        # CheckValidator.is_served_country() only accepts alphabetic names (not 'Hong Kong') for customers
+        self.customer_countries = [country for country in self.countries if country.isalpha()]
+        self.postcode_formats = self.reference['served_postcode_format']
+
+    # Read: the random stream of a dataset
+    def random(self, name):
+        return random.Random(f"{self.seed}:{name}")
+
+    # Read: a random datetime between `start` and `end`
+    @staticmethod
+    def random_datetime(rng, start, end):
+        return start + timedelta(seconds=rng.randrange(int((end - start).total_seconds())))
+
+    # Read: the created and updated times of a record (updated at or after created)
+    def random_timestamps(self, rng):
+        created_at = self.random_datetime(rng, *self.PERIOD)
+        updated_at = self.random_datetime(rng, created_at, self.PERIOD[1] + timedelta(seconds=1))
+        return created_at.strftime('%Y-%m-%d %H:%M:%S'), updated_at.strftime('%Y-%m-%d %H:%M:%S')
+
+    # Read: the email of the customer at `index`, unique and known without generating the customer
+    def customer_email(self, index):
+        return f"customer{index + 1}@{self.DOMAINS[index % len(self.DOMAINS)]}"
+
+    # Read: the product ID of the product at `index` ('001', '002', ... like the seed)
+    def product_id(self, index):
+        return f"{index + 1:0{max(3, len(str(self.product_count)))}d}"
+
+    # Create: customer records (dicts of create_customer's arguments)
+    def customers(self):
+        rng = self.random('customers')
+        for index in range(self.customer_count):
+            country = rng.choice(self.customer_countries)
+            created_at, updated_at = self.random_timestamps(rng)
+            yield {
+                'first_name': rng.choice(self.FIRST_NAMES),
+                'last_name': rng.choice(self.LAST_NAMES),
+                'dob': self.random_datetime(rng, *self.BIRTH_PERIOD).strftime('%Y-%m-%d'),
+                'email': self.customer_email(index),
+                'phone': f"0{rng.randrange(1000):03d}-{rng.randrange(1000):03d}-{rng.randrange(1000):03d}",
+                'country': country,
+                'city': rng.choice(self.CITIES.get(country, ('Metropolis',))),
+                'postcode': random_postcode(rng, self.postcode_formats[country]),
+                'created_at': created_at,
+                'updated_at': updated_at,
+            }
+
+    # Read: the catalogue records of the products, without their stock
+    def catalogue(self):
+        rng = self.random('products')
+        for index in range(self.product_count):
+            product_line, category = rng.choice(self.PRODUCT_LINES)
+            created_at, updated_at = self.random_timestamps(rng)
+            yield {
+                'product_id': self.product_id(index),
+                'product_name': f"{product_line} ({rng.choice(self.PRODUCT_MODELS)} {index + 1})",
+                'price': f"{rng.randrange(1999, 200000) / 100:.2f}",
+                'category': category,
+                'created_at': created_at,
+                'updated_at': updated_at,
+            }
+
+    # Read: the draws of every order, its lines as (product index, quantity), without needing the products
+    def order_draws(self):
+        rng = self.random('orders')
+        for index in range(self.order_count):
+            lines = [(product_index, rng.randint(1, 5)) for product_index in
+                     rng.sample(range(self.product_count), min(rng.randint(1, 4), self.product_count))]
+            created_at, updated_at = self.random_timestamps(rng)
+            yield (index, lines, created_at, updated_at, rng.choice(self.ORDER_STATUSES),
+                   rng.choice(self.PAYMENT_METHODS), rng.randrange(self.customer_count))
+
+    # Read: the units of each product (by index) the generated orders take
+    def ordered_quantities(self):
+        ordered = [0] * self.product_count
+        for _, lines, *_ in self.order_draws():
+            for product_index, quantity in lines:
+                ordered[product_index] += quantity
+        return ordered
+
+    # Create: product records (dicts of create_product's arguments). The stock covers every generated order plus
+    # headroom, so the orders can still take theirs when they are imported
+    def products(self):
+        ordered = self.ordered_quantities()
+        rng = self.random('stock')
+        for index, product in enumerate(self.catalogue()):
+            product['stock_quantity'] = str(ordered[index] + rng.randrange(100, 10000))
+            yield product
+
+    # Create: order records (dicts of create_order's arguments) of the generated customers and products, each
+    # line priced as its product
+    def orders(self):
+        catalogue = [(product['product_id'], product['product_name'], float(product['price']))
+                     for product in self.catalogue()]
+        width = max(4, len(str(self.order_count)))
+        for index, lines, created_at, updated_at, order_status, payment_method, customer_index in \
+                self.order_draws():
+            order_products = []
+            for product_index, quantity in lines:
+                product_id, product_name, price = catalogue[product_index]
+                order_products.append({
+                    'product_id': product_id, 'product_name': product_name, 'quantity': str(quantity),
+                    'price_per_unit': f"{price:.2f}", 'total_price': f"{quantity * price:.2f}",
+                })
+            yield {
+                'order_id': f"PO{index + 1:0{width}d}",
+                # DD-MM-YYYY, the day the order was created
+                'order_date': f"{created_at[8:10]}-{created_at[5:7]}-{created_at[:4]}",
+                'order_status': order_status,
+                'total_price': f"{sum(float(line['total_price']) for line in order_products):.2f}",
+                'order_products': order_products,
+                'payment_method': payment_method,
+                'customer_email': self.customer_email(customer_index),
+                'created_at': created_at,
+                'updated_at': updated_at,
+            }
+
+    # Create: employee records (as in employees.json), the administrator first
+    def employees(self):
+        rng = self.random('employees')
+        departments = list(self.TITLES)
+        for index in range(self.employee_count):
+            employee_id = self.ADMIN_ID + index
+            if index == 0:
+                yield {
+                    'EmployeeID': employee_id, 'Full Name': 'Admin User', 'Department': 'Administration',
+                    'Title': 'Administrator', 'Base Yearly Salary': 150000, 'Country': 'Australia',
+                    'System Access Level': 'Admin', 'Workstation Name': 'WS-Admin',
+                }
+                continue
+            department = rng.choice(departments)
+            yield {
+                'EmployeeID': employee_id,
+                'Full Name': f"{rng.choice(self.FIRST_NAMES)} {rng.choice(self.LAST_NAMES)}",
+                'Department': department,
+                'Title': rng.choice(self.TITLES[department]),
+                'Base Yearly Salary': rng.randrange(4000000, 20000000) / 100,
+                'Country': rng.choice(self.countries),
+                'System Access Level': 'Admin' if rng.random() < 0.1 else 'User',
+                'Workstation Name': f"WS-{employee_id}",
+            }
+
+    # Create: the employees' logins ({employee ID: {'Login Name', 'Password'}}, as in employee_logins.json)
+    def employee_logins(self):
+        rng = self.random('employee_logins')
+        characters = 'ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz23456789'
+        logins = {}
+        for employee in self.employees():
+            employee_id = employee['EmployeeID']
+            if employee_id == self.ADMIN_ID:
+                logins[employee_id] = {'Login Name': 'admin', 'Password': 'admin123'}
+                continue
+            first_name, last_name = employee['Full Name'].split(' ', 1)
+            logins[employee_id] = {
+                'Login Name': f"{first_name[0]}{last_name}{employee_id}".lower(),
+                'Password': ''.join(rng.choice(characters) for _ in range(8)),
+            }
+        return logins
+
+    # Create: one payslip per employee, calculated as CreateOperations.create_payslip does with the tax and
+    # currency tables of `ipcms_data` (the payslip ID is the employee ID)
+    def payslips(self, ipcms_data):
+        transformer = DataTransformer(ipcms_data)
+        for employee in self.employees():
+            yield transformer.payslip(employee['EmployeeID'], employee)
+
+    # Save: a JSON array written one record at a time
+    @staticmethod
+    def write_json(path, records):
+        with open(path, 'w') as file:
+            file.write('[')
+            separator = '\n'
+            for record in records:
+                file.write(separator)
+                file.write(json.dumps(record))
+                separator = ',\n'
+            file.write('\n]\n')
+
+    # Save: a dataset directory in the layout of data/seed, for `main.py --data <directory>` (with the reference
+    # tables of the seed, or of data_dir)
+    def write_datasets(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.write_json(dataset_path('customers', directory), self.customers())
+        self.write_json(dataset_path('products', directory), self.products())
+        self.write_json(dataset_path('orders', directory), self.orders())
+        self.write_json(dataset_path('employees', directory), self.employees())
+        with open(dataset_path('employee_logins', directory), 'w') as file:
+            json.dump(self.employee_logins(), file, indent=4)
+        with open(dataset_path('reference', directory), 'w') as file:
+            json.dump(self.reference, file, indent=4)
+
+    # Save: customers.csv, products.csv and orders.json, in the layout ImportOperations reads from the working
+    # directory (the customer and product CSV headers of IPCMSData.custom_headers)
+    def write_import_files(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        headers = IPCMSData(data_dir=self.data_dir).custom_headers
+        renamed = {'postcode': 'pc', 'product_id': 'pid', 'stock_quantity': 'qty'}
+        with open(os.path.join(directory, 'customers.csv'), 'w', newline='') as file:
+            csv_writer = csv.DictWriter(file, fieldnames=headers['customers'])
+            csv_writer.writeheader()
+            for number, customer in enumerate(self.customers(), 1):
+                row = {renamed.get(field, field): value for field, value in customer.items()}
+                row['No.'] = number
+                csv_writer.writerow(row)
+        with open(os.path.join(directory, 'products.csv'), 'w', newline='') as file:
+            csv_writer = csv.DictWriter(file, fieldnames=headers['products'])
+            csv_writer.writeheader()
+            csv_writer.writerows({renamed.get(field, field): value for field, value in product.items()}
+                                 for product in self.products())
+        self.write_json(os.path.join(directory, 'orders.json'), self.orders())
+
+    # Load: the generated records into the controllers with bulk inserts of `chunk_size` records (the orders have
+    # already taken their stock), and the payslips into ipcms_data's payslip table and storage when it is given
+    def populate(self, customer_manager, product_manager, order_manager, ipcms_data=None, chunk_size=CHUNK_SIZE):
+        for records, create_bulk in ((self.customers(), customer_manager.create_customers_bulk),
+                                     (self.products(), product_manager.create_products_bulk),
+                                     (self.orders(), lambda chunk: order_manager.create_orders_bulk(chunk, False))):
+            chunk = []
+            for record in records:
+                chunk.append(record)
+                if len(chunk) == chunk_size:
+                    create_bulk(chunk)
+                    chunk = []
+            if chunk:
+                create_bulk(chunk)
+        if ipcms_data is not None:
+            with ipcms_data.storage.batch():
+                for payslip in self.payslips(ipcms_data):
+                    ipcms_data.payslip_table.append(payslip)
+                    ipcms_data.storage.save_payslip(payslip)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic IPCMS datasets for scale testing")
+    parser.add_argument("directory", help="Directory to write the dataset files to")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--customers", type=int, default=10000, help="Number of customers (default: 10000)")
+    parser.add_argument("--products", type=int, default=1000, help="Number of products (default: 1000)")
+    parser.add_argument("--orders", type=int, default=10000, help="Number of orders (default: 10000)")
+    parser.add_argument("--employees", type=int, default=100, help="Number of employees (default: 100)")
+    parser.add_argument("--import-files", action="store_true",
+                        help="Write customers.csv, products.csv and orders.json for the import menu instead")
+    args = parser.parse_args()
+    generator = DatasetGenerator(args.seed, args.customers, args.products, args.orders, args.employees)
+    if args.import_files:
+        generator.write_import_files(args.directory)
+    else:
+        generator.write_datasets(args.directory)
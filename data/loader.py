@@ -0,0 +1,68 @@
+# data/loader.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+# Directory of the seed and reference datasets shipped with the app
+SEED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'seed')
+
+# Whitespace and the comma between two records of a dataset
+SEPARATOR = re.compile(r'\s*,?\s*')
+# Records per list yielded by iter_dataset()
+CHUNK_SIZE = 10000
+
+# path -> (modification time, size, SHA-256 of the content, parsed data)
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+# Function: Path of a dataset (<directory>/<name>.json)
+def dataset_path(name, directory=None):
+    return os.path.join(directory or SEED_DIR, f"{name}.json")
+
+
+# Load: The parsed content of a dataset, read once and cached. The file is only hashed again when its
+# modification time or size changes, and only parsed again when its hash changes. The data is shared by every
+# caller: read it, or copy what you change
+def load_dataset(name, directory=None):
+    path = os.path.abspath(dataset_path(name, directory))
+    stat = os.stat(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[3]
+        with open(path, 'rb') as file:
+            content = file.read()
+        digest = hashlib.sha256(content).hexdigest()
+        if cached is not None and cached[2] == digest:
+            # Touched but not changed
+            data = cached[3]
+        else:
+            data = json.loads(content)
+        _cache[path] = (stat.st_mtime_ns, stat.st_size, digest, data)
+        return data
+
+
+# Load: The records of a dataset (a JSON array) in lists of `chunk_size`, parsed one record at a time and not
+# cached, so only the file's text and one chunk of records are held at once
+def iter_dataset(name, directory=None, chunk_size=CHUNK_SIZE):
+    with open(dataset_path(name, directory), encoding='utf-8') as file:
+        text = file.read()
+    decoder = json.JSONDecoder()
+    position = SEPARATOR.match(text).end()
+    if text[position:position + 1] != '[':
+        raise ValueError(f"Dataset '{name}' is not a JSON array.")
+    position = SEPARATOR.match(text, position + 1).end()
+    chunk = []
+    while text[position:position + 1] != ']':
+        record, position = decoder.raw_decode(text, position)
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+        position = SEPARATOR.match(text, position).end()
+    if chunk:
+        yield chunk
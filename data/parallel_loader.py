@@ -0,0 +1,155 @@
+# data/parallel_loader.py
+
+import logging
+import multiprocessing
+import os
+from controllers.controllers import CustomerController, ProductController
+from data.loader import dataset_path, load_dataset
+from models.models import Customer, Product, Order
+from utils.utils import paused_gc
+
+# Datasets seeding the controllers, in commit order (products before the orders checked against them)
+ENTITY_DATASETS = ('customers', 'products', 'orders')
+
+
+# Function: Worker side, the customers of a chunk of records as rows keyed by email, and the chunk's summary
+def customer_rows(records):
+    accepted, summary = CustomerController.build_customers(records)
+    return {email: customer.to_row() for email, customer in accepted.items()}, summary
+
+
+# Function: Worker side, the products of a chunk of records as rows keyed by product key, and the chunk's summary
+def product_rows(records):
+    accepted, summary = ProductController.build_products(records)
+    return {product_key: product.to_row() for product_key, product in accepted.items()}, summary
+
+
+# Function: Worker side, the orders of a chunk of records as rows, and the chunk's summary. The biggest dataset
+# is converted straight to rows, building the orders here would cost as much as building them again
+def order_rows(records):
+    rows = []
+    summary = {'inserted': 0, 'updated': 0, 'rejected': 0}
+    for data in records:
+        try:
+            rows.append(Order.row_from_record(data))
+        except (KeyError, TypeError, ValueError) as e:
+            logging.error(f"Error adding order '{data.get('order_id')}' - {str(e)}")
+            summary['rejected'] += 1
+    return rows, summary
+
+
+# dataset -> worker function building the rows of a chunk
+ENTITY_ROWS = {
+    'customers': customer_rows,
+    'products': product_rows,
+    'orders': order_rows,
+}
+
+
+# Function: Worker process: parse a dataset and send it to `connection` chunk by chunk (the pipe blocks while the
+# loader is behind, so only a few chunks are ever in flight), then None, or the exception that stopped it
+def send_rows(name, data_dir, chunk_size, connection):
+    build_rows = ENTITY_ROWS[name]
+    try:
+        records = load_dataset(name, data_dir)
+        for start in range(0, len(records), chunk_size):
+            connection.send(build_rows(records[start:start + chunk_size]))
+        connection.send(None)
+    except Exception as e:
+        connection.send(e)
+    finally:
+        connection.close()
+
+
+# Class:: Seed the controllers from the dataset files. With big datasets and several cores, each dataset is parsed
+# and validated in its own worker process while this one rebuilds the objects of the chunks already received, then
+# commits each dataset once, in order. The objects have to be built in this process, so the start-up time comes
+# close to the largest dataset's rather than the sum of all three
+class ParallelLoader:
+    # Below this many bytes of datasets, starting the worker processes costs more than it saves
+    PARALLEL_MIN_BYTES = 4 << 20
+    # Records per chunk sent back by a worker
+    CHUNK_SIZE = 10000
+
+    def __init__(self, customer_manager, product_manager, order_manager, data_dir=None):
+        self.customer_manager = customer_manager
+        self.product_manager = product_manager
+        self.order_manager = order_manager
+        self.data_dir = data_dir
+
+    # Read: Number of cores this process may run on
+    @staticmethod
+    def cpu_count():
+        if hasattr(os, 'sched_getaffinity'):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+
+    # Read: Whether the datasets are big enough for worker processes, and there are cores to run them
+    def use_workers(self):
+        size = sum(os.path.getsize(dataset_path(name, self.data_dir)) for name in ENTITY_DATASETS)
+        return size >= self.PARALLEL_MIN_BYTES and self.cpu_count() > 1
+
+    # Load: The three datasets into the controllers, in worker processes unless `parallel` is False (by default
+    # when use_workers() says so). The orders have already taken their stock unless `reserve_stock` is set
+    def load(self, parallel=None, reserve_stock=False):
+        if parallel is None:
+            parallel = self.use_workers()
+        if not parallel:
+            self.customer_manager.create_customers_bulk(load_dataset('customers', self.data_dir))
+            self.product_manager.create_products_bulk(load_dataset('products', self.data_dir))
+            self.order_manager.create_orders_bulk(load_dataset('orders', self.data_dir), reserve_stock)
+            return
+        workers = {}
+        try:
+            for name in ENTITY_DATASETS:
+                receiving, sending = multiprocessing.Pipe(duplex=False)
+                worker = multiprocessing.Process(
+                    target=send_rows, args=(name, self.data_dir, self.CHUNK_SIZE, sending), daemon=True)
+                worker.start()
+                sending.close()
+                workers[name] = (worker, receiving)
+            # The customers are rebuilt and committed while the orders are still being parsed
+            self.customer_manager.commit_customers(*self.receive(workers['customers'][1], Customer))
+            self.product_manager.commit_products(*self.receive(workers['products'][1], Product))
+            self.order_manager.commit_orders(*self.receive(workers['orders'][1], Order, keyed=False),
+                                             reserve_stock=reserve_stock)
+        finally:
+            for worker, receiving in workers.values():
+                receiving.close()
+                worker.join(1)
+                if worker.is_alive():
+                    worker.terminate()
+
+    # Load: Adopt the objects EnterpriseData built from datasets known to be valid, in this process: nothing is
+    # checked or built again
+    def adopt(self, enterprise_data, reserve_stock=False):
+        # Only new objects are created, so skip the cyclic GC passes they would trigger
+        with paused_gc():
+            self.customer_manager.create_customers_bulk(enterprise_data.customers, trusted=True)
+            self.product_manager.create_products_bulk(enterprise_data.products, trusted=True)
+            self.order_manager.create_orders_bulk(enterprise_data.orders, reserve_stock, trusted=True)
+
+    # Load: Rebuild the objects of a worker's chunks as they arrive, with the summary of the whole dataset. Keyed
+    # rows (customers, products) are merged with the last record winning for a repeated key (counted as updated),
+    # as in one build_*() call, the orders stay a list matched by order ID when committed
+    @staticmethod
+    def receive(receiving, model, keyed=True):
+        built = {} if keyed else []
+        summary = {'inserted': 0, 'updated': 0, 'rejected': 0}
+        while True:
+            chunk = receiving.recv()
+            if chunk is None:
+                return built, summary
+            if isinstance(chunk, Exception):
+                raise chunk
+            rows, chunk_summary = chunk
+            summary['updated'] += chunk_summary['updated']
+            summary['rejected'] += chunk_summary['rejected']
+            # The rows were checked by the worker, so they are rebuilt column by column
+            if not keyed:
+                built.extend(model.from_rows(rows))
+                continue
+            for key, item in zip(rows, model.from_rows(list(rows.values()))):
+                if key in built:
+                    summary['updated'] += 1
+                built[key] = item
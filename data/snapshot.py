@@ -0,0 +1,85 @@
+# data/snapshot.py
+
+from itertools import accumulate
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+from models.models import Customer, Product, OrderedProduct, Order, build_models
+from utils.utils import paused_gc
+
+
+# Function: Split model objects into {field: [values]} columns (public values, never category codes)
+def to_columns(model_class, objects, fields=None):
+    return {field: [getattr(obj, field) for obj in objects] for field in fields or model_class.FIELDS}
+
+
+# Class:: Compact binary snapshot of the full controller state, loaded back through mmap
+class Snapshot:
+    MAGIC = b"IPCMSSNP"
+    VERSION = 1
+    HEADER = struct.Struct("<8sI")
+    ORDER_FIELDS = tuple(field for field in Order.FIELDS if field != 'order_products')
+
+    def __init__(self, path):
+        self.path = path
+
+    # Read: whether a snapshot file exists
+    def exists(self):
+        return os.path.exists(self.path)
+
+    # Save: dump customers, products, orders, payslips and the currency table
+    def save(self, customer_manager, product_manager, order_manager, ipcms_data):
+        orders = order_manager.get_all_orders()
+        payload = {
+            'customers': to_columns(Customer, customer_manager.get_all_customers()),
+            'products': to_columns(Product, product_manager.get_all_products()),
+            'orders': to_columns(Order, orders, self.ORDER_FIELDS),
+            'line_counts': [len(order.order_products) for order in orders],
+            'lines': to_columns(OrderedProduct, [op for order in orders for op in order.order_products]),
+            'payslips': list(ipcms_data.payslip_table),
+            'currency_conversion_table': [dict(each_data) for each_data in ipcms_data.currency_conversion_table],
+        }
+        # Write to a temporary file of its own first, so a crash never leaves a half-written snapshot behind and
+        # two snapshots saved at once never write into the same file
+        directory, name = os.path.split(os.path.abspath(self.path))
+        snapshot_fd, temp_path = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(snapshot_fd, 'wb') as snapshot_file:
+                snapshot_file.write(self.HEADER.pack(self.MAGIC, self.VERSION))
+                pickle.dump(payload, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    # Load: restore the controllers and IPCMSData from the snapshot, skipping validation
+    def load(self, customer_manager, product_manager, order_manager, ipcms_data):
+        with open(self.path, 'rb') as snapshot_file, \
+                mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, version = self.HEADER.unpack_from(mapped)
+            if magic != self.MAGIC or version != self.VERSION:
+                raise ValueError(f"'{self.path}' is not a supported IPCMS snapshot.")
+            with memoryview(mapped) as view, view[self.HEADER.size:] as body:
+                payload = pickle.loads(body)
+
+        # Only new objects are created below, so skip the cyclic GC passes they would trigger
+        with paused_gc():
+            products = build_models(Product, payload['products'], len(payload['products']['product_id']))
+            product_manager.restore_products(products)
+
+            line_counts = payload['line_counts']
+            lines = build_models(OrderedProduct, payload['lines'], sum(line_counts))
+            offsets = list(accumulate(line_counts, initial=0))
+            order_columns = payload['orders']
+            order_columns['order_products'] = [lines[start:stop] for start, stop in zip(offsets, offsets[1:])]
+            order_manager.restore_orders(build_models(Order, order_columns, len(line_counts)))
+
+            customers = build_models(Customer, payload['customers'], len(payload['customers']['email']))
+            customer_manager.restore_customers(customers)
+
+        ipcms_data.payslip_table[:] = payload['payslips']
+        ipcms_data.currency_conversion_table = tuple(payload['currency_conversion_table'])
@@ -0,0 +1,314 @@
+# data/storage.py
+
+from contextlib import contextmanager
+import json
+import sqlite3
+import threading
+from models.models import Customer, Product, OrderedProduct, Order
+
+
+# Class:: Storage backend interface, the default keeps everything in process memory only
+class StorageBackend:
+    # Whether a snapshot plus replay() restores the backend's data, or the backend has to be loaded itself
+    SNAPSHOT_RESTORES = True
+
+    # Read: whether the backend holds no data yet
+    def is_empty(self):
+        return True
+
+    # Load: stored records, in insertion order
+    def load_customers(self):
+        return []
+
+    def load_products(self):
+        return []
+
+    def load_orders(self):
+        return []
+
+    def load_payslips(self):
+        return []
+
+    # Save: insert or replace a record
+    def save_customer(self, customer):
+        pass
+
+    def save_product(self, product):
+        pass
+
+    def save_order(self, order):
+        pass
+
+    def save_payslip(self, payslip):
+        pass
+
+    # Save: insert or replace many records (one call per record unless a backend does better)
+    def save_customers(self, customers):
+        with self.batch():
+            for customer in customers:
+                self.save_customer(customer)
+
+    def save_products(self, products):
+        with self.batch():
+            for product in products:
+                self.save_product(product)
+
+    def save_orders(self, orders):
+        with self.batch():
+            for order in orders:
+                self.save_order(order)
+
+    # Delete: remove records
+    def delete_customer(self, email):
+        pass
+
+    def delete_order(self, order_id):
+        pass
+
+    def delete_orders_by_customer_email(self, customer_email):
+        pass
+
+    def delete_payslip(self, payslip_id):
+        pass
+
+    # Batch: group every write inside the block into one transaction
+    @contextmanager
+    def batch(self):
+        yield self
+
+    # Load: apply the changes made since the last snapshot (nothing to do for a full copy of the data)
+    def replay(self, customer_manager, product_manager, order_manager, ipcms_data):
+        return 0
+
+    # Save: write a snapshot with `snapshot_writer`, letting the backend drop what the snapshot covers
+    def checkpoint(self, snapshot_writer):
+        snapshot_writer()
+
+    # Close: release the backend's resources
+    def close(self):
+        pass
+
+
+# Class:: SQLite storage backend (stdlib sqlite3)
+class SQLiteStorage(StorageBackend):
+    # The database is the data: a snapshot only holds what it had when written
+    SNAPSHOT_RESTORES = False
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS customers (
+            email TEXT PRIMARY KEY, first_name TEXT, last_name TEXT, dob TEXT, phone TEXT,
+            country TEXT, city TEXT, postcode TEXT, created_at TEXT, updated_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS products (
+            product_id TEXT PRIMARY KEY, product_name TEXT, price REAL, category TEXT,
+            stock_quantity INTEGER, created_at TEXT, updated_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS orders (
+            order_id TEXT PRIMARY KEY, order_date TEXT, order_status TEXT, total_price REAL,
+            payment_method TEXT, created_at TEXT, updated_at TEXT, customer_email TEXT
+        );
+        CREATE TABLE IF NOT EXISTS order_lines (
+            order_id TEXT NOT NULL, line_no INTEGER NOT NULL, product_id TEXT, product_name TEXT,
+            quantity INTEGER, price_per_unit REAL, total_price REAL,
+            PRIMARY KEY (order_id, line_no)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS payslips (
+            id INTEGER PRIMARY KEY, employee_id INTEGER, payslip TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_orders_customer_email ON orders (customer_email);
+        CREATE INDEX IF NOT EXISTS idx_orders_order_date ON orders (order_date);
+        CREATE INDEX IF NOT EXISTS idx_order_lines_product_id ON order_lines (product_id);
+        CREATE INDEX IF NOT EXISTS idx_payslips_employee_id ON payslips (employee_id);
+    """
+
+    # Parameterised statements are kept as constants so sqlite3's statement cache reuses them
+    UPSERT_CUSTOMER = """
+        INSERT INTO customers (email, first_name, last_name, dob, phone, country, city, postcode,
+                               created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (email) DO UPDATE SET
+            first_name = excluded.first_name, last_name = excluded.last_name, dob = excluded.dob,
+            phone = excluded.phone, country = excluded.country, city = excluded.city,
+            postcode = excluded.postcode, created_at = excluded.created_at, updated_at = excluded.updated_at
+    """
+    UPSERT_PRODUCT = """
+        INSERT INTO products (product_id, product_name, price, category, stock_quantity, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (product_id) DO UPDATE SET
+            product_name = excluded.product_name, price = excluded.price, category = excluded.category,
+            stock_quantity = excluded.stock_quantity, created_at = excluded.created_at,
+            updated_at = excluded.updated_at
+    """
+    UPSERT_ORDER = """
+        INSERT INTO orders (order_id, order_date, order_status, total_price, payment_method,
+                            created_at, updated_at, customer_email)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (order_id) DO UPDATE SET
+            order_date = excluded.order_date, order_status = excluded.order_status,
+            total_price = excluded.total_price, payment_method = excluded.payment_method,
+            created_at = excluded.created_at, updated_at = excluded.updated_at,
+            customer_email = excluded.customer_email
+    """
+    INSERT_ORDER_LINE = """
+        INSERT INTO order_lines (order_id, line_no, product_id, product_name, quantity, price_per_unit, total_price)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+    UPSERT_PAYSLIP = "INSERT OR REPLACE INTO payslips (id, employee_id, payslip) VALUES (?, ?, ?)"
+    DELETE_CUSTOMER = "DELETE FROM customers WHERE email = ?"
+    DELETE_ORDER = "DELETE FROM orders WHERE order_id = ?"
+    DELETE_ORDER_LINES = "DELETE FROM order_lines WHERE order_id = ?"
+    DELETE_CUSTOMER_ORDER_LINES = """
+        DELETE FROM order_lines WHERE order_id IN (SELECT order_id FROM orders WHERE customer_email = ?)
+    """
+    DELETE_CUSTOMER_ORDERS = "DELETE FROM orders WHERE customer_email = ?"
+    DELETE_PAYSLIP = "DELETE FROM payslips WHERE id = ?"
+
+    def __init__(self, path):
+        self.path = path
+        # Autocommit mode, transactions are opened explicitly by batch()
+        self.connection = sqlite3.connect(path, isolation_level=None, cached_statements=256,
+                                          check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(self.SCHEMA)
+        # The connection is shared: a thread holds the lock for its whole transaction (innermost lock, taken
+        # after any controller lock)
+        self.lock = threading.RLock()
+        self.batch_depth = 0
+
+    # Read: whether the database holds no data yet
+    def is_empty(self):
+        for table in ('customers', 'products', 'orders', 'payslips'):
+            if self.connection.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                return False
+        return True
+
+    # Batch: group every write inside the block into one transaction, rolled back on error
+    @contextmanager
+    def batch(self):
+        with self.lock:
+            if self.batch_depth == 0:
+                self.connection.execute("BEGIN")
+            self.batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self.batch_depth -= 1
+                if self.batch_depth == 0:
+                    self.connection.execute("ROLLBACK")
+                raise
+            self.batch_depth -= 1
+            if self.batch_depth == 0:
+                self.connection.execute("COMMIT")
+
+    # Load: customers in insertion order
+    def load_customers(self):
+        rows = self.connection.execute(
+            "SELECT first_name, last_name, dob, email, phone, country, city, postcode, created_at, updated_at "
+            "FROM customers ORDER BY rowid")
+        return [Customer(*row) for row in rows]
+
+    # Load: products in insertion order
+    def load_products(self):
+        rows = self.connection.execute(
+            "SELECT product_id, product_name, price, category, stock_quantity, created_at, updated_at "
+            "FROM products ORDER BY rowid")
+        return [Product(*row) for row in rows]
+
+    # Load: orders in insertion order, with their lines
+    def load_orders(self):
+        order_lines = {}
+        for order_id, *line in self.connection.execute(
+                "SELECT order_id, product_id, product_name, quantity, price_per_unit, total_price "
+                "FROM order_lines ORDER BY order_id, line_no"):
+            order_lines.setdefault(order_id, []).append(OrderedProduct(*line))
+        rows = self.connection.execute(
+            "SELECT order_id, order_date, order_status, total_price, payment_method, created_at, updated_at, "
+            "customer_email FROM orders ORDER BY rowid")
+        return [
+            Order(order_id, order_date, order_status, total_price, order_lines.get(order_id, []),
+                  payment_method, created_at, updated_at, customer_email)
+            for order_id, order_date, order_status, total_price, payment_method, created_at, updated_at,
+            customer_email in rows
+        ]
+
+    # Load: payslips in insertion order
+    def load_payslips(self):
+        return [json.loads(row[0]) for row in self.connection.execute("SELECT payslip FROM payslips ORDER BY rowid")]
+
+    # Save: insert or update a customer
+    def save_customer(self, customer):
+        self.save_customers([customer])
+
+    # Save: insert or update a product
+    def save_product(self, product):
+        self.save_products([product])
+
+    # Save: insert or update an order and replace its lines
+    def save_order(self, order):
+        self.save_orders([order])
+
+    # Save: insert or update many customers with one statement
+    def save_customers(self, customers):
+        with self.batch():
+            self.connection.executemany(self.UPSERT_CUSTOMER, [
+                (customer.email, customer.first_name, customer.last_name, customer.dob, customer.phone,
+                 customer.country, customer.city, customer.postcode, customer.created_at, customer.updated_at)
+                for customer in customers
+            ])
+
+    # Save: insert or update many products with one statement
+    def save_products(self, products):
+        with self.batch():
+            self.connection.executemany(self.UPSERT_PRODUCT, [
+                (product.product_id, product.product_name, product.price, product.category,
+                 product.stock_quantity, product.created_at, product.updated_at)
+                for product in products
+            ])
+
+    # Save: insert or update many orders and replace their lines
+    def save_orders(self, orders):
+        orders = list(orders)
+        with self.batch():
+            self.connection.executemany(self.UPSERT_ORDER, [
+                (order.order_id, order.order_date, order.order_status, order.total_price, order.payment_method,
+                 order.created_at, order.updated_at, order.customer_email)
+                for order in orders
+            ])
+            self.connection.executemany(self.DELETE_ORDER_LINES, [(order.order_id,) for order in orders])
+            self.connection.executemany(self.INSERT_ORDER_LINE, [
+                (order.order_id, line_no, op.product_id, op.product_name, op.quantity, op.price_per_unit,
+                 op.total_price)
+                for order in orders
+                for line_no, op in enumerate(order.order_products)
+            ])
+
+    # Save: insert or replace a payslip
+    def save_payslip(self, payslip):
+        with self.batch():
+            self.connection.execute(self.UPSERT_PAYSLIP, (payslip["ID"], payslip["EmployeeID"], json.dumps(payslip)))
+
+    # Delete: a customer
+    def delete_customer(self, email):
+        with self.batch():
+            self.connection.execute(self.DELETE_CUSTOMER, (email,))
+
+    # Delete: an order and its lines
+    def delete_order(self, order_id):
+        with self.batch():
+            self.connection.execute(self.DELETE_ORDER_LINES, (order_id,))
+            self.connection.execute(self.DELETE_ORDER, (order_id,))
+
+    # Delete: all orders (and lines) of a customer
+    def delete_orders_by_customer_email(self, customer_email):
+        with self.batch():
+            self.connection.execute(self.DELETE_CUSTOMER_ORDER_LINES, (customer_email,))
+            self.connection.execute(self.DELETE_CUSTOMER_ORDERS, (customer_email,))
+
+    # Delete: a payslip
+    def delete_payslip(self, payslip_id):
+        with self.batch():
+            self.connection.execute(self.DELETE_PAYSLIP, (payslip_id,))
+
+    # Close: the database connection
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,225 @@
+# data/wal.py
+
+from contextlib import contextmanager
+import logging
+import os
+import pickle
+import struct
+import threading
+import zlib
+from models.models import Customer, Product, Order
+from data.storage import StorageBackend
+
+
+# Class:: Append-only write-ahead log of every controller mutation, replayed on top of the last snapshot
+class WriteAheadLog(StorageBackend):
+    # Record header: payload length and CRC32, a torn or corrupt tail is detected and dropped on replay
+    RECORD_HEADER = struct.Struct("<II")
+
+    # Records carry the full new state (or the key of a delete), so replaying one twice is harmless and a
+    # snapshot taken while writes continue is still valid: the records logged after it overwrite it on replay
+    def __init__(self, path, group_size=64, flush_interval=0.05, compact_bytes=64 * 1024 * 1024):
+        self.path = path
+        # While a compaction runs, the records it covers live here until the new snapshot is on disk
+        self.compacting_path = f"{path}.compacting"
+        # Group commit: fsync once per `group_size` records or every `flush_interval` seconds
+        self.group_size = group_size
+        self.flush_interval = flush_interval
+        # Log size that triggers a background compaction (snapshot + truncate), when a snapshot writer is set
+        self.compact_bytes = compact_bytes
+        self.snapshot_writer = None
+        self.lock = threading.RLock()
+        # Held for a whole checkpoint (rotate, snapshot, drop), so a compaction and a saved snapshot never overlap
+        self.checkpoint_lock = threading.Lock()
+        self.batch_depth = 0
+        self.unsynced = 0
+        self.replaying = False
+        self.compaction = None
+        self.log_file = open(path, 'ab')
+        self.stopped = threading.Event()
+        self.flusher = threading.Thread(target=self.flush_periodically, name="wal-flusher", daemon=True)
+        self.flusher.start()
+
+    # Read: whether no records have been logged since the last compaction
+    def is_empty(self):
+        return not any(os.path.exists(path) and os.path.getsize(path)
+                       for path in (self.compacting_path, self.path))
+
+    # Read: current size of the log in bytes
+    def size(self):
+        with self.lock:
+            return self.log_file.tell()
+
+    # Save: append one record (buffered, made durable by the next group commit)
+    def append(self, entity, action, data):
+        if self.replaying:
+            return
+        payload = pickle.dumps((entity, action, data), protocol=pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.log_file.write(self.RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+            self.log_file.write(payload)
+            self.unsynced += 1
+            if self.batch_depth == 0 and self.unsynced >= self.group_size:
+                self.sync()
+            log_size = self.log_file.tell()
+        if log_size >= self.compact_bytes:
+            self.compact_in_background()
+
+    # Save: flush the buffered records and fsync them to disk
+    def sync(self):
+        with self.lock:
+            if self.log_file.closed:
+                return
+            self.log_file.flush()
+            os.fsync(self.log_file.fileno())
+            self.unsynced = 0
+
+    # Save: background group commit, bounds how much a crash can lose to `flush_interval` seconds
+    def flush_periodically(self):
+        while not self.stopped.wait(self.flush_interval):
+            if self.unsynced:
+                self.sync()
+
+    # Batch: one fsync for every record written inside the block
+    @contextmanager
+    def batch(self):
+        with self.lock:
+            self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self.batch_depth -= 1
+                if self.batch_depth == 0 and self.unsynced:
+                    self.sync()
+
+    # Save: the mutations logged by the controllers and the payslip table
+    def save_customer(self, customer):
+        self.append('customer', 'save', customer.to_dict())
+
+    def save_product(self, product):
+        self.append('product', 'save', product.to_dict())
+
+    def save_order(self, order):
+        self.append('order', 'save', order.to_dict())
+
+    def save_payslip(self, payslip):
+        self.append('payslip', 'save', dict(payslip))
+
+    # Delete: the mutations logged by the controllers and the payslip table
+    def delete_customer(self, email):
+        self.append('customer', 'delete', email)
+
+    def delete_order(self, order_id):
+        self.append('order', 'delete', order_id)
+
+    def delete_orders_by_customer_email(self, customer_email):
+        self.append('order', 'delete_by_customer', customer_email)
+
+    def delete_payslip(self, payslip_id):
+        self.append('payslip', 'delete', payslip_id)
+
+    # Read: the logged records in order, stopping at the first torn or corrupt one
+    def read_records(self, path):
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as log_file:
+            good_offset = 0
+            while True:
+                header = log_file.read(self.RECORD_HEADER.size)
+                if len(header) < self.RECORD_HEADER.size:
+                    break
+                length, checksum = self.RECORD_HEADER.unpack(header)
+                payload = log_file.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                good_offset = log_file.tell()
+                yield pickle.loads(payload)
+            if good_offset < os.path.getsize(path):
+                logging.warning(f"Dropping a torn record at the end of '{path}' (offset {good_offset}).")
+        if good_offset < os.path.getsize(path):
+            # Cut the bad tail so records appended from now on are readable again
+            with open(path, 'r+b') as log_file:
+                log_file.truncate(good_offset)
+
+    # Load: apply the logged records on top of the current (snapshot) state, without logging them again
+    def replay(self, customer_manager, product_manager, order_manager, ipcms_data):
+        with self.lock:
+            self.log_file.flush()
+            self.replaying = True
+            try:
+                count = 0
+                for path in (self.compacting_path, self.path):
+                    for entity, action, data in self.read_records(path):
+                        self.apply(entity, action, data, customer_manager, product_manager, order_manager,
+                                   ipcms_data)
+                        count += 1
+            finally:
+                self.replaying = False
+        return count
+
+    # Load: apply one logged record (deleted orders give no stock back, the product records logged after them
+    # hold it)
+    @staticmethod
+    def apply(entity, action, data, customer_manager, product_manager, order_manager, ipcms_data):
+        if entity == 'customer':
+            if action == 'save':
+                customer_manager.restore_customers([Customer(**data)])
+            else:
+                customer_manager.delete_customer_by_email(data, return_stock=False)
+        elif entity == 'product':
+            product_manager.restore_products([Product(**data)])
+        elif entity == 'order':
+            if action == 'save':
+                order_manager.restore_orders([Order(**data)])
+            elif action == 'delete':
+                order_manager.delete_order_by_id(data, return_stock=False)
+            else:
+                order_manager.delete_orders_by_customer_email(data, return_stock=False)
+        elif entity == 'payslip':
+            payslip_id = data["ID"] if action == 'save' else data
+            ipcms_data.payslip_table[:] = [
+                payslip for payslip in ipcms_data.payslip_table if payslip["ID"] != payslip_id
+            ]
+            if action == 'save':
+                ipcms_data.payslip_table.append(data)
+
+    # Save: write a snapshot with `snapshot_writer` and drop the records it covers (one checkpoint at a time,
+    # a second one waits for the first)
+    def checkpoint(self, snapshot_writer):
+        with self.checkpoint_lock:
+            with self.lock:
+                # Rotate: later records go to a fresh log while the snapshot is written
+                self.sync()
+                self.log_file.close()
+                if os.path.exists(self.compacting_path):
+                    # A previous compaction did not finish, keep its records until this one does
+                    with open(self.compacting_path, 'ab') as compacting_file, open(self.path, 'rb') as log_file:
+                        compacting_file.write(log_file.read())
+                        compacting_file.flush()
+                        os.fsync(compacting_file.fileno())
+                    os.remove(self.path)
+                else:
+                    os.replace(self.path, self.compacting_path)
+                self.log_file = open(self.path, 'ab')
+            snapshot_writer()
+            os.remove(self.compacting_path)
+
+    # Save: start a compaction in a background thread, unless one is already running
+    def compact_in_background(self):
+        with self.lock:
+            if self.snapshot_writer is None or (self.compaction and self.compaction.is_alive()):
+                return
+            self.compaction = threading.Thread(
+                target=self.checkpoint, args=(self.snapshot_writer,), name="wal-compaction", daemon=True)
+            self.compaction.start()
+
+    # Close: wait for a running compaction, flush the last records and stop the flusher
+    def close(self):
+        if self.compaction:
+            self.compaction.join()
+        self.stopped.set()
+        self.flusher.join()
+        with self.lock:
+            self.sync()
+            self.log_file.close()
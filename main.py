@@ -1,3 +1,4 @@
+import argparse
 import logging
 from utils.utils import get_cur_location, welcome_message
 from authentication.authentication import AuthenticationService
@@ -9,7 +10,12 @@ from operations.export_files import ExportOperations
 from operations.import_files import ImportOperations
 from charts.charts import ChartGenerator
 from reports.reports import ReportGenerator
-from data.data import EnterpriseData, IPCMSData
+from data.data import IPCMSData
+from data.parallel_loader import ParallelLoader
+from data.storage import StorageBackend, SQLiteStorage
+from data.snapshot import Snapshot
+from data.wal import WriteAheadLog
+from controllers.change_feed import ChangeFeed
 from controllers.controllers import CustomerController, ProductController, OrderController
 from utils.validators import CheckValidator
 from utils.transformers import DataTransformer
@@ -19,23 +25,56 @@ logging.basicConfig(level=logging.INFO, format='%(message)s')
 
 # Class:: Main application class for the IPCMS system
 class IPCMSApp:
-    def __init__(self, for_test_mode=False):
+    def __init__(self, for_test_mode=False, db_path=None, snapshot_path=None, wal_path=None, data_dir=None,
+                 trusted=None):
+        # Persist to SQLite when a database path is given, log every change when a write-ahead log path is
+        # given (replayed on top of the snapshot next to it), otherwise keep data in memory only
+        if wal_path:
+            self.storage = WriteAheadLog(wal_path)
+            snapshot_path = snapshot_path or f"{wal_path}.snapshot"
+        elif db_path:
+            self.storage = SQLiteStorage(db_path)
+        else:
+            self.storage = StorageBackend()
+
+        # Build the shared data context once, every component below reuses it (seeded from the dataset files
+        # in data_dir, data/seed by default, trusted to be valid when they are the seed datasets or `trusted` is set)
+        self.IPCMS_data = IPCMSData(self.storage, data_dir, trusted)
+        self.enterprise_data = self.IPCMS_data.enterprise_data
+
         # Create utility instances
         self.check_valid_method = CheckValidator()
-        self.transform_data_method = DataTransformer()
+        self.transform_data_method = DataTransformer(self.IPCMS_data)
 
-        # Initialize controllers/managers
-        self.product_manager = ProductController()
-        self.order_manager = OrderController(self.product_manager)
-        self.customer_manager = CustomerController(self.order_manager)
+        # Initialize controllers/managers, publishing their changes to one feed (one data version for all)
+        self.changes = ChangeFeed()
+        self.product_manager = ProductController(self.storage, self.changes)
+        self.order_manager = OrderController(self.product_manager, self.storage, self.changes)
+        self.customer_manager = CustomerController(self.order_manager, self.storage, self.changes)
 
         # Load the datasets into the controllers/managers
-        self.IPCMS_data = IPCMSData()
-        self.enterprise_data = EnterpriseData(self.IPCMS_data)
-
         # Adjust logging level to suppress messages during data loading
         logging.getLogger().setLevel(logging.CRITICAL)
-        self.load_data()
+        self.snapshot = Snapshot(snapshot_path or "ipcms.snapshot")
+        if snapshot_path and self.storage.SNAPSHOT_RESTORES and self.snapshot.exists():
+            # Warm start: restore the last snapshot without re-validating every record, then the changes
+            # logged since (a database is always loaded from itself, so memory never drifts from it)
+            self.load_snapshot()
+            self.replay_storage()
+        elif self.storage.is_empty():
+            # First start: seed the controllers (and the database, in one transaction). The controller locks are
+            # taken before the storage, in the lock order every controller write follows
+            with self.customer_manager.lock.write(), self.order_manager.lock.write(), \
+                    self.product_manager.lock.write(), self.storage.batch():
+                self.load_data()
+            if snapshot_path:
+                self.save_snapshot()
+        else:
+            self.load_from_storage()
+            self.replay_storage()
+        if wal_path:
+            # Let the write-ahead log compact itself into a new snapshot once it grows too large
+            self.storage.snapshot_writer = self.write_snapshot
         # Reset logging level back to INFO (or your desired level)
         logging.getLogger().setLevel(logging.INFO)
 
@@ -56,19 +95,20 @@ class IPCMSApp:
 
         self.delete_ops = DeleteOperations(self.customer_manager, self.order_manager, self.IPCMS_data)
 
-        self.create_ops = CreateOperations(
+        self.read_ops = ReadOperations(
             self.customer_manager,
             self.product_manager,
             self.order_manager,
-            self.IPCMS_data,
-            self.chart_generator
+            self.IPCMS_data
         )
 
-        self.read_ops = ReadOperations(
+        self.create_ops = CreateOperations(
             self.customer_manager,
             self.product_manager,
             self.order_manager,
-            self.IPCMS_data
+            self.IPCMS_data,
+            self.chart_generator,
+            self.read_ops
         )
 
         self.update_ops = UpdateOperations(
@@ -98,64 +138,50 @@ class IPCMSApp:
         )
 
         # Initialize the IPCMS UI for startup
+        # Close the storage however the menu is left, so the last logged changes are flushed to disk
         if not for_test_mode:
-            welcome_message()
-            if self.auth_service.login_system():
-                self.menu_page()
-            else:
-                logging.error("Access denied.")
+            try:
+                welcome_message()
+                if self.auth_service.login_system():
+                    self.menu_page()
+                else:
+                    logging.error("Access denied.")
+            finally:
+                self.storage.close()
 
-    # Load: Load data into controllers/managers
+    # Load: Load the dataset files into controllers/managers (one commit per dataset). Trusted datasets are
+    # adopted as built by EnterpriseData, others are validated, in worker processes when they are big
     def load_data(self):
-        # Load customers
-        for customer in self.enterprise_data.customers:
-            try:
-                self.customer_manager.create_customer(
-                    first_name=customer.first_name,
-                    last_name=customer.last_name,
-                    dob=customer.dob,
-                    email=customer.email,
-                    phone=customer.phone,
-                    country=customer.country,
-                    city=customer.city,
-                    postcode=customer.postcode,
-                    created_at=customer.created_at,
-                    updated_at=customer.updated_at,
-                )
-            except Exception as e:
-                logging.error(f"Error loading customer '{customer.email}' - {str(e)}")
-
-        # Load products
-        for product in self.enterprise_data.products:
-            try:
-                self.product_manager.create_product(
-                    product_id=product.product_id,
-                    product_name=product.product_name,
-                    price=product.price,
-                    category=product.category,
-                    stock_quantity=product.stock_quantity,
-                    created_at=product.created_at,
-                    updated_at=product.updated_at,
-                )
-            except Exception as e:
-                logging.error(f"Error loading product '{product.product_id}' - {str(e)}")
-
-        # Load orders
-        for order in self.enterprise_data.orders:
-            try:
-                self.order_manager.create_order(
-                    order_id=order.order_id,
-                    order_date=order.order_date,
-                    total_price=order.total_price,
-                    order_products=[op.__dict__ for op in order.order_products],
-                    payment_method=order.payment_method,
-                    order_status=order.order_status,
-                    created_at=order.created_at,
-                    updated_at=order.updated_at,
-                    customer_email=order.customer_email,
-                )
-            except Exception as e:
-                logging.error(f"Error loading order '{order.order_id}' - {str(e)}")
+        loader = ParallelLoader(self.customer_manager, self.product_manager, self.order_manager,
+                                self.IPCMS_data.data_dir)
+        # The seed orders have already been taken from the seed stock
+        if self.IPCMS_data.trusted:
+            loader.adopt(self.enterprise_data, reserve_stock=False)
+        else:
+            loader.load(reserve_stock=False)
+
+    # Load: Load the persisted data into controllers/managers (products before their orders)
+    def load_from_storage(self):
+        self.product_manager.load_from_storage()
+        self.order_manager.load_from_storage()
+        self.customer_manager.load_from_storage()
+
+    # Load: Restore the controllers and payroll tables from the snapshot file
+    def load_snapshot(self):
+        self.snapshot.load(self.customer_manager, self.product_manager, self.order_manager, self.IPCMS_data)
+
+    # Load: Apply the changes the storage backend logged since the last snapshot
+    def replay_storage(self):
+        self.storage.replay(self.customer_manager, self.product_manager, self.order_manager, self.IPCMS_data)
+
+    # Save: Write the controllers and payroll tables to the snapshot file
+    def write_snapshot(self):
+        self.snapshot.save(self.customer_manager, self.product_manager, self.order_manager, self.IPCMS_data)
+
+    # Save: Snapshot the data, letting the storage backend drop what the snapshot covers
+    def save_snapshot(self):
+        self.storage.checkpoint(self.write_snapshot)
+        logging.info(f'Snapshot "{self.snapshot.path}" has been saved successfully.')
 
     # Read: Display the main menu and handle user choices
     def menu_page(self):
@@ -178,6 +204,7 @@ class IPCMSApp:
             '16': ("Import Customer (customers.csv)", lambda: self.import_ops.read_csv('customer')),
             '17': ("Import Product (products.csv)", lambda: self.import_ops.read_csv('product')),
             '18': ("Import Order (orders.json)", lambda: self.import_ops.read_json('order')),
+            '19': (f"Save Snapshot ({self.snapshot.path})", self.save_snapshot),
         }
 
         while True:
@@ -217,6 +244,9 @@ class IPCMSApp:
             16. {menu_options['16'][0]}
             17. {menu_options['17'][0]}
             18. {menu_options['18'][0]}
+
+            [ Snapshot ]
+            19. {menu_options['19'][0]}
             """)
 
             usr_chs = input("Enter your choice: ")
@@ -255,4 +285,15 @@ class IPCMSApp:
 
 
 if __name__ == "__main__":
-    app = IPCMSApp()
+    parser = argparse.ArgumentParser(description="Integrated Payroll and Customer Management System")
+    parser.add_argument("--db", help="SQLite database file to keep the data in between runs")
+    parser.add_argument("--snapshot", help="Binary snapshot file to restore on start (created if missing, "
+                                           "not restored with --db: the database is loaded instead)")
+    parser.add_argument("--wal", help="Write-ahead log file recording every change, replayed on start "
+                                      "on top of the snapshot (default snapshot: <wal>.snapshot)")
+    parser.add_argument("--data", help="Directory of the JSON dataset files to seed from (default: data/seed)")
+    parser.add_argument("--trusted", action="store_true",
+                        help="Trust the --data datasets to be valid and load them without checking each record")
+    args = parser.parse_args()
+    app = IPCMSApp(db_path=args.db, snapshot_path=args.snapshot, wal_path=args.wal, data_dir=args.data,
+                   trusted=args.trusted or None)
@@ -0,0 +1,54 @@
+# models/categories.py
+
+from collections import Counter
+import threading
+
+
+# Class:: The distinct values of a low-cardinality field, each stored once and referred to by a small code
+class Categories:
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+        self.lock = threading.Lock()
+
+    # Read: code for a value, adding it on first sight
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            with self.lock:
+                code = self.codes.get(value)
+                if code is None:
+                    code = len(self.values)
+                    self.values.append(value)
+                    self.codes[value] = code
+        return code
+
+    # Read: value of a code
+    def decode(self, code):
+        return self.values[code]
+
+    # Read: {value: count} from an iterable of codes, in order of first appearance
+    def count(self, codes):
+        return {self.values[code]: count for code, count in Counter(codes).items()}
+
+
+# Class:: Model attribute stored as a Categories code in the `_<name>` slot, read and written as its value
+class CategoricalField:
+    def __init__(self):
+        self.categories = Categories()
+        self.slot = None
+
+    def __set_name__(self, owner, name):
+        self.slot = owner.__dict__[f"_{name}"]
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return self.categories.values[self.slot.__get__(instance)]
+
+    def __set__(self, instance, value):
+        self.slot.__set__(instance, self.categories.encode(value))
+
+    # Read: {value: number of records} over the given records, in order of first appearance
+    def count(self, instances):
+        return self.categories.count(map(self.slot.__get__, instances))
@@ -1,10 +1,96 @@
 # models/models.py
 
+from collections import deque
+from itertools import accumulate, repeat
+from operator import attrgetter, itemgetter
+from models.categories import CategoricalField
+from utils.utils import paused_gc
 from utils.validators import CheckValidator
 
 
+# Function: Build `count` model objects column by column, bypassing __init__ (no validation/conversion)
+def build_models(model_class, columns, count):
+    objects = list(map(model_class.__new__, repeat(model_class, count)))
+    for field, values in columns.items():
+        descriptor = getattr(model_class, field)
+        if isinstance(descriptor, CategoricalField):
+            # Encode each distinct value once, then store the codes straight into the slot
+            codes = {value: descriptor.categories.encode(value) for value in set(values)}
+            values = map(codes.__getitem__, values)
+            descriptor = descriptor.slot
+        # Drive the slot descriptors from C (map) instead of a Python loop per object
+        deque(map(descriptor.__set__, objects, values), maxlen=0)
+    return objects
+
+
+# Class:: Shared behaviour of the slotted models: export and pickle by their public field values
+class Model:
+    __slots__ = ()
+    # Public fields, in constructor order (categorical fields live in `_<name>` slots as codes)
+    FIELDS = ()
+    # field -> conversion the constructor applies to its value
+    CONVERSIONS = {}
+
+    # Read: attributes as a dict (slotted objects have no __dict__/vars())
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    # Pickle/copy: by value, category codes only mean something inside this process
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        for field, value in state.items():
+            setattr(self, field, value)
+
+    # Transfer: public field values as a tuple (in FIELDS order), much cheaper to send to another process
+    def to_row(self):
+        return attrgetter(*self.FIELDS)(self)
+
+    # Transfer: rebuild from to_row()
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+
+    # Create: many objects from to_row() rows known to be valid, column by column without the constructor
+    @classmethod
+    def from_rows(cls, rows):
+        with paused_gc():
+            return build_models(cls, dict(zip(cls.FIELDS, zip(*rows))), len(rows))
+
+    # Create: many objects from records (dicts of the constructor's arguments) known to be valid, column by
+    # column: the CONVERSIONS are applied, the constructor's checks are not
+    @classmethod
+    def from_records(cls, records):
+        with paused_gc():
+            return build_models(cls, cls.record_columns(records), len(records))
+
+    # Read: {field: values} of records, converted as the constructor does
+    @classmethod
+    def record_columns(cls, records):
+        columns = {}
+        for field in cls.FIELDS:
+            values = map(itemgetter(field), records)
+            convert = cls.CONVERSIONS.get(field)
+            columns[field] = list(map(convert, values) if convert else values)
+        return columns
+
+
 # Class:: Customer object
-class Customer:
+class Customer(Model):
+    # Fixed attribute slots instead of a per-instance __dict__ to keep large datasets compact
+    __slots__ = (
+        'first_name', 'last_name', 'dob', 'email', 'phone', '_country', '_city', 'postcode',
+        'created_at', 'updated_at',
+    )
+    FIELDS = (
+        'first_name', 'last_name', 'dob', 'email', 'phone', 'country', 'city', 'postcode',
+        'created_at', 'updated_at',
+    )
+    # Few distinct values shared by many customers, stored as category codes
+    country = CategoricalField()
+    city = CategoricalField()
+
     def __init__(
             self,
             first_name,
@@ -31,7 +117,17 @@ class Customer:
 
 
 # Class:: Product object
-class Product:
+class Product(Model):
+    __slots__ = (
+        'product_id', 'product_name', 'price', '_category', 'stock_quantity', 'created_at', 'updated_at',
+    )
+    FIELDS = (
+        'product_id', 'product_name', 'price', 'category', 'stock_quantity', 'created_at', 'updated_at',
+    )
+    category = CategoricalField()
+    # Trusted records have a numeric stock (the constructor turns any other into 0)
+    CONVERSIONS = {'product_id': str, 'price': float, 'stock_quantity': int}
+
     def __init__(
             self,
             product_id,
@@ -53,7 +149,11 @@ class Product:
 
 
 # Class:: Ordered Product object
-class OrderedProduct:
+class OrderedProduct(Model):
+    __slots__ = ('product_id', 'product_name', 'quantity', 'price_per_unit', 'total_price')
+    FIELDS = __slots__
+    CONVERSIONS = {'product_id': str, 'quantity': int, 'price_per_unit': float, 'total_price': float}
+
     def __init__(
         self, product_id, product_name, quantity, price_per_unit, total_price
     ):
@@ -63,9 +163,30 @@ class OrderedProduct:
         self.price_per_unit = float(price_per_unit)
         self.total_price = float(total_price)
 
+    # Transfer: an ordered product dict (as in an order record) as a row, the missing name and total filled in
+    @staticmethod
+    def row_from_record(prd):
+        quantity = int(prd['quantity'])
+        price_per_unit = float(prd['price_per_unit'])
+        return (str(prd['product_id']), prd.get('product_name', ''), quantity, price_per_unit,
+                float(prd.get('total_price', quantity * price_per_unit)))
+
 
 # Class:: Order object
-class Order:
+class Order(Model):
+    __slots__ = (
+        'order_id', 'order_date', '_order_status', 'total_price', 'order_products', '_payment_method',
+        'created_at', 'updated_at', 'customer_email',
+    )
+    FIELDS = (
+        'order_id', 'order_date', 'order_status', 'total_price', 'order_products', 'payment_method',
+        'created_at', 'updated_at', 'customer_email',
+    )
+    order_status = CategoricalField()
+    payment_method = CategoricalField()
+    # The ordered products are converted by OrderedProduct.row_from_record()
+    CONVERSIONS = {'total_price': float}
+
     def __init__(
             self,
             order_id,
@@ -87,11 +208,58 @@ class Order:
         self.updated_at = updated_at
         self.customer_email = customer_email
         self.order_products = [
-            OrderedProduct(
-                product_id=prd['product_id'],
-                product_name=prd.get('product_name', ''),
-                quantity=int(prd['quantity']),
-                price_per_unit=float(prd['price_per_unit']),
-                total_price=prd.get('total_price', int(prd['quantity']) * float(prd['price_per_unit']))
-            ) if isinstance(prd, dict) else prd for prd in order_products
+            OrderedProduct(*OrderedProduct.row_from_record(prd)) if isinstance(prd, dict) else prd
+            for prd in order_products
+        ]
+
+    # Read: attributes as a dict, ordered products included as dicts
+    def to_dict(self):
+        order_dict = super().to_dict()
+        order_dict['order_products'] = [
+            prd if isinstance(prd, dict) else prd.to_dict() for prd in self.order_products
         ]
+        return order_dict
+
+    # Transfer: as Model.to_row(), the ordered products as rows too
+    def to_row(self):
+        row = list(super().to_row())
+        # order_products is the fifth field
+        row[4] = [prd.to_row() for prd in self.order_products]
+        return tuple(row)
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row[:4], [OrderedProduct.from_row(prd) for prd in row[4]], *row[5:])
+
+    # Transfer: an order record (dict of the constructor's arguments) checked and converted as the constructor
+    # does, straight to a row without building the objects (cheap enough to run in a loading process)
+    @classmethod
+    def row_from_record(cls, record):
+        row = [record[field] for field in cls.FIELDS]
+        if len(record) != len(row):
+            raise TypeError(f"unexpected fields {sorted(record.keys() - set(cls.FIELDS))}")
+        row[3] = float(row[3])
+        row[4] = [OrderedProduct.row_from_record(prd) if isinstance(prd, dict) else prd.to_row() for prd in row[4]]
+        return tuple(row)
+
+    @classmethod
+    def from_rows(cls, rows):
+        with paused_gc():
+            columns = dict(zip(cls.FIELDS, zip(*rows)))
+            if rows:
+                columns['order_products'] = cls.build_lines(columns['order_products'])
+            return build_models(cls, columns, len(rows))
+
+    @classmethod
+    def record_columns(cls, records):
+        columns = super().record_columns(records)
+        columns['order_products'] = cls.build_lines(
+            [list(map(OrderedProduct.row_from_record, order_products)) for order_products in columns['order_products']])
+        return columns
+
+    # Create: each order's OrderedProduct objects from its list of rows, all built in one pass
+    @staticmethod
+    def build_lines(line_rows):
+        lines = OrderedProduct.from_rows([row for rows in line_rows for row in rows])
+        offsets = list(accumulate(map(len, line_rows), initial=0))
+        return [lines[start:stop] for start, stop in zip(offsets, offsets[1:])]
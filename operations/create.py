@@ -14,20 +14,22 @@ class CreateOperations:
                  product_manager,
                  order_manager,
                  erp_data,
-                 chart_generator):
+                 chart_generator,
+                 read_ops=None):
         self.customer_manager = customer_manager
         self.product_manager = product_manager
         self.order_manager = order_manager
         self.erp_data = erp_data
         self.chart_generator = chart_generator
-        self.read_ops = ReadOperations(
+        # Reuse the application's ReadOperations when one is given
+        self.read_ops = read_ops or ReadOperations(
             self.customer_manager,
             self.product_manager,
             self.order_manager,
             self.erp_data
         )
         self.validator = CheckValidator()
-        self.transformer = DataTransformer()
+        self.transformer = DataTransformer(erp_data)
         self.employee_data_with_constraints = erp_data.employee_data_with_constraints
         self.payslip_table = erp_data.payslip_table
         self.victoria_tax_table = erp_data.victoria_tax_table
@@ -99,35 +101,23 @@ class CreateOperations:
                 logging.error("Employee not found.")
                 return
 
-            payslip_id = id(employee)
+            # One payslip per employee, keyed by the employee ID so it is still replaced after a restart (payslips
+            # saved before were keyed by object address, they are matched by their EmployeeID)
+            payslip_id = employee["EmployeeID"]
 
-            for payslip in self.payslip_table:
-                if payslip["ID"] == payslip_id:
-                    logging.warning("Duplicate ID found, replacing the old payslip with the new one.")
-                    self.payslip_table.remove(payslip)
-                    break
-
-            base_yearly_salary = employee["Base Yearly Salary"]
+            old_payslips = [payslip for payslip in self.payslip_table
+                            if payslip["ID"] == payslip_id or payslip.get("EmployeeID") == payslip_id]
+            if old_payslips:
+                logging.warning("Duplicate ID found, replacing the old payslip with the new one.")
+            for payslip in old_payslips:
+                self.payslip_table.remove(payslip)
+                self.erp_data.storage.delete_payslip(payslip["ID"])
 
             #  Calculate and prompt format salary details by using the helper function
-            (tax_str, superannuation_str, net_salary_str,
-             converted_salary_str, currency_code) \
-                = self.transformer.calculate_and_format_salary(base_yearly_salary, employee["Country"])
-
-            new_payslip = {
-                "ID": payslip_id,
-                "EmployeeID": input_employee_id,
-                "Full Name": self.transformer.format_name(employee["Full Name"]),
-                "Department": employee["Department"],
-                "Title": employee["Title"],
-                "Gross Salary (AUD)": base_yearly_salary,
-                "Tax (AUD)": tax_str,
-                "Net Salary (AUD)": net_salary_str,
-                "Superannuation (AUD)": superannuation_str,
-                "Converted Net Yearly Salary": f"{currency_code} {converted_salary_str}"
-            }
+            new_payslip = self.transformer.payslip(payslip_id, employee)
 
             self.payslip_table.append(new_payslip)
+            self.erp_data.storage.save_payslip(new_payslip)
             logging.info("Payslip created successfully.")
             self.read_ops.display_payslip_details(new_payslip)
         else:
@@ -82,11 +82,7 @@ class ExportOperations:
                 logging.error(f"No orders found to export to {set_filename}")
                 return
             for order in orders:
-                order_dict = vars(order)
-                order_dict['order_products'] = [
-                    vars(prd) for prd in order.order_products
-                ]
-                orders_data.append(order_dict)
+                orders_data.append(order.to_dict())
             with open(set_filename, 'w') as json_file:
                 json.dump(orders_data, json_file, indent=4)
             logging.info(
@@ -3,22 +3,40 @@
 import csv
 import json
 import logging
+import re
+import time
+from datetime import date, datetime
+from itertools import islice
 from utils.utils import get_cur_location
 from utils.validators import CheckValidator
 from utils.transformers import DataTransformer
 
+# The standard date and datetime formats (the ones the import converts to)
+ISO_DATE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}\Z')
+ISO_DATETIME = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2}\Z')
+
 
 # Class:: ALl operations of import
 class ImportOperations:
+    # CSV rows read, checked and added per chunk
+    CHUNK_SIZE = 10000
+
     def __init__(self, customer_manager, product_manager, order_manager, erp_data):
         self.customer_manager = customer_manager
         self.product_manager = product_manager
         self.order_manager = order_manager
         self.erp_data = erp_data
         self.check_valid_method = CheckValidator()
-        self.transform_data_method = DataTransformer()
+        self.transform_data_method = DataTransformer(erp_data)
+        # Served country -> compiled postcode format
+        self.postcode_patterns = {
+            country: re.compile(details["Postcode Format"])
+            for country, details in erp_data.full_served_countries.items() if details.get("Postcode Format")
+        }
 
-    # Import: Read the csv and save the data by inputted object_name name
+    # Import: Read the csv and save the data by inputted object_name name. The file is streamed in chunks of
+    # CHUNK_SIZE rows, each checked in one pass and added (or edited) in one bulk call, so any file size fits in
+    # memory
     def read_csv(self, object_name):
         assume_filename = "".join([object_name + 's', '.csv'])
         try:
@@ -28,115 +46,24 @@ class ImportOperations:
                     csv_reader = csv.DictReader(csv_file, fieldnames=correct_headers)
                     # Skips the heading - Using next() method
                     next(csv_file)
-                    for row in csv_reader:
-                        try:
-                            # Check
-                            first_name = row['first_name'].strip()
-                            if not self.check_valid_method.is_alpha(first_name):
-                                logging.error(f"Invalid first name '{first_name}'. Skipping this record.")
-                                continue
-                            last_name = row['last_name'].strip()
-                            if not self.check_valid_method.is_alpha(last_name):
-                                logging.error(f"Invalid last name '{last_name}'. Skipping this record.")
-                                continue
-                            dob = row['dob'].strip()
-                            dob = self.transform_data_method.to_std_dateformat(dob)
-                            if not self.check_valid_method.is_valid_date_of_birth(dob):
-                                logging.error(f"Invalid date of birth '{dob}'. Skipping this record.")
-                                continue
-                            email = row['email'].strip()
-                            if not self.check_valid_method.is_email(email):
-                                logging.error(f"Invalid email '{email}'. Skipping this record.")
-                                continue
-                            phone = row['phone'].strip()
-                            if not self.check_valid_method.is_phone_num(phone):
-                                logging.error(f"Invalid phone number '{phone}'. Skipping this record.")
-                                continue
-                            country = row['country'].strip()
-                            if not self.check_valid_method.is_served_country(
-                                    country,
-                                    self.erp_data.full_served_countries
-                            ):
-                                logging.error(f"Invalid country '{country}'. Skipping this record.")
-                                continue
-                            city = row['city'].strip()
-                            if not self.check_valid_method.is_alpha(city):
-                                logging.error(f"Invalid city '{city}'. Skipping this record.")
-                                continue
-                            postcode = row['pc'].strip()
-                            if not self.check_valid_method.is_postcode(country, postcode,
-                                                                       self.erp_data.full_served_countries):
-                                logging.error(f"Invalid postcode '{postcode}'. Skipping this record.")
-                                continue
-                            created_at = row['created_at'].strip()
-                            created_at = self.transform_data_method.to_std_datetimeformat(created_at)
-                            if not self.check_valid_method.is_datetime(created_at):
-                                logging.error(f"Invalid created datetime '{created_at}'. Skipping this record.")
-                                continue
-                            updated_at = row['updated_at'].strip()
-                            updated_at = self.transform_data_method.to_std_datetimeformat(updated_at)
-                            if not self.check_valid_method.is_datetime(updated_at):
-                                logging.error(f"Invalid updated datetime '{updated_at}'. Skipping this record.")
-                                continue
-                            # Add or Edit
-                            self.customer_manager.create_customer(
-                                row['first_name'], row['last_name'], row['dob'], row['email'], row['phone'],
-                                row['country'], row['city'], row['pc'], row['created_at'], row['updated_at']
-                            )
-                        except Exception as er_msg:
-                            logging.error(f"Error: adding customer '{row['email']}' - {str(er_msg)}")
-
+                    check_rows, create_bulk = self.check_customer_rows, self.customer_manager.create_customers_bulk
                 elif object_name == 'product':
                     csv_reader = csv.DictReader(csv_file)
-                    for row in csv_reader:
-                        try:
-                            # Check
-                            product_id = row['pid'].strip()
-                            if not product_id:
-                                logging.error("Product ID is missing. Skipping this record.")
-                                continue
-                            product_name = row['product_name'].strip()
-                            if not product_name:
-                                logging.error(f"Product name is missing for ID '{product_id}'. "
-                                              f"Skipping this record.")
-                                continue
-                            price = row['price'].strip()
-                            if not self.check_valid_method.is_decimal(price):
-                                logging.error(f"Invalid price '{price}' for product '{product_name}'. "
-                                              f"Skipping this record.")
-                                continue
-                            price = float(price)
-                            category = row['category'].strip()
-                            if not category:
-                                logging.error(f"Category is missing for product '{product_name}'. "
-                                              f"Skipping this record.")
-                                continue
-                            stock_quantity = row['qty'].strip()
-                            if not self.check_valid_method.is_numeric(stock_quantity):
-                                logging.error(
-                                    f"Invalid stock quantity '{stock_quantity}' for product '{product_name}'. "
-                                    f"Skipping this record.")
-                                continue
-                            stock_quantity = int(stock_quantity)
-                            created_at = row['created_at'].strip()
-                            created_at = self.transform_data_method.to_std_datetimeformat(created_at)
-                            if not self.check_valid_method.is_datetime(created_at):
-                                logging.error(f"Invalid created datetime '{created_at}'. "
-                                              f"Skipping this record.")
-                                continue
-                            updated_at = row['updated_at'].strip()
-                            updated_at = self.transform_data_method.to_std_datetimeformat(updated_at)
-                            if not self.check_valid_method.is_datetime(updated_at):
-                                logging.error(f"Invalid updated datetime '{updated_at}'. "
-                                              f"Skipping this record.")
-                                continue
-                            # Add
-                            self.product_manager.create_product(
-                                product_id, product_name, price, category, stock_quantity,
-                                created_at, updated_at
-                            )
-                        except Exception as er_msg:
-                            logging.error(f"Error: adding product '{product_name}' - {str(er_msg)}")
+                    check_rows, create_bulk = self.check_product_rows, self.product_manager.create_products_bulk
+                else:
+                    csv_reader = ()
+                    check_rows = create_bulk = None
+                rows_read = rows_added = 0
+                started = time.perf_counter()
+                for chunk in iter(lambda: list(islice(csv_reader, self.CHUNK_SIZE)), []):
+                    records = check_rows(chunk)
+                    create_bulk(records)
+                    rows_read += len(chunk)
+                    rows_added += len(records)
+                elapsed = time.perf_counter() - started
+                if rows_read:
+                    logging.info(f"{rows_read} rows read, {rows_added} added in {elapsed:.2f}s "
+                                 f"({rows_read / max(elapsed, 1e-9):.0f} rows/sec).")
 
                 file_loca_message = f'Location: "{get_cur_location()}\\{assume_filename}"'
                 csv_file_message = f'CSV file "{assume_filename}" has been imported successfully.'
@@ -144,6 +71,208 @@ class ImportOperations:
         except Exception as er_msg:
             logging.error(f"Error: importing {object_name} list - {str(er_msg)}")
 
+    # Check: the customer records of a chunk of CSV rows. Rows passing the fast checks are taken as they are, the
+    # others go through check_customer_row() to be converted, or rejected with the reason logged
+    def check_customer_rows(self, rows):
+        records = []
+        for row in rows:
+            if self.is_clean_customer(row):
+                records.append({
+                    'first_name': row['first_name'], 'last_name': row['last_name'],
+                    'dob': row['dob'], 'email': row['email'], 'phone': row['phone'],
+                    'country': row['country'], 'city': row['city'], 'postcode': row['pc'],
+                    'created_at': row['created_at'], 'updated_at': row['updated_at'],
+                })
+                continue
+            record = self.check_customer_row(row)
+            if record is not None:
+                records.append(record)
+        return records
+
+    # Check: a customer row already in the standard formats and passing every check of check_customer_row(),
+    # checked with the patterns compiled once, without logging
+    def is_clean_customer(self, row):
+        try:
+            country = row['country'].strip()
+            postcode_pattern = self.postcode_patterns.get(country)
+            return (row['first_name'].strip().isalpha() and row['last_name'].strip().isalpha()
+                    and self.is_clean_date_of_birth(row['dob'].strip())
+                    and CheckValidator.EMAIL_PATTERN.match(row['email'].strip()) is not None
+                    and CheckValidator.PHONE_PATTERN.match(row['phone'].strip()) is not None
+                    and country.isalpha() and postcode_pattern is not None
+                    and row['city'].strip().isalpha()
+                    and postcode_pattern.match(row['pc'].strip()) is not None
+                    and self.is_clean_datetime(row['created_at'].strip())
+                    and self.is_clean_datetime(row['updated_at'].strip()))
+        except (AttributeError, KeyError):
+            # Missing fields, reported by check_customer_row()
+            return False
+
+    # Check: a customer CSV row, each failed check logged (None when rejected)
+    def check_customer_row(self, row):
+        try:
+            # Check
+            first_name = row['first_name'].strip()
+            if not self.check_valid_method.is_alpha(first_name):
+                logging.error(f"Invalid first name '{first_name}'. Skipping this record.")
+                return None
+            last_name = row['last_name'].strip()
+            if not self.check_valid_method.is_alpha(last_name):
+                logging.error(f"Invalid last name '{last_name}'. Skipping this record.")
+                return None
+            dob = row['dob'].strip()
+            dob = self.transform_data_method.to_std_dateformat(dob)
+            if not self.check_valid_method.is_valid_date_of_birth(dob):
+                logging.error(f"Invalid date of birth '{dob}'. Skipping this record.")
+                return None
+            email = row['email'].strip()
+            if not self.check_valid_method.is_email(email):
+                logging.error(f"Invalid email '{email}'. Skipping this record.")
+                return None
+            phone = row['phone'].strip()
+            if not self.check_valid_method.is_phone_num(phone):
+                logging.error(f"Invalid phone number '{phone}'. Skipping this record.")
+                return None
+            country = row['country'].strip()
+            if not self.check_valid_method.is_served_country(
+                    country,
+                    self.erp_data.full_served_countries
+            ):
+                logging.error(f"Invalid country '{country}'. Skipping this record.")
+                return None
+            city = row['city'].strip()
+            if not self.check_valid_method.is_alpha(city):
+                logging.error(f"Invalid city '{city}'. Skipping this record.")
+                return None
+            postcode = row['pc'].strip()
+            if not self.check_valid_method.is_postcode(country, postcode,
+                                                       self.erp_data.full_served_countries):
+                logging.error(f"Invalid postcode '{postcode}'. Skipping this record.")
+                return None
+            created_at = row['created_at'].strip()
+            created_at = self.transform_data_method.to_std_datetimeformat(created_at)
+            if not self.check_valid_method.is_datetime(created_at):
+                logging.error(f"Invalid created datetime '{created_at}'. Skipping this record.")
+                return None
+            updated_at = row['updated_at'].strip()
+            updated_at = self.transform_data_method.to_std_datetimeformat(updated_at)
+            if not self.check_valid_method.is_datetime(updated_at):
+                logging.error(f"Invalid updated datetime '{updated_at}'. Skipping this record.")
+                return None
+            # Add or Edit
+            return {
+                'first_name': row['first_name'], 'last_name': row['last_name'],
+                'dob': row['dob'], 'email': row['email'], 'phone': row['phone'],
+                'country': row['country'], 'city': row['city'], 'postcode': row['pc'],
+                'created_at': row['created_at'], 'updated_at': row['updated_at'],
+            }
+        except Exception as er_msg:
+            logging.error(f"Error: adding customer '{row['email']}' - {str(er_msg)}")
+        return None
+
+    # Check: the product records of a chunk of CSV rows, as check_customer_rows()
+    def check_product_rows(self, rows):
+        records = []
+        for row in rows:
+            record = self.clean_product(row) or self.check_product_row(row)
+            if record is not None:
+                records.append(record)
+        return records
+
+    # Check: the record of a product row already in the standard formats and passing every check of
+    # check_product_row(), without logging (None otherwise)
+    def clean_product(self, row):
+        try:
+            product_id = row['pid'].strip()
+            product_name = row['product_name'].strip()
+            category = row['category'].strip()
+            created_at = row['created_at'].strip()
+            updated_at = row['updated_at'].strip()
+            if not (product_id and product_name and category
+                    and self.is_clean_datetime(created_at) and self.is_clean_datetime(updated_at)):
+                return None
+            return {
+                'product_id': product_id, 'product_name': product_name, 'price': float(row['price'].strip()),
+                'category': category, 'stock_quantity': int(row['qty'].strip()),
+                'created_at': created_at, 'updated_at': updated_at,
+            }
+        except (AttributeError, KeyError, ValueError):
+            return None
+
+    # Check: a product CSV row, each failed check logged (None when rejected)
+    def check_product_row(self, row):
+        try:
+            # Check
+            product_id = row['pid'].strip()
+            if not product_id:
+                logging.error("Product ID is missing. Skipping this record.")
+                return None
+            product_name = row['product_name'].strip()
+            if not product_name:
+                logging.error(f"Product name is missing for ID '{product_id}'. "
+                              f"Skipping this record.")
+                return None
+            price = row['price'].strip()
+            if not self.check_valid_method.is_decimal(price):
+                logging.error(f"Invalid price '{price}' for product '{product_name}'. "
+                              f"Skipping this record.")
+                return None
+            price = float(price)
+            category = row['category'].strip()
+            if not category:
+                logging.error(f"Category is missing for product '{product_name}'. "
+                              f"Skipping this record.")
+                return None
+            stock_quantity = row['qty'].strip()
+            if not self.check_valid_method.is_numeric(stock_quantity):
+                logging.error(
+                    f"Invalid stock quantity '{stock_quantity}' for product '{product_name}'. "
+                    f"Skipping this record.")
+                return None
+            stock_quantity = int(stock_quantity)
+            created_at = row['created_at'].strip()
+            created_at = self.transform_data_method.to_std_datetimeformat(created_at)
+            if not self.check_valid_method.is_datetime(created_at):
+                logging.error(f"Invalid created datetime '{created_at}'. "
+                              f"Skipping this record.")
+                return None
+            updated_at = row['updated_at'].strip()
+            updated_at = self.transform_data_method.to_std_datetimeformat(updated_at)
+            if not self.check_valid_method.is_datetime(updated_at):
+                logging.error(f"Invalid updated datetime '{updated_at}'. "
+                              f"Skipping this record.")
+                return None
+            # Add
+            return {
+                'product_id': product_id, 'product_name': product_name, 'price': price,
+                'category': category, 'stock_quantity': stock_quantity,
+                'created_at': created_at, 'updated_at': updated_at,
+            }
+        except Exception as er_msg:
+            logging.error(f"Error: adding product '{row.get('product_name')}' - {str(er_msg)}")
+        return None
+
+    # Check: a date of birth already in YYYY-MM-DD format, as is_valid_date_of_birth() checks it
+    @staticmethod
+    def is_clean_date_of_birth(value):
+        if not ISO_DATE.match(value):
+            return False
+        try:
+            return 1900 <= date.fromisoformat(value).year <= datetime.now().year
+        except ValueError:
+            return False
+
+    # Check: a datetime already in YYYY-MM-DD HH:MM:SS format
+    @staticmethod
+    def is_clean_datetime(value):
+        if not ISO_DATETIME.match(value):
+            return False
+        try:
+            datetime.fromisoformat(value)
+            return True
+        except ValueError:
+            return False
+
     # Import: Read the JSON and save the data by inputted object_name name
     def read_json(self, object_name):
         assume_filename = "".join([object_name + 's', '.json'])
@@ -152,6 +281,7 @@ class ImportOperations:
                 data = json.load(json_file)
 
                 if object_name == 'order':
+                    orders = []
                     for order_data in data:
                         try:
                             # Check
@@ -185,14 +315,15 @@ class ImportOperations:
                                             continue
 
                             # Add or Edit
-                            self.order_manager.create_order(
-                                order_data['order_id'], order_data['order_date'], order_data['total_price'],
-                                order_data['order_products'], order_data['payment_method'],
-                                order_data['order_status'], order_data['created_at'],
-                                order_data['updated_at'], order_data['customer_email']
-                            )
+                            orders.append({
+                                field: order_data[field] for field in (
+                                    'order_id', 'order_date', 'total_price', 'order_products', 'payment_method',
+                                    'order_status', 'created_at', 'updated_at', 'customer_email',
+                                )
+                            })
                         except Exception as er_msg:
                             logging.error(f"Error: adding order '{order_data['order_id']}' - {str(er_msg)}")
+                    self.order_manager.create_orders_bulk(orders)
             logging.info(f'JSON file "{assume_filename}" has been imported successfully.')
         except Exception as er_msg:
             logging.error(f"Error: importing {object_name} list - {str(er_msg)}")
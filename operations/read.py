@@ -7,6 +7,9 @@ from utils.validators import CheckValidator
 
 # Class: All operations of read
 class ReadOperations:
+    # Records shown per screen by the paged tables
+    PAGE_SIZE = 20
+
     def __init__(self, 
                  customer_manager, 
                  product_manager, 
@@ -17,7 +20,7 @@ class ReadOperations:
         self.product_manager = product_manager
         self.order_manager = order_manager
         self.erp_data = erp_data
-        self.transformer = DataTransformer()
+        self.transformer = DataTransformer(erp_data)
         self.validator = CheckValidator()
 
         # Access data structures
@@ -43,6 +46,64 @@ class ReadOperations:
             ])
             print(row_line)
 
+    # Display: page through records, fetch_page(cursor) returns a Page and show(records, start) prints one.
+    # Returns the chosen record, or calls on_select(record) and keeps paging when it is given
+    def page_through(self, fetch_page, show, item_name, on_select=None):
+        cursors = [None]
+        page = fetch_page(None)
+        while True:
+            start = (len(cursors) - 1) * self.PAGE_SIZE + 1
+            show(page.items, start)
+            options = ["'n' for the next page"] if page.next_cursor else []
+            if len(cursors) > 1:
+                options.append("'p' for the previous page")
+            prompt = ", ".join([f"\nEnter {item_name} number to view details"] + options + ["or 'b' to go back: "])
+            while True:
+                usr_chs = input(prompt).strip().lower()
+                if usr_chs == 'b':
+                    return None
+                if usr_chs == 'n' and page.next_cursor:
+                    cursors.append(page.next_cursor)
+                    break
+                if usr_chs == 'p' and len(cursors) > 1:
+                    cursors.pop()
+                    break
+                if self.validator.is_numeric(usr_chs) and start <= int(usr_chs) < start + len(page.items):
+                    selected = page.items[int(usr_chs) - start]
+                    if on_select is None:
+                        return selected
+                    on_select(selected)
+                else:
+                    logging.error(f"Invalid {item_name} number. Please try again.")
+            page = fetch_page(cursors[-1])
+
+    # Display: ask for a search and page through the matches, search_page(text, page_size, cursor) and
+    # all_page(page_size, cursor) return a Page. An empty search pages through all records, going back from
+    # the matches returns to the search. Returns like page_through()
+    def search_and_page(self, search_page, all_page, show, item_name, search_hint, on_select=None):
+        while True:
+            text = input(f"\nEnter {search_hint} to search (Enter for all {item_name}s) "
+                         f"or 'b' to go back: ").strip()
+            if text.lower() == 'b':
+                return None
+            if text:
+                def fetch_page(cursor):
+                    return search_page(text, self.PAGE_SIZE, cursor)
+            else:
+                def fetch_page(cursor):
+                    return all_page(self.PAGE_SIZE, cursor)
+            first_page = fetch_page(None)
+            if not first_page.items:
+                if not text:
+                    logging.error(f"No {item_name}s available.")
+                    return None
+                logging.error(f"No {item_name}s match '{text}'. Please try again.")
+                continue
+            selected = self.page_through(
+                lambda cursor: first_page if cursor is None else fetch_page(cursor), show, item_name, on_select)
+            if selected is not None:
+                return selected
+
     """ For the IP System """
 
     # Display: Helper function to display detailed payroll information by employee payroll mapping
@@ -166,13 +227,20 @@ class ReadOperations:
 
     """ For the CMSystem """
 
-    # Read: Products table for more details
+    # Read: Products table for more details, best matches of a fuzzy name/category search (an empty search
+    # lists all)
     def display_product_table(self):
-        products = self.product_manager.get_all_products()
-        if not products:
-            logging.error("No products available.")
-            return
+        self.search_and_page(
+            self.product_manager.search_products_page,
+            self.product_manager.get_products_page,
+            self.display_product_rows,
+            'product',
+            'a product name or category',
+            self.display_product_details
+        )
 
+    # Read: One page of the products table, numbered from `start`
+    def display_product_rows(self, products, start=1):
         # Customize the Header
         col_widths = self.erp_data.col_widths['products'].copy()
         col_widths_with_no = {
@@ -198,20 +266,11 @@ class ReadOperations:
                 'created_at': self.transformer.to_std_datetimeformat(p.created_at),
                 'updated_at': self.transformer.to_std_datetimeformat(p.updated_at)
             }
-            for i, p in enumerate(products, start=1)
+            for i, p in enumerate(products, start=start)
         ]
 
         self.display_table(data, headers, col_widths_with_no)
 
-        while True:
-            usr_chs = input("\nEnter product number to view details, or 'b' to go back: ").strip().lower()
-            if usr_chs == 'b':
-                break
-            if self.validator.is_numeric(usr_chs) and 1 <= int(usr_chs) <= len(products):
-                self.display_product_details(products[int(usr_chs) - 1])
-            else:
-                logging.error("Invalid choice. Please try again.")
-
     # Read: Product's details
     def display_product_details(self, product):
         print(f"""
@@ -224,32 +283,18 @@ Quantity (qty): {product.stock_quantity}
 Created Date: {self.transformer.to_std_datetimeformat(product.created_at)}
 Updated Date: {self.transformer.to_std_datetimeformat(product.updated_at)}""")
 
-    # Read: Customers for more details
+    # Read: Customers for more details, found by the start of a name or email (an empty search lists all)
     def display_customers(self):
-        customers = self.customer_manager.get_all_customers()
-        if not customers:
-            logging.error("No customers available.")
-            return None
-
-        self.display_customer_table(customers)
-
-        while True:
-            usr_chs = input("\nEnter customer number to view details, or 'b' to go back: ").strip()
-            if usr_chs.lower() == 'b':
-                break
-            elif self.validator.is_numeric(usr_chs):
-                idx = int(usr_chs) - 1
-                if 0 <= idx < len(customers):
-                    selected_customer = customers[idx]
-                    return selected_customer
-                else:
-                    logging.error("Invalid customer number. Please try again.")
-            else:
-                logging.error("Invalid choice. Please try again.")
-        return None
+        return self.search_and_page(
+            self.customer_manager.search_customers_page,
+            self.customer_manager.get_customers_page,
+            self.display_customer_table,
+            'customer',
+            'the start of a first name, last name or email'
+        )
 
-    # Read: Customers table by custom
-    def display_customer_table(self, customers):
+    # Read: Customers table by custom, numbered from `start`
+    def display_customer_table(self, customers, start=1):
         col_widths = self.erp_data.col_widths['customers'].copy()
         if 'postcode' in col_widths:
             col_widths['pc'] = col_widths.pop('postcode')
@@ -273,7 +318,7 @@ Updated Date: {self.transformer.to_std_datetimeformat(product.updated_at)}""")
                 'created_at': self.transformer.to_std_datetimeformat(a_cus.created_at),
                 'updated_at': self.transformer.to_std_datetimeformat(a_cus.updated_at)
             }
-            for i, a_cus in enumerate(customers, start=1)
+            for i, a_cus in enumerate(customers, start=start)
         ]
 
         self.display_table(data, headers, col_widths_with_no)
@@ -332,23 +377,25 @@ Updated Date: {self.transformer.to_std_datetimeformat(customer.updated_at)}""")
 
     # Read: Orders for more details
     def display_orders(self):
-        orders = self.order_manager.get_all_orders()
-        if not orders:
+        first_page = self.order_manager.get_orders_page(self.PAGE_SIZE)
+        if not first_page.items:
             logging.error("No orders available.")
             return
-        for i, a_order in enumerate(orders, start=1):
+        self.page_through(
+            lambda cursor: first_page if cursor is None else self.order_manager.get_orders_page(
+                self.PAGE_SIZE, cursor),
+            self.display_order_rows,
+            'order',
+            self.display_order_details
+        )
+
+    # Read: One page of the orders list, numbered from `start`
+    @staticmethod
+    def display_order_rows(orders, start=1):
+        for i, a_order in enumerate(orders, start=start):
             print(f"{i}. Order ID: {a_order.order_id}, "
                   f"Customer Email: {a_order.customer_email}, Total Price: {a_order.total_price}")
 
-        while True:
-            usr_chs = input("\nEnter order number to view details, or 'b' to go back: ").strip().lower()
-            if usr_chs == 'b':
-                break
-            if self.validator.is_numeric(usr_chs) and 1 <= int(usr_chs) <= len(orders):
-                self.display_order_details(orders[int(usr_chs) - 1])
-            else:
-                logging.error("Invalid choice. Please try again.")
-
     # Read : Order's details
     def display_order_details(self, order):
         print(f"""
@@ -1,8 +1,8 @@
 # operations/update.py
+from copy import copy
 import logging
 
 from utils.validators import CheckValidator
-from datetime import datetime
 
 
 # Class: All operations of update
@@ -57,6 +57,8 @@ class UpdateOperations:
     # Update: Customer details
     def update_customer(self, customer):
         print("\nUpdate Customer")
+        # Edit a copy, other readers of the stored customer never see a half-made change
+        customer = copy(customer)
         # Check Input one by one
         n_first_name = input(
             f"Enter new first name (current: {customer.first_name}): "
@@ -117,8 +119,8 @@ class UpdateOperations:
                 logging.error("Invalid postcode. Update cancelled.")
                 return
             customer.postcode = n_postcode
-        # Update the updated_at as current
-        customer.updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Save through the controller, which sets updated_at and persists the change
+        self.customer_manager.update_customer_by_email(customer)
         logging.info("Customer updated successfully.")
 
     # Update: Run update_customer b4 checking by Email
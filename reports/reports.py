@@ -1,13 +1,24 @@
 # reports/reports.py
 
 import logging
-from docx import Document
-from docx.shared import Inches
 from datetime import datetime
 import os
 from utils.utils import get_cur_location, get_sales_quantity
 from utils.transformers import DataTransformer
 
+# python-docx is imported by load_docx() when a report is first exported, not at start-up
+Document = None
+Inches = None
+
+
+# Function: Import python-docx on first use
+def load_docx():
+    global Document, Inches
+    if Document is None:
+        from docx import Document
+    if Inches is None:
+        from docx.shared import Inches
+
 
 # Class: Generate and manage reports
 class ReportGenerator:
@@ -29,9 +40,9 @@ class ReportGenerator:
 
     # Generate: KPI's section
     def gen_kpis_section(self):
-        tt_sales = sum(float(order.total_price) for order in self.order_manager.get_all_orders())
-        tt_customers = len(self.customer_manager.get_all_customers())
-        tt_orders = len(self.order_manager.get_all_orders())
+        tt_sales = self.order_manager.get_total_sales()
+        tt_customers = self.customer_manager.get_customer_count()
+        tt_orders = self.order_manager.get_order_count()
         avg_order_value = tt_sales / tt_orders if tt_orders > 0 else 0
         customer_retention_rate = 100  # Placeholder logic
 
@@ -44,13 +55,7 @@ class ReportGenerator:
 
     # Generate:  product's performance section
     def gen_product_performance_section(self):
-        pd_sales = {}
-        for a_order in self.order_manager.get_all_orders():
-            for op in a_order.order_products:
-                if isinstance(op, dict):
-                    pd_sales[op['product_name']] = pd_sales.get(op['product_name'], 0) + int(op['quantity'])
-                elif hasattr(op, 'product_name') and hasattr(op, 'quantity'):
-                    pd_sales[op.product_name] = pd_sales.get(op.product_name, 0) + int(op.quantity)
+        pd_sales = self.order_manager.get_units_sold_by_product_name()
         best_sale = max(pd_sales.items(), key=get_sales_quantity, default=("N/A",))[0]
         the_low_stock = [
             f"{p.product_name} – {p.stock_quantity} units"
@@ -69,14 +74,8 @@ class ReportGenerator:
 
     # Generate:  customer's insights section
     def gen_order_customer_insights_section(self):
-        rc_orders = sorted(
-            self.order_manager.get_all_orders(),
-            key=self.transform_data_method.transform_order_date,
-            reverse=True
-        )[:5]
-        cities_of_customer = {}
-        for a_customer in self.customer_manager.get_all_customers():
-            cities_of_customer[a_customer.city] = cities_of_customer.get(a_customer.city, 0) + 1
+        rc_orders = self.order_manager.get_latest_orders(5)
+        cities_of_customer = self.customer_manager.get_customer_count_by_city()
 
         return {
             'Recent Orders': [{
@@ -202,6 +201,7 @@ class ReportGenerator:
     def export_report(self):
         report_contents = self.create_report_content()
         set_filename = f"marketing_report_{datetime.now().strftime('%Y%m%d%H%M%S')}.docx"
+        load_docx()
         ms_word_doc = Document()
         self.create_report_document(ms_word_doc, report_contents)
         ms_word_doc.save(set_filename)
@@ -17,12 +17,8 @@ class TestChartGenerator(unittest.TestCase):
     @patch('matplotlib.pyplot.show')
     def test_gen_bar_chart_top_selling_products(self, mock_show):
         """Test the generation of the top-selling products chart."""
-        # Mock the get_all_orders method to return sample orders
-        self.mock_order_manager.get_all_orders.return_value = [
-            MagicMock(order_products=[{'product_name': 'Product1', 'quantity': 2}]),
-            MagicMock(order_products=[{'product_name': 'Product2', 'quantity': 5}]),
-            MagicMock(order_products=[{'product_name': 'Product1', 'quantity': 1}])
-        ]
+        # Mock the units sold aggregated by the order manager
+        self.mock_order_manager.get_units_sold_by_product_name.return_value = {'Product1': 3, 'Product2': 5}
 
         # Call the chart generation method
         self.chart_generator.gen_bar_chart_top_selling_products()
@@ -33,12 +29,8 @@ class TestChartGenerator(unittest.TestCase):
     @patch('matplotlib.pyplot.show')
     def test_gen_customer_location_distribution_chart(self, mock_show):
         """Test the generation of the customer location distribution chart."""
-        # Mock the get_all_customers method to return sample customers
-        self.mock_customer_manager.get_all_customers.return_value = [
-            MagicMock(city='New York'),
-            MagicMock(city='New York'),
-            MagicMock(city='Los Angeles')
-        ]
+        # Mock the number of customers per city counted by the customer manager
+        self.mock_customer_manager.get_customer_count_by_city.return_value = {'New York': 2, 'Los Angeles': 1}
 
         # Call the chart generation method
         self.chart_generator.gen_customer_location_distribution_chart()
@@ -67,9 +59,7 @@ class TestChartGenerator(unittest.TestCase):
     def test_export_all_charts(self, mock_show, mock_savefig):
         """Test the export of all charts."""
         # Mock the get_all_customers and get_all_orders methods to provide sample data
-        self.mock_order_manager.get_all_orders.return_value = [
-            MagicMock(order_products=[{'product_name': 'Product1', 'quantity': 2}])
-        ]
+        self.mock_order_manager.get_units_sold_by_product_name.return_value = {'Product1': 2}
         self.mock_customer_manager.get_all_customers.return_value = [
             MagicMock(dob='1990-01-01', city='New York')
         ]
@@ -0,0 +1,79 @@
+import random
+import unittest
+from controllers.columns import OrderColumns
+from models.models import Order, OrderedProduct
+
+
+def make_order(order_id, rng):
+    order_products = [
+        OrderedProduct(f"{rng.randint(1, 8):03d}", f"Robot {rng.randint(1, 8)}", rng.randint(1, 5), 10.5, 0)
+        for _ in range(rng.randint(0, 3))
+    ]
+    for op in order_products:
+        op.total_price = op.quantity * op.price_per_unit
+    return Order(order_id, f"{rng.randint(1, 28):02d}-08-2024", 'Pending',
+                 sum(op.total_price for op in order_products), order_products,
+                 'Credit Card', '2024-08-01 00:00:00', '2024-08-01 00:00:00',
+                 f"user{rng.randint(1, 5)}@example.com")
+
+
+class TestOrderColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.columns = OrderColumns()
+        self.orders = {}
+        self.rng = random.Random(42)
+
+    def assert_matches_recompute(self):
+        units_by_name, units_by_product, revenue_by_product, sales_by_customer = {}, {}, {}, {}
+        for order in self.orders.values():
+            sales_by_customer[order.customer_email] = \
+                sales_by_customer.get(order.customer_email, 0) + order.total_price
+            for op in order.order_products:
+                units_by_name[op.product_name] = units_by_name.get(op.product_name, 0) + op.quantity
+                units_by_product[op.product_id] = units_by_product.get(op.product_id, 0) + op.quantity
+                revenue_by_product[op.product_id] = revenue_by_product.get(op.product_id, 0) + op.total_price
+        self.assertEqual(len(self.columns), len(self.orders))
+        self.assertAlmostEqual(self.columns.total_sales(), sum(o.total_price for o in self.orders.values()))
+        self.assertEqual(self.columns.units_sold_by_product_name(), units_by_name)
+        self.assertEqual(self.columns.units_sold_by_product(), units_by_product)
+        self.assertEqual(revenue_by_product.keys(), self.columns.revenue_by_product().keys())
+        for product_id, revenue in self.columns.revenue_by_product().items():
+            self.assertAlmostEqual(revenue, revenue_by_product[product_id])
+        for email, total in self.columns.sales_by_customer().items():
+            self.assertAlmostEqual(total, sales_by_customer[email])
+        self.assertEqual(self.columns.sales_by_customer().keys(), sales_by_customer.keys())
+
+    def test_empty(self):
+        """Test aggregations on an empty store."""
+        self.assertEqual(self.columns.total_sales(), 0.0)
+        self.assertEqual(self.columns.units_sold_by_product_name(), {})
+
+    def test_matches_recompute_after_writes(self):
+        """Test that aggregations stay in sync through creates, updates, deletes and compaction."""
+        for step in range(5000):
+            order_id = f"PO{self.rng.randint(1, 1500)}"
+            if self.rng.random() < 0.3 and order_id in self.orders:
+                del self.orders[order_id]
+                self.columns.remove_order(order_id)
+            else:
+                order = make_order(order_id, self.rng)
+                self.orders[order_id] = order
+                self.columns.add_order(order)
+        self.assert_matches_recompute()
+        self.columns.compact()
+        self.assert_matches_recompute()
+
+    def test_total_sales_between(self):
+        """Test date-range sums over the order date column."""
+        for order_id, order_date, total in (('1', '01-08-2024', 10.0), ('2', '15-08-2024', 20.0),
+                                            ('3', '31-08-2024', 40.0), ('4', 'not a date', 80.0)):
+            self.columns.add_order(Order(order_id, order_date, 'Pending', total, [], 'Cash',
+                                         '2024-08-01 00:00:00', '2024-08-01 00:00:00', 'a@example.com'))
+        self.assertEqual(self.columns.total_sales_between('2024-08-01', '2024-08-15'), 30.0)
+        self.assertEqual(self.columns.total_sales_between('2024-08-16', '2024-12-31'), 40.0)
+        self.assertEqual(self.columns.total_sales(), 150.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
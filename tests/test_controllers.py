@@ -1,6 +1,10 @@
+import random
 import unittest
+from datetime import date, datetime
 from unittest.mock import MagicMock, patch
+from controllers.change_feed import ChangeEvent, ChangeFeed
 from controllers.controllers import CustomerController, ProductController, OrderController
+from controllers.trigram_index import TrigramIndex
 from models.models import Customer, Product, Order
 
 
@@ -41,6 +45,97 @@ class TestCustomerController(unittest.TestCase):
         customer = self.customer_controller.get_customer_by_email('john.doe@example.com')
         self.assertIsNone(customer)
 
+    def test_get_all_customers_keeps_insertion_order(self):
+        for email in ('a@example.com', 'b@example.com', 'c@example.com'):
+            self.customer_controller.create_customer(
+                'John', 'Doe', '1990-01-01', email, '1234567890',
+                'USA', 'New York', '10001', '2023-01-01', '2023-01-01'
+            )
+        # Upsert of an existing email keeps its original position
+        self.customer_controller.create_customer(
+            'Jane', 'Doe', '1990-01-01', 'a@example.com', '1234567890',
+            'USA', 'New York', '10001', '2023-01-01', '2023-01-01'
+        )
+        customers = self.customer_controller.get_all_customers()
+        self.assertEqual([c.email for c in customers], ['a@example.com', 'b@example.com', 'c@example.com'])
+        self.assertEqual(self.customer_controller.get_customer_count(), 3)
+        self.assertEqual(customers[0].first_name, 'Jane')
+
+    def test_create_customers_bulk(self):
+        self.customer_controller.create_customer(
+            'John', 'Doe', '1990-01-01', 'a@example.com', '1234567890',
+            'USA', 'New York', '10001', '2023-01-01', '2023-01-01'
+        )
+        records = [
+            {'first_name': name, 'last_name': 'Doe', 'dob': '1990-01-01', 'email': email, 'phone': '1234567890',
+             'country': 'USA', 'city': 'Boston', 'postcode': '10001', 'created_at': '2023-01-01',
+             'updated_at': '2023-01-01'}
+            for name, email in (('Jane', 'a@example.com'), ('Jim', 'b@example.com'), ('Jill', 'b@example.com'))
+        ]
+        records.append({'email': 'c@example.com'})
+        summary = self.customer_controller.create_customers_bulk(records)
+        self.assertEqual(summary, {'inserted': 1, 'updated': 2, 'rejected': 1})
+        customers = self.customer_controller.get_all_customers()
+        self.assertEqual([(c.email, c.first_name) for c in customers],
+                         [('a@example.com', 'Jane'), ('b@example.com', 'Jill')])
+        self.assertNotEqual(customers[0].updated_at, '2023-01-01')
+
+    @patch('builtins.input', return_value='y')
+    def test_city_counts_follow_changes(self, mock_input):
+        """Running city counts match a full recount after random creates, updates and deletes"""
+        rng = random.Random(14)
+        for _ in range(200):
+            email = f'{rng.randrange(20)}@example.com'
+            action = rng.random()
+            if action < 0.6:
+                self.customer_controller.create_customer(
+                    'John', 'Doe', '1990-01-01', email, '1234567890',
+                    'USA', rng.choice(['Boston', 'Denver', 'Austin']), '10001', '2023-01-01', '2023-01-01'
+                )
+            elif action < 0.8:
+                self.customer_controller.create_customers_bulk([{
+                    'first_name': 'Jane', 'last_name': 'Doe', 'dob': '1990-01-01', 'email': email,
+                    'phone': '1234567890', 'country': 'USA', 'city': rng.choice(['Boston', 'Miami']),
+                    'postcode': '10001', 'created_at': '2023-01-01', 'updated_at': '2023-01-01'}])
+            else:
+                self.customer_controller.delete_customer_by_email(email)
+        self.assertEqual(self.customer_controller.verify_aggregates(), [])
+        counts = self.customer_controller.get_customer_count_by_city()
+        self.assertEqual(sum(counts.values()), len(self.customer_controller.get_all_customers()))
+        self.assertNotIn(0, counts.values())
+
+    @patch('builtins.input', return_value='y')
+    def test_search_customers(self, mock_input):
+        """The search index finds customers by name or email prefix and follows creates, updates and deletes"""
+        for first_name, last_name, email in (('John', 'Doe', 'jd@example.com'), ('Jane', 'Smith', 'smith@example.com'),
+                                             ('Johnny', 'Smithers', 'johnny@example.com')):
+            self.customer_controller.create_customer(
+                first_name, last_name, '1990-01-01', email, '1234567890',
+                'USA', 'New York', '10001', '2023-01-01', '2023-01-01'
+            )
+        search = self.customer_controller.search_customers
+        self.assertEqual([c.email for c in search('JOHN')], ['jd@example.com', 'johnny@example.com'])
+        self.assertEqual([c.email for c in search('smith')], ['smith@example.com', 'johnny@example.com'])
+        self.assertEqual([c.email for c in search('jo smi')], ['johnny@example.com'])
+        self.assertEqual([c.email for c in search('j', limit=2)], ['smith@example.com', 'jd@example.com'])
+        self.assertEqual(search('  '), [])
+        self.customer_controller.create_customer(
+            'Jack', 'Doe', '1990-01-01', 'jd@example.com', '1234567890',
+            'USA', 'New York', '10001', '2023-01-01', '2023-01-01'
+        )
+        self.customer_controller.create_customers_bulk([{
+            'first_name': 'Ann', 'last_name': 'Lee', 'dob': '1990-01-01', 'email': 'ann@example.com',
+            'phone': '1234567890', 'country': 'USA', 'city': 'Boston', 'postcode': '10001',
+            'created_at': '2023-01-01', 'updated_at': '2023-01-01'}])
+        self.customer_controller.delete_customer_by_email('johnny@example.com')
+        self.assertEqual([c.email for c in search('john')], [])
+        self.assertEqual([c.email for c in search('jack')], ['jd@example.com'])
+        self.assertEqual([c.email for c in search('lee')], ['ann@example.com'])
+        page = self.customer_controller.search_customers_page('j', 1)
+        self.assertEqual([c.email for c in page], ['jd@example.com'])
+        page = self.customer_controller.search_customers_page('j', 1, page.next_cursor)
+        self.assertEqual(([c.email for c in page], page.next_cursor), (['smith@example.com'], None))
+
 
 class TestProductController(unittest.TestCase):
 
@@ -76,6 +171,103 @@ class TestProductController(unittest.TestCase):
         products = self.product_controller.get_all_products()
         self.assertEqual(len(products), 2)
 
+    def test_get_product_by_id_normalises_key(self):
+        self.product_controller.create_product(
+            7, 'Laptop', 1000, 'Electronics', 10, '2023-01-01', '2023-01-01'
+        )
+        self.assertIsNotNone(self.product_controller.get_product_by_id(' 7 '))
+        self.assertIsNotNone(self.product_controller.get_product_by_id('7'))
+        self.assertIsNone(self.product_controller.get_product_by_id('8'))
+
+    def test_search_products(self):
+        """Fuzzy search ranks products by name and category, tolerates typos and follows renames"""
+        for pid, name, category in (('1', 'EMO Robot (Lite)', 'Robots'), ('2', 'EMO Robot (Dream)', 'Robots'),
+                                    ('3', 'Moxie Robot', 'Robots'), ('4', 'Laptop', 'Electronics')):
+            self.product_controller.create_product(pid, name, 100, category, 1, '2023-01-01', '2023-01-01')
+        search = self.product_controller.search_products
+        self.assertEqual([p.product_id for p in search('EMO Robot Dream')][:2], ['2', '1'])
+        self.assertEqual([p.product_id for p in search('emo robto draem')][:1], ['2'])
+        self.assertEqual([p.product_id for p in search('electronic')], ['4'])
+        self.assertEqual(search('xyz'), [])
+        self.assertEqual(len(search('robot', limit=2)), 2)
+        self.product_controller.create_product('4', 'Gaming Laptop', 100, 'Electronics', 1, '2023-01-01', '2023-01-01')
+        self.product_controller.update_product_by_id(Product('2', 'Dash Robot', 100, 'Robots', 1, '', ''))
+        self.assertEqual([p.product_id for p in search('dash')], ['2'])
+        self.assertNotIn('2', [p.product_id for p in search('dream')])
+        self.assertEqual([p.product_name for p in search('gamng')], ['Gaming Laptop'])
+        page = self.product_controller.search_products_page('robot', 2)
+        self.assertEqual(len(page), 2)
+        page = self.product_controller.search_products_page('robot', 2, page.next_cursor)
+        self.assertEqual((len(page), page.next_cursor), (1, None))
+
+    def test_reserve_stock(self):
+        """Stock is taken for every line or none, and a product falling below the threshold is reported"""
+        for pid, stock in (('1', 12), ('2', 3)):
+            self.product_controller.create_product(pid, 'Laptop', 1000, 'Electronics', stock,
+                                                   '2023-01-01', '2023-01-01')
+        events = []
+        self.product_controller.changes.subscribe(events.append)
+        stock = lambda pid: self.product_controller.get_product_by_id(pid).stock_quantity
+        with self.assertLogs(level='ERROR'):
+            self.assertFalse(self.product_controller.reserve_stock({'1': 1, '2': 4}))
+            self.assertFalse(self.product_controller.reserve_stock({'1': 1, '9': 1}))
+        self.assertEqual((stock('1'), stock('2'), events), (12, 3, []))
+        with self.assertLogs(level='WARNING'):
+            self.assertTrue(self.product_controller.reserve_stock({'1': 2, ' 1': 1, '2': 3}))
+        self.assertEqual((stock('1'), stock('2')), (9, 0))
+        low_stock = [(e.action, e.key) for e in events if e.action == ChangeEvent.LOW_STOCK]
+        self.assertEqual(low_stock, [(ChangeEvent.LOW_STOCK, '1')])
+        self.assertTrue(self.product_controller.reserve_stock({'2': -2}))
+        self.assertEqual(stock('2'), 2)
+
+    def test_trigram_index_compacts_removed_records(self):
+        """Removed records are dropped from the trigram arrays once they outnumber the live ones"""
+        index = TrigramIndex()
+        index.COMPACT_MIN = 0
+        for key, text in (('1', 'Laptop'), ('2', 'Phone'), ('3', 'Laptop Pro')):
+            index.add(key, text)
+        index.remove('1')
+        index.add('2', 'Phone Max')
+        self.assertEqual(index.keys, ['3', '2'])
+        self.assertEqual([key for key, _ in index.search('laptop')], ['3'])
+        self.assertEqual(index.search('phone max'), [('2', 1.0)])
+
+    def test_products_page(self):
+        for pid, price in (('1', 30), ('2', 10), ('3', 20), ('4', 10)):
+            self.product_controller.create_product(pid, 'Laptop', price, 'Electronics', 1, '2023-01-01', '2023-01-01')
+        page = self.product_controller.get_products_page(3)
+        self.assertEqual([p.product_id for p in page], ['1', '2', '3'])
+        # Removing a record before the cursor does not shift the next page
+        del self.product_controller.products['1']
+        page = self.product_controller.get_products_page(3, page.next_cursor)
+        self.assertEqual([p.product_id for p in page], ['4'])
+        self.assertIsNone(page.next_cursor)
+
+        page = self.product_controller.get_products_page(2, sort_key='price')
+        self.assertEqual([p.product_id for p in page], ['2', '4'])
+        # A cheaper product added between pages does not repeat or skip records
+        self.product_controller.create_product('0', 'Phone', 5, 'Electronics', 1, '2023-01-01', '2023-01-01')
+        page = self.product_controller.get_products_page(2, page.next_cursor, sort_key='price')
+        self.assertEqual([p.product_id for p in page], ['3'])
+        page = self.product_controller.get_products_page(2, sort_key='price', reverse=True)
+        self.assertEqual([p.product_id for p in page], ['3', '4'])
+        with self.assertRaises(ValueError):
+            self.product_controller.get_products_page(2, page.next_cursor)
+
+    def test_create_products_bulk(self):
+        self.product_controller.create_product(
+            '1', 'Laptop', 1000, 'Electronics', 10, '2022-01-01', '2023-01-01'
+        )
+        summary = self.product_controller.create_products_bulk([
+            {'product_id': pid, 'product_name': name, 'price': price, 'category': 'Electronics',
+             'stock_quantity': 5, 'created_at': '2023-01-01', 'updated_at': '2023-01-01'}
+            for pid, name, price in (('1', 'Laptop Pro', 1200), ('2', 'Phone', 500), ('3', 'Broken', -1))
+        ])
+        self.assertEqual(summary, {'inserted': 1, 'updated': 1, 'rejected': 1})
+        product = self.product_controller.get_product_by_id('1')
+        self.assertEqual((product.product_name, product.price, product.created_at), ('Laptop Pro', 1200, '2022-01-01'))
+        self.assertEqual(self.product_controller.get_missing_product_ids(['1', ' 2', '3']), {'3'})
+
 
 class TestOrderController(unittest.TestCase):
 
@@ -130,6 +322,346 @@ class TestOrderController(unittest.TestCase):
         order = self.order_controller.get_order_by_id('1')
         self.assertIsNone(order)
 
+    def create_sample_order(self, order_id, customer_email, product_ids, order_date='01-01-2023'):
+        self.mock_product_manager.get_product_by_id.return_value = MagicMock()
+        self.order_controller.create_order(
+            order_id, order_date, 1500.0,
+            [{'product_id': pid, 'quantity': 1, 'price_per_unit': 500.0} for pid in product_ids],
+            'Credit Card', 'Pending',
+            '2023-01-01 00:00:00', '2023-01-01 00:00:00',
+            customer_email
+        )
+
+    def test_get_orders_by_customer_and_product(self):
+        self.create_sample_order('1', 'a@example.com', ['001', '002'])
+        self.create_sample_order('2', 'b@example.com', ['002'])
+        self.create_sample_order('3', 'a@example.com', ['003'])
+        by_customer = self.order_controller.get_orders_by_customer_email('a@example.com')
+        self.assertEqual([o.order_id for o in by_customer], ['1', '3'])
+        by_product = self.order_controller.get_orders_by_product_id('002')
+        self.assertEqual([o.order_id for o in by_product], ['1', '2'])
+        self.assertEqual(self.order_controller.get_orders_by_product_id('999'), [])
+
+    def test_secondary_indexes_follow_updates_and_deletes(self):
+        self.create_sample_order('1', 'a@example.com', ['001'])
+        self.create_sample_order('2', 'b@example.com', ['001'])
+        # Upsert moves order 1 to another customer and product
+        self.create_sample_order('1', 'b@example.com', ['002'])
+        self.assertEqual(self.order_controller.get_orders_by_customer_email('a@example.com'), [])
+        self.assertEqual([o.order_id for o in self.order_controller.get_orders_by_product_id('001')], ['2'])
+        self.assertEqual([o.order_id for o in self.order_controller.get_orders_by_product_id('002')], ['1'])
+
+        self.order_controller.delete_orders_by_customer_email('b@example.com')
+        self.assertEqual(self.order_controller.get_all_orders(), [])
+        self.assertEqual(self.order_controller.orders_by_customer, {})
+        self.assertEqual(self.order_controller.orders_by_product, {})
+
+    def test_create_orders_bulk(self):
+        product_controller = ProductController()
+        product_controller.create_product('001', 'Laptop', 500, 'Electronics', 10, '2023-01-01', '2023-01-01')
+        self.order_controller = OrderController(product_controller)
+        self.create_sample_order('1', 'a@example.com', ['001'])
+        self.assertEqual(len(self.order_controller.get_orders_by_customer_email('a@example.com')), 1)
+        summary = self.order_controller.create_orders_bulk([
+            {'order_id': order_id, 'order_date': '01-01-2023', 'total_price': 500.0,
+             'order_products': [{'product_id': pid, 'quantity': 1, 'price_per_unit': 500.0}],
+             'payment_method': 'Cash', 'order_status': 'Pending', 'created_at': '2023-01-01 00:00:00',
+             'updated_at': '2023-01-01 00:00:00', 'customer_email': email}
+            for order_id, email, pid in (('1', 'b@example.com', '001'), ('2', 'a@example.com', ' 001'),
+                                         ('3', 'a@example.com', '999'))
+        ])
+        self.assertEqual(summary, {'inserted': 1, 'updated': 1, 'rejected': 1})
+        self.assertEqual([o.order_id for o in self.order_controller.get_all_orders()], ['1', '2'])
+        self.assertEqual([o.order_id for o in self.order_controller.get_orders_by_customer_email('a@example.com')],
+                         ['2'])
+        self.assertEqual(self.order_controller.get_units_sold_by_product(), {'001': 2})
+
+    def test_date_index_matches_a_full_sort(self):
+        rng = random.Random(11)
+        for step in range(400):
+            order_id = str(rng.randrange(120))
+            if rng.random() < 0.2:
+                self.order_controller.delete_order_by_id(order_id)
+                continue
+            self.mock_product_manager.get_product_by_id.return_value = MagicMock()
+            self.order_controller.create_order(
+                order_id, f'{rng.randint(1, 28):02d}-{rng.randint(1, 3):02d}-2024', 10.0,
+                [{'product_id': '001', 'quantity': 1, 'price_per_unit': 10.0}],
+                'Cash', 'Pending', '2024-01-01 00:00:00', '2024-01-01 00:00:00', 'a@example.com')
+            if step % 50 == 0:
+                self.order_controller.get_latest_orders(1)
+        by_date = sorted(self.order_controller.get_all_orders(),
+                         key=lambda o: datetime.strptime(o.order_date, '%d-%m-%Y'), reverse=True)
+        self.assertEqual(self.order_controller.get_latest_orders(5), by_date[:5])
+        self.assertEqual(self.order_controller.get_orders_by_date(), by_date)
+        self.assertEqual(self.order_controller.get_orders_by_date(reverse=True), by_date[::-1])
+        in_february = [o for o in by_date if o.order_date.endswith('-02-2024')]
+        self.assertEqual(self.order_controller.get_orders_between('2024-02-01', date(2024, 2, 29)), in_february)
+        self.assertEqual(self.order_controller.get_orders_between('2024-02-01', '2024-02-29', reverse=True),
+                         in_february[::-1])
+
+    def test_orders_page_by_date(self):
+        for order_id, day in (('1', 3), ('2', 1), ('3', 2), ('4', 3), ('5', 1)):
+            self.create_sample_order(order_id, 'a@example.com', ['001'], f'0{day}-01-2024')
+        by_date = self.order_controller.get_orders_by_date()
+        pages, cursor = [], None
+        while True:
+            page = self.order_controller.get_orders_page(2, cursor, sort_key='order_date')
+            pages.append([o.order_id for o in page])
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual(pages, [['1', '4'], ['3', '2'], ['5']])
+        self.assertEqual(sum(pages, []), [o.order_id for o in by_date])
+        page = self.order_controller.get_orders_page(3, sort_key='order_date', reverse=True)
+        self.assertEqual([o.order_id for o in page], ['5', '2', '3'])
+        page = self.order_controller.get_orders_page(3, page.next_cursor, sort_key='order_date', reverse=True)
+        self.assertEqual([o.order_id for o in page], ['4', '1'])
+
+    def test_aggregates_follow_changes(self):
+        """Running sales totals match a full recompute after random creates, updates and deletes"""
+        self.mock_product_manager.get_product_by_id.return_value = MagicMock()
+        rng = random.Random(14)
+        for _ in range(300):
+            order_id = str(rng.randrange(30))
+            action = rng.random()
+            if action < 0.7:
+                lines = [{'product_id': pid, 'product_name': f'Product {pid}', 'quantity': rng.randint(1, 5),
+                          'price_per_unit': rng.choice([0.1, 0.2, 19.99, 500.0])}
+                         for pid in rng.sample(['001', '002', '003', '004'], rng.randint(1, 3))]
+                total = sum(line['quantity'] * line['price_per_unit'] for line in lines)
+                self.order_controller.create_order(
+                    order_id, '01-01-2023', total, lines, 'Credit Card', 'Pending',
+                    '2023-01-01 00:00:00', '2023-01-01 00:00:00', f'{rng.randrange(5)}@example.com'
+                )
+            elif action < 0.85:
+                self.order_controller.delete_order_by_id(order_id)
+            else:
+                self.order_controller.delete_orders_by_customer_email(f'{rng.randrange(5)}@example.com')
+        self.assertEqual(self.order_controller.verify_aggregates(), [])
+        orders = self.order_controller.get_all_orders()
+        self.assertAlmostEqual(self.order_controller.get_total_sales(), sum(float(o.total_price) for o in orders))
+        units = {}
+        for order in orders:
+            for op in order.order_products:
+                units[op.product_name] = units.get(op.product_name, 0) + op.quantity
+        self.assertEqual(self.order_controller.get_units_sold_by_product_name(), units)
+
+    def test_orders_take_stock(self):
+        """New orders take their stock, updates only the difference, bulk orders short of stock are rejected"""
+        product_controller = ProductController()
+        order_controller = OrderController(product_controller)
+        for pid in ('001', '002'):
+            product_controller.create_product(pid, 'Laptop', 10.0, 'Electronics', 5, '2023-01-01', '2023-01-01')
+        stock = lambda pid: product_controller.get_product_by_id(pid).stock_quantity
+
+        def order(order_id, lines):
+            return {'order_id': order_id, 'order_date': '01-01-2023', 'order_status': 'Pending', 'total_price': 0.0,
+                    'order_products': [{'product_id': pid, 'quantity': qty, 'price_per_unit': 10.0}
+                                       for pid, qty in lines],
+                    'payment_method': 'Cash', 'created_at': '2023-01-01 00:00:00',
+                    'updated_at': '2023-01-01 00:00:00', 'customer_email': 'a@example.com'}
+
+        order_controller.create_order(**order('1', [('001', 2), ('002', 1)]))
+        order_controller.create_order(**order('1', [('001', 3)]))
+        self.assertEqual((stock('001'), stock('002')), (2, 5))
+        with self.assertLogs(level='ERROR'):
+            order_controller.create_order(**order('2', [('002', 1), ('001', 3)]))
+            summary = order_controller.create_orders_bulk([order('3', [('002', 5)]), order('4', [('001', 3)])])
+        self.assertIsNone(order_controller.get_order_by_id('2'))
+        self.assertEqual(summary, {'inserted': 1, 'updated': 0, 'rejected': 1})
+        self.assertEqual((stock('001'), stock('002')), (2, 0))
+        order_controller.create_orders_bulk([order('5', [('001', 9)])], reserve_stock=False)
+        self.assertEqual(stock('001'), 2)
+
+    def test_delete_order_by_id(self):
+        self.create_sample_order('1', 'a@example.com', ['001'])
+        self.assertTrue(self.order_controller.delete_order_by_id('1'))
+        self.assertFalse(self.order_controller.delete_order_by_id('1'))
+        self.assertEqual(self.order_controller.get_orders_by_product_id('001'), [])
+
+
+class TestChangeFeed(unittest.TestCase):
+
+    def setUp(self):
+        self.changes = ChangeFeed()
+        self.product_controller = ProductController(changes=self.changes)
+        self.order_controller = OrderController(self.product_controller, changes=self.changes)
+        self.customer_controller = CustomerController(self.order_controller, changes=self.changes)
+        self.events = []
+        self.changes.subscribe(self.events.append)
+        self.product_controller.create_product('001', 'Laptop', 1500.0, 'Electronics', 100, '2023-01-01',
+                                               '2023-01-01')
+        self.customer_controller.create_customer(
+            'John', 'Doe', '1990-01-01', 'a@example.com', '1234567890',
+            'USA', 'New York', '10001', '2023-01-01', '2023-01-01'
+        )
+
+    def create_order(self, order_id, quantity=1):
+        self.order_controller.create_order(
+            order_id, '01-01-2023', 1500.0 * quantity,
+            [{'product_id': '001', 'quantity': quantity, 'price_per_unit': 1500.0}],
+            'Credit Card', 'Pending', '2023-01-01 00:00:00', '2023-01-01 00:00:00', 'a@example.com'
+        )
+
+    def test_events_describe_each_change(self):
+        """Creates, updates and deletes are published in order with the records before and after"""
+        self.create_order('1')
+        self.create_order('1', quantity=2)
+        self.customer_controller.delete_customer_by_email('a@example.com')
+        self.assertEqual([(e.version, e.entity, e.action, e.key) for e in self.events], [
+            (1, 'product', ChangeEvent.CREATED, '001'),
+            (2, 'customer', ChangeEvent.CREATED, 'a@example.com'),
+            (3, 'product', ChangeEvent.UPDATED, '001'),
+            (4, 'order', ChangeEvent.CREATED, '1'),
+            (5, 'product', ChangeEvent.UPDATED, '001'),
+            (6, 'order', ChangeEvent.UPDATED, '1'),
+            (7, 'order', ChangeEvent.DELETED, '1'),
+            (8, 'product', ChangeEvent.UPDATED, '001'),
+            (9, 'customer', ChangeEvent.DELETED, 'a@example.com'),
+        ])
+        update = self.events[5]
+        self.assertEqual((update.before.order_products[0].quantity, update.after.order_products[0].quantity), (1, 2))
+        self.assertEqual((self.events[4].before.stock_quantity, self.events[4].after.stock_quantity), (99, 98))
+        self.assertIsNone(self.events[6].after)
+        # The deleted order gave its 2 units back
+        self.assertEqual((self.events[7].before.stock_quantity, self.events[7].after.stock_quantity), (98, 100))
+        self.assertEqual(self.changes.data_version, 9)
+
+    def test_bulk_changes_and_entity_filter(self):
+        """Bulk upserts publish one event per record, subscribers can pick the entities they follow"""
+        orders = []
+        self.changes.subscribe(orders.append, entities=['order'])
+        self.create_order('1')
+        summary = self.order_controller.create_orders_bulk([
+            {'order_id': order_id, 'order_date': '01-01-2023', 'order_status': 'Pending', 'total_price': 1500.0,
+             'order_products': [{'product_id': '001', 'quantity': 1, 'price_per_unit': 1500.0}],
+             'payment_method': 'Credit Card', 'created_at': '2023-01-01 00:00:00',
+             'updated_at': '2023-01-01 00:00:00', 'customer_email': 'a@example.com'}
+            for order_id in ('1', '2')
+        ])
+        self.assertEqual(summary, {'inserted': 1, 'updated': 1, 'rejected': 0})
+        self.assertEqual([(e.action, e.key) for e in orders],
+                         [(ChangeEvent.CREATED, '1'), (ChangeEvent.UPDATED, '1'), (ChangeEvent.CREATED, '2')])
+        # Plus the stock taken by orders 1 and 2 (re-sending order 1 unchanged takes nothing more)
+        self.assertEqual(len(self.events), 7)
+
+    def test_changes_since(self):
+        """Consumers can catch up from a data version, or learn that they have to start over"""
+        self.assertEqual([e.key for e in self.changes.changes_since(1)], ['a@example.com'])
+        self.assertEqual(self.changes.changes_since(2), [])
+        changes = ChangeFeed(history_size=2)
+        for key in 'abc':
+            changes.publish('customer', key, None, object())
+        self.assertEqual([e.key for e in changes.changes_since(1)], ['b', 'c'])
+        self.assertIsNone(changes.changes_since(0))
+
+    def test_failing_subscriber_does_not_fail_the_write(self):
+        """A subscriber raising an error is logged, the change and the other subscribers go ahead"""
+        def fail(event):
+            raise RuntimeError('boom')
+        self.changes.subscribe(fail)
+        after = []
+        self.changes.subscribe(after.append, entities=['order'])
+        with self.assertLogs(level='ERROR'):
+            self.create_order('1')
+        self.assertIsNotNone(self.order_controller.get_order_by_id('1'))
+        self.assertEqual([e.key for e in after], ['1'])
+        self.changes.unsubscribe(fail)
+        self.create_order('2')
+        self.assertEqual([e.key for e in after], ['1', '2'])
+
+
+class TestQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.product_controller = ProductController()
+        self.order_controller = OrderController(self.product_controller)
+        self.customer_controller = CustomerController(self.order_controller)
+        for product_id, price in (('001', 1500.0), ('002', 20.0)):
+            self.product_controller.create_product(product_id, f'Product {product_id}', price, 'Electronics', 10,
+                                                   '2023-01-01', '2023-01-01')
+        customers = (('a@example.com', 'Melbourne', '1995-10-07'), ('b@example.com', 'Sydney', '1998-10-06'),
+                     ('c@example.com', 'Melbourne', '1988-10-08'))
+        for email, city, dob in customers:
+            self.customer_controller.create_customer('John', 'Doe', dob, email, '1234567890', 'Australia', city,
+                                                     '3000', '2023-01-01', '2023-01-01')
+        orders = [
+            ('1', '05-01-2023', 'Delivered', 'Credit Card', 'a@example.com', '001', 1),
+            ('2', '01-02-2023', 'Delivered', 'PayPal', 'b@example.com', '001', 2),
+            ('3', '15-01-2023', 'Pending', 'Credit Card', 'a@example.com', '002', 3),
+            ('4', '20-03-2023', 'Delivered', 'Credit Card', 'c@example.com', '001', 2),
+            ('5', '15-01-2023', 'Delivered', 'Credit Card', 'b@example.com', '002', 1),
+        ]
+        for order_id, order_date, status, payment, email, product_id, quantity in orders:
+            price = self.product_controller.get_product_by_id(product_id).price
+            self.order_controller.create_order(
+                order_id, order_date, price * quantity,
+                [{'product_id': product_id, 'quantity': quantity, 'price_per_unit': price}],
+                payment, status, '2023-01-01 00:00:00', '2023-01-01 00:00:00', email
+            )
+
+    def test_customer_filters_scan(self):
+        """Filters on fields without an index scan the customers"""
+        query = self.customer_controller.query().where('city', '==', 'Melbourne').where('dob', '>', '1990-01-01')
+        self.assertEqual([c.email for c in query.execute()], ['a@example.com'])
+        self.assertEqual(query.explain()['access'], 'full scan')
+        self.assertEqual(self.customer_controller.query().where('city', '==', 'Perth').execute(), [])
+
+    def test_primary_key_lookup(self):
+        """Equality on the key reads only the matching records"""
+        query = self.customer_controller.query().where('email', 'in', ['b@example.com', 'x@example.com'])
+        self.assertEqual([c.email for c in query.execute()], ['b@example.com'])
+        self.assertEqual(query.explain()['estimated_rows'], 1)
+        query = self.product_controller.query().where('product_id', '==', ' 002 ').select('product_name')
+        self.assertEqual(query.execute(), [{'product_name': 'Product 002'}])
+        self.assertTrue(query.explain()['access'].startswith('primary key product_id'))
+
+    def test_order_filters_use_the_most_selective_index(self):
+        """The customer index answers its predicate, the other predicates filter what it returns"""
+        query = (self.order_controller.query().where('order_status', '==', 'Delivered')
+                 .where('total_price', '>', 1000).where('payment_method', '==', 'Credit Card'))
+        self.assertEqual([o.order_id for o in query.execute()], ['1', '4'])
+        self.assertEqual(query.explain()['access'], 'full scan')
+        query.where('customer_email', '==', 'c@example.com')
+        self.assertEqual([o.order_id for o in query.execute()], ['4'])
+        plan = query.explain()
+        self.assertTrue(plan['access'].startswith('index orders_by_customer'))
+        self.assertEqual(plan['estimated_rows'], 1)
+        self.assertEqual(len(plan['filter']), 3)
+
+    def test_date_range_uses_the_date_index(self):
+        """Range predicates on order_date are combined into one date index lookup"""
+        query = (self.order_controller.query().where('order_date', '>=', '2023-01-15')
+                 .where('order_date', '<', date(2023, 3, 20)))
+        self.assertEqual(sorted(o.order_id for o in query.execute()), ['2', '3', '5'])
+        plan = query.explain()
+        self.assertTrue(plan['access'].startswith('index orders_by_date'))
+        self.assertEqual((plan['estimated_rows'], plan['filter']), (3, []))
+        query = self.order_controller.query().where('order_date', '==', '2023-01-15').where('order_id', '!=', '3')
+        self.assertEqual([o.order_id for o in query.execute()], ['5'])
+
+    def test_sort_limit_and_select(self):
+        """Sorted queries return the top records, sorting on order_date reads the date index in order"""
+        query = self.order_controller.query().order_by('total_price', reverse=True).limit(2)
+        query.select('order_id', 'total_price')
+        self.assertEqual(query.execute(),
+                         [{'order_id': '2', 'total_price': 3000.0}, {'order_id': '4', 'total_price': 3000.0}])
+        query = self.order_controller.query().where('order_status', '==', 'Delivered').order_by('order_date').limit(3)
+        self.assertEqual([o.order_id for o in query.execute()], ['1', '5', '2'])
+        self.assertEqual(query.explain()['sort'], 'order_date ascending (index orders_by_date)')
+        query = self.order_controller.query().order_by('order_date', reverse=True)
+        self.assertEqual([o.order_id for o in query.execute()], ['4', '2', '3', '5', '1'])
+
+    def test_invalid_queries(self):
+        """Unknown fields, operators and negative limits are refused"""
+        with self.assertRaises(ValueError):
+            self.order_controller.query().where('colour', '==', 'red')
+        with self.assertRaises(ValueError):
+            self.order_controller.query().where('order_id', '~', '1')
+        with self.assertRaises(ValueError):
+            self.order_controller.query().limit(-1)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from controllers.controllers import CustomerController, ProductController, OrderController
+from data.data import IPCMSData
+from data.generator import DatasetGenerator, random_postcode
+from data.parallel_loader import ParallelLoader
+from operations.import_files import ImportOperations
+from utils.validators import CheckValidator
+
+
+class TestDatasetGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.generator = DatasetGenerator(seed=7, customers=300, products=20, orders=400, employees=12)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def managers(self):
+        product_manager = ProductController()
+        order_manager = OrderController(product_manager)
+        customer_manager = CustomerController(order_manager)
+        return customer_manager, product_manager, order_manager
+
+    def test_deterministic(self):
+        """Test that the same seed gives the same records and another seed other records."""
+        other = DatasetGenerator(seed=7, customers=300, products=20, orders=400, employees=12)
+        self.assertEqual(list(other.customers()), list(self.generator.customers()))
+        self.assertEqual(list(other.orders()), list(self.generator.orders()))
+        self.assertEqual(other.employee_logins(), self.generator.employee_logins())
+        reseeded = DatasetGenerator(seed=8, customers=300, products=20, orders=400, employees=12)
+        self.assertNotEqual(list(reseeded.customers()), list(self.generator.customers()))
+
+    def test_valid_formats(self):
+        """Test that the generated customers pass every check of the customer import."""
+        validator = CheckValidator()
+        served_countries = IPCMSData().full_served_countries
+        customers = list(self.generator.customers())
+        self.assertEqual(len({customer['email'] for customer in customers}), 300)
+        for customer in customers:
+            self.assertTrue(validator.is_alpha(customer['first_name']))
+            self.assertTrue(validator.is_alpha(customer['city']))
+            self.assertTrue(validator.is_valid_date_of_birth(customer['dob']))
+            self.assertTrue(validator.is_email(customer['email']))
+            self.assertTrue(validator.is_phone_num(customer['phone']))
+            self.assertTrue(validator.is_served_country(customer['country'], served_countries))
+            self.assertTrue(validator.is_postcode(customer['country'], customer['postcode'], served_countries))
+            self.assertTrue(validator.is_datetime(customer['created_at']))
+            self.assertLessEqual(customer['created_at'], customer['updated_at'])
+        self.assertEqual(random_postcode(self.generator.random('postcodes'), '^0000$'), '0000')
+
+    def test_datasets_load_without_rejections(self):
+        """Test that a written dataset directory seeds the controllers with every record."""
+        data_dir = os.path.join(self.temp_dir.name, 'datasets')
+        self.generator.write_datasets(data_dir)
+        ipcms_data = IPCMSData(data_dir=data_dir)
+        self.assertEqual(len(ipcms_data.employee_data_with_constraints), 12)
+        self.assertEqual(ipcms_data.employee_login_dict[100000]['Login Name'], 'admin')
+        customer_manager, product_manager, order_manager = self.managers()
+        with self.assertLogs(level='INFO') as logs:
+            ParallelLoader(customer_manager, product_manager, order_manager, data_dir).load(parallel=False)
+        self.assertIn('INFO:root:Customers: 300 inserted, 0 updated, 0 rejected.', logs.output)
+        self.assertIn('INFO:root:Orders: 400 inserted, 0 updated, 0 rejected.', logs.output)
+        self.assertEqual(len(product_manager.get_all_products()), 20)
+
+    def test_import_files(self):
+        """Test that the written CSV and JSON files are imported in full by ImportOperations."""
+        self.generator.write_import_files(self.temp_dir.name)
+        customer_manager, product_manager, order_manager = self.managers()
+        ipcms_data = IPCMSData()
+        import_ops = ImportOperations(customer_manager, product_manager, order_manager, ipcms_data)
+        working_dir = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        try:
+            import_ops.read_csv('customer')
+            import_ops.read_csv('product')
+            import_ops.read_json('order')
+        finally:
+            os.chdir(working_dir)
+        self.assertEqual(len(customer_manager.get_all_customers()), 300)
+        self.assertEqual(len(product_manager.get_all_products()), 20)
+        self.assertEqual(len(order_manager.get_all_orders()), 400)
+
+    def test_imported_orders_take_their_stock(self):
+        """Test that the generated stock covers every imported order, even with many orders per product."""
+        generator = DatasetGenerator(seed=1, customers=200, products=5, orders=3000, employees=1)
+        generator.write_import_files(self.temp_dir.name)
+        customer_manager, product_manager, order_manager = self.managers()
+        import_ops = ImportOperations(customer_manager, product_manager, order_manager, IPCMSData())
+        summaries = []
+        create_orders_bulk = order_manager.create_orders_bulk
+        order_manager.create_orders_bulk = lambda orders: summaries.append(create_orders_bulk(orders))
+        working_dir = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        try:
+            import_ops.read_csv('product')
+            import_ops.read_json('order')
+        finally:
+            os.chdir(working_dir)
+        self.assertEqual(summaries, [{'inserted': 3000, 'updated': 0, 'rejected': 0}])
+        # What is left of each product's stock is its headroom
+        for product, ordered in zip(generator.products(), generator.ordered_quantities()):
+            stock = product_manager.get_product_by_id(product['product_id']).stock_quantity
+            self.assertEqual(stock, int(product['stock_quantity']) - ordered)
+            self.assertGreaterEqual(stock, 100)
+
+    def test_populate(self):
+        """Test that populating in chunks gives the controllers every record, and the payslips."""
+        customer_manager, product_manager, order_manager = self.managers()
+        ipcms_data = IPCMSData()
+        self.generator.populate(customer_manager, product_manager, order_manager, ipcms_data, chunk_size=64)
+        self.assertEqual([customer.to_dict() for customer in customer_manager.get_all_customers()],
+                         list(self.generator.customers()))
+        self.assertEqual(len(order_manager.get_all_orders()), 400)
+        self.assertEqual(len(ipcms_data.payslip_table), 12)
+        self.assertEqual(ipcms_data.payslip_table[0]['Full Name'], 'Admin User')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from controllers.controllers import CustomerController, ProductController, OrderController
+from data.data import IPCMSData
+from operations.import_files import ImportOperations
+
+
+class TestImportCsv(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.working_dir = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        self.product_manager = ProductController()
+        self.order_manager = OrderController(self.product_manager)
+        self.customer_manager = CustomerController(self.order_manager)
+        self.import_ops = ImportOperations(self.customer_manager, self.product_manager, self.order_manager,
+                                           IPCMSData())
+        self.import_ops.CHUNK_SIZE = 2
+
+    def tearDown(self):
+        os.chdir(self.working_dir)
+        self.temp_dir.cleanup()
+
+    def write(self, filename, lines):
+        with open(filename, 'w', newline='') as file:
+            file.write('\n'.join(lines) + '\n')
+
+    def test_customers_in_chunks(self):
+        """Test that customer rows are imported chunk by chunk, converted or rejected as one by one."""
+        self.write('customers.csv', [
+            'No.,first_name,last_name,dob,email,phone,country,city,pc,created_at,updated_at',
+            '1,John,Doe,1990-01-15,john@example.com,0414-123-456,Australia,Melbourne,3000,'
+            '2023-01-01 10:00:00,2023-01-02 10:00:00',
+            '2,Jane,Roe,15/01/1991,jane@example.com,0414-123-457,Australia,Sydney,2000,'
+            '01/02/2023 10:00,2023-01-02 10:00:00',
+            '3,Bad,Phone,1990-01-15,bad@example.com,12345,Australia,Sydney,2000,'
+            '2023-01-01 10:00:00,2023-01-02 10:00:00',
+            '4,Short,Row,1990-01-15',
+            '5,Wei,Wang,1985-05-05,wei@example.com,0414-123-458,China,Beijing,100000,'
+            '2023-01-01 10:00:00,2023-01-02 10:00:00',
+            '6,John,Doe,1990-01-15,john@example.com,0414-123-456,Australia,Perth,6000,'
+            '2023-01-01 10:00:00,2023-01-03 10:00:00',
+        ])
+        with self.assertLogs(level='INFO') as logs:
+            self.import_ops.read_csv('customer')
+        customers = {customer.email: customer for customer in self.customer_manager.get_all_customers()}
+        self.assertEqual(list(customers), ['john@example.com', 'jane@example.com', 'wei@example.com'])
+        self.assertEqual(customers['john@example.com'].city, 'Perth')
+        # Accepted in another format, kept as written like before
+        self.assertEqual(customers['jane@example.com'].dob, '15/01/1991')
+        self.assertIn("ERROR:root:Invalid phone number '12345'. Skipping this record.", logs.output)
+        self.assertTrue(any("Error: adding customer 'None'" in message for message in logs.output))
+        self.assertTrue(any('6 rows read, 4 added in' in message and 'rows/sec' in message
+                            for message in logs.output))
+
+    def test_products_in_chunks(self):
+        """Test that product rows are converted to the standard formats and bad rows rejected."""
+        self.write('products.csv', [
+            'pid,product_name,price,category,qty,created_at,updated_at',
+            ' 001 ,Robot,311.98,Personal,100,2024-01-10 09:15:23,2024-09-01 12:45:56',
+            '002,Robot Two,abc,Personal,100,2024-01-10 09:15:23,2024-09-01 12:45:56',
+            '003,Robot Three,99,Pet,5,10/01/2024 09:15,2024/09/01 12:45:56',
+        ])
+        with self.assertLogs(level='INFO') as logs:
+            self.import_ops.read_csv('product')
+        products = self.product_manager.get_all_products()
+        self.assertEqual([product.product_id for product in products], ['001', '003'])
+        self.assertEqual(products[0].price, 311.98)
+        self.assertEqual(products[1].stock_quantity, 5)
+        self.assertEqual((products[1].created_at, products[1].updated_at),
+                         ('2024-01-10 09:15:00', '2024-09-01 12:45:56'))
+        self.assertIn("ERROR:root:Invalid price 'abc' for product 'Robot Two'. Skipping this record.", logs.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
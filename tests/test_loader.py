@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from data.data import IPCMSData
+from data.loader import SEED_DIR, dataset_path, iter_dataset, load_dataset
+
+
+class TestLoadDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = dataset_path('items', self.temp_dir.name)
+        self.write([{'id': 1}])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, data, mtime_ns=None):
+        with open(self.path, 'w') as file:
+            json.dump(data, file)
+        if mtime_ns is not None:
+            os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_parsed_once(self):
+        """Test that an unchanged file is parsed once and the same data returned."""
+        with patch('data.loader.json.loads', side_effect=json.loads) as mock_loads:
+            first = load_dataset('items', self.temp_dir.name)
+            second = load_dataset('items', self.temp_dir.name)
+        self.assertEqual(first, [{'id': 1}])
+        self.assertIs(first, second)
+        self.assertEqual(mock_loads.call_count, 1)
+
+    def test_touched_file_is_not_parsed_again(self):
+        """Test that a file with a new modification time but the same content is hashed, not parsed."""
+        first = load_dataset('items', self.temp_dir.name)
+        self.write([{'id': 1}], mtime_ns=os.stat(self.path).st_mtime_ns + 10 ** 9)
+        with patch('data.loader.json.loads') as mock_loads:
+            self.assertIs(load_dataset('items', self.temp_dir.name), first)
+        mock_loads.assert_not_called()
+
+    def test_changed_file_is_parsed_again(self):
+        """Test that a changed file is read again."""
+        load_dataset('items', self.temp_dir.name)
+        self.write([{'id': 1}, {'id': 2}], mtime_ns=os.stat(self.path).st_mtime_ns + 10 ** 9)
+        self.assertEqual(load_dataset('items', self.temp_dir.name), [{'id': 1}, {'id': 2}])
+
+    def test_iter_dataset(self):
+        """Test that a dataset is read in chunks of records, and that it must be a JSON array."""
+        self.write([{'id': number} for number in range(5)])
+        chunks = list(iter_dataset('items', self.temp_dir.name, chunk_size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual([record for chunk in chunks for record in chunk], load_dataset('items', self.temp_dir.name))
+        self.write([])
+        self.assertEqual(list(iter_dataset('items', self.temp_dir.name)), [])
+        self.write({'id': 1})
+        with self.assertRaises(ValueError):
+            list(iter_dataset('items', self.temp_dir.name))
+
+    def test_missing_file(self):
+        """Test that a missing dataset raises FileNotFoundError."""
+        with self.assertRaises(FileNotFoundError):
+            load_dataset('missing', self.temp_dir.name)
+
+
+class TestDatasetDirectory(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.temp_dir.name, 'datasets')
+        shutil.copytree(SEED_DIR, self.data_dir)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_other_datasets(self):
+        """Test that IPCMSData seeds from the dataset files of another directory."""
+        with open(dataset_path('customers', self.data_dir)) as file:
+            customers = json.load(file)
+        with open(dataset_path('customers', self.data_dir), 'w') as file:
+            json.dump(customers[:3], file)
+        ipcms_data = IPCMSData(data_dir=self.data_dir)
+        self.assertEqual(len(ipcms_data.enterprise_data.customers), 3)
+        self.assertEqual(len(ipcms_data.enterprise_data.products), 8)
+        self.assertEqual(len(IPCMSData().enterprise_data.customers), 20)
+
+    def test_reference_tables(self):
+        """Test that the reference tables keep their types and are not shared between instances."""
+        ipcms_data = IPCMSData(data_dir=self.data_dir)
+        self.assertIn(100000, ipcms_data.employee_login_dict)
+        self.assertIn((180001, None, 45.0), ipcms_data.victoria_tax_table)
+        self.assertIsInstance(ipcms_data.currency_conversion_table, tuple)
+        ipcms_data.currency_conversion_table[0]["Rate to AUD"] = 1.5
+        ipcms_data.employee_login_dict[100000]["Password"] = 'changed'
+        other = IPCMSData(data_dir=self.data_dir)
+        self.assertEqual(other.currency_conversion_table[0]["Rate to AUD"], 1.0)
+        self.assertEqual(other.employee_login_dict[100000]["Password"], 'admin123')
+
+
+if __name__ == '__main__':
+    unittest.main()
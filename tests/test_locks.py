@@ -0,0 +1,214 @@
+import sys
+import threading
+import unittest
+from controllers.controllers import CustomerController, ProductController, OrderController
+from controllers.locks import ReadWriteLock
+from models.models import Order
+
+
+class TestReadWriteLock(unittest.TestCase):
+
+    def test_readers_share_the_lock(self):
+        """Test that two readers can hold the lock at the same time."""
+        lock = ReadWriteLock()
+        both_reading = threading.Barrier(2, timeout=5)
+
+        def read():
+            with lock.read():
+                both_reading.wait()
+
+        threads = [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(both_reading.broken)
+
+    def test_writer_excludes_readers(self):
+        """Test that a reader waits until the writer is done."""
+        lock = ReadWriteLock()
+        events = []
+
+        def read():
+            with lock.read():
+                events.append('read')
+
+        lock.acquire_write()
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(0.1)
+        events.append('written')
+        lock.release_write()
+        reader.join()
+        self.assertEqual(events, ['written', 'read'])
+
+    def test_reentrant(self):
+        """Test that a writer can read and write again, and that a reader cannot upgrade."""
+        lock = ReadWriteLock()
+        with lock.write(), lock.read(), lock.write():
+            pass
+        with lock.read(), lock.read():
+            with self.assertRaises(RuntimeError):
+                lock.acquire_write()
+        self.assertIsNone(lock.writer)
+        self.assertEqual(lock.readers, 0)
+
+
+class TestConcurrentControllers(unittest.TestCase):
+
+    def setUp(self):
+        self.switch_interval = sys.getswitchinterval()
+        # Switch threads as often as possible to shake out races
+        sys.setswitchinterval(1e-6)
+        self.product_manager = ProductController()
+        self.order_manager = OrderController(self.product_manager)
+        self.customer_manager = CustomerController(self.order_manager)
+        self.product_manager.create_product('001', 'EMO Robot', 10.0, 'Personal', 10000,
+                                            '2024-01-10 09:15:23', '2024-09-01 12:45:56')
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def create_order(self, order_id, customer_email, quantity):
+        self.order_manager.create_order(
+            order_id, '22-08-2024', quantity * 10.0,
+            [{'product_id': '001', 'product_name': 'EMO Robot', 'quantity': quantity, 'price_per_unit': 10.0}],
+            'Cash', f'v{quantity}', '2024-08-21 09:00:00', '2024-08-21 09:00:00', customer_email)
+
+    def test_stress_readers_and_writers(self):
+        """Test that concurrent writers lose no update and readers never see a torn order."""
+        writers, orders_per_writer, versions = 4, 25, 4
+        errors = []
+        done = threading.Event()
+
+        def write(writer):
+            for version in range(1, versions + 1):
+                for number in range(orders_per_writer):
+                    self.create_order(f'W{writer}-{number}', f'w{writer}@example.com', version)
+                    if version == versions and number % 5 == 0:
+                        self.order_manager.update_order_by_id(Order(
+                            f'W{writer}-{number}', '22-08-2024', 'v0', 0.0, [], 'Cash',
+                            '2024-08-21 09:00:00', '2024-08-21 09:00:00', f'w{writer}@example.com'))
+
+        def read():
+            while not done.is_set():
+                for order in self.order_manager.get_all_orders():
+                    quantity = sum(op.quantity for op in order.order_products)
+                    if order.order_status != f'v{quantity}' or order.total_price != quantity * 10.0:
+                        errors.append(order.to_dict())
+                units = self.order_manager.get_units_sold_by_product().get('001', 0)
+                if self.order_manager.get_total_sales() < 0 or units < 0:
+                    errors.append(units)
+                for writer in range(writers):
+                    for order in self.order_manager.get_orders_by_customer_email(f'w{writer}@example.com'):
+                        if order.customer_email != f'w{writer}@example.com':
+                            errors.append(order.to_dict())
+
+        readers = [threading.Thread(target=read) for _ in range(3)]
+        writer_threads = [threading.Thread(target=write, args=(writer,)) for writer in range(writers)]
+        for thread in readers + writer_threads:
+            thread.start()
+        for thread in writer_threads:
+            thread.join()
+        done.set()
+        for thread in readers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        orders = self.order_manager.get_all_orders()
+        self.assertEqual(len(orders), writers * orders_per_writer)
+        expected_units = writers * ((orders_per_writer - orders_per_writer // 5) * versions)
+        self.assertEqual(sum(sum(op.quantity for op in order.order_products) for order in orders), expected_units)
+        self.assertEqual(self.order_manager.get_units_sold_by_product()['001'], expected_units)
+        self.assertEqual(self.order_manager.get_total_sales(), expected_units * 10.0)
+        for writer in range(writers):
+            self.assertEqual(len(self.order_manager.get_orders_by_customer_email(f'w{writer}@example.com')),
+                             orders_per_writer)
+        # The stock left plus the units held in orders is what there was (the emptied orders gave theirs back)
+        self.assertEqual(self.product_manager.get_product_by_id('001').stock_quantity, 10000 - expected_units)
+
+    def test_concurrent_orders_never_oversell(self):
+        """Test that orders racing for the same stock take exactly what is there, all lines or none."""
+        self.product_manager.create_product('002', 'Moxie Robot', 10.0, 'Personal', 30,
+                                            '2024-01-10 09:15:23', '2024-09-01 12:45:56')
+
+        def write(writer):
+            for number in range(20):
+                self.order_manager.create_order(
+                    f'W{writer}-{number}', '22-08-2024', 20.0,
+                    [{'product_id': '002', 'quantity': 1, 'price_per_unit': 10.0},
+                     {'product_id': '001', 'quantity': 1, 'price_per_unit': 10.0}],
+                    'Cash', 'Pending', '2024-08-21 09:00:00', '2024-08-21 09:00:00', f'w{writer}@example.com')
+
+        threads = [threading.Thread(target=write, args=(writer,)) for writer in range(4)]
+        with self.assertLogs(level='ERROR'):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(self.order_manager.get_order_count(), 30)
+        self.assertEqual(self.product_manager.get_product_by_id('002').stock_quantity, 0)
+        # The orders turned down took nothing from the first product either
+        self.assertEqual(self.product_manager.get_product_by_id('001').stock_quantity, 10000 - 30)
+
+    def test_stock_conserved_across_order_writes(self):
+        """Test that the stock left plus the units held in orders stays constant through creates, updates and
+        deletes, from several threads."""
+        def held_units():
+            return sum(op.quantity for order in self.order_manager.get_all_orders() for op in order.order_products)
+
+        def order(order_id, customer_email, quantity):
+            return Order(order_id, '22-08-2024', 'Pending', quantity * 10.0,
+                         [{'product_id': '001', 'quantity': quantity, 'price_per_unit': 10.0}], 'Cash',
+                         '2024-08-21 09:00:00', '2024-08-21 09:00:00', customer_email)
+
+        def write(writer):
+            customer_email = f'w{writer}@example.com'
+            for number in range(30):
+                order_id = f'W{writer}-{number % 6}'
+                action = number % 4
+                if action == 0:
+                    self.create_order(order_id, customer_email, number % 5 + 1)
+                elif action == 1:
+                    self.order_manager.update_order_by_id(order(order_id, customer_email, number % 7 + 1))
+                elif action == 2:
+                    self.order_manager.delete_order_by_id(order_id)
+                else:
+                    self.customer_manager.delete_customer_by_email(customer_email)
+
+        threads = [threading.Thread(target=write, args=(writer,)) for writer in range(4)]
+        with self.assertLogs(level='INFO'):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(self.product_manager.get_product_by_id('001').stock_quantity + held_units(), 10000)
+
+        # An update short of stock changes nothing
+        self.create_order('S1', 's@example.com', 1)
+        stock = self.product_manager.get_product_by_id('001').stock_quantity
+        with self.assertLogs(level='ERROR'):
+            self.assertFalse(self.order_manager.update_order_by_id(order('S1', 's@example.com', stock + 2)))
+        self.assertEqual(self.order_manager.get_order_by_id('S1').order_products[0].quantity, 1)
+        self.assertEqual(self.product_manager.get_product_by_id('001').stock_quantity + held_units(), 10000)
+        self.assertTrue(self.order_manager.delete_order_by_id('S1'))
+        self.assertEqual(self.product_manager.get_product_by_id('001').stock_quantity, 10000 - held_units())
+
+    def test_concurrent_customer_upserts(self):
+        """Test that every customer created from several threads is kept."""
+        def create(writer):
+            for number in range(50):
+                self.customer_manager.create_customer(
+                    'John', 'Doe', '1990-01-01', f'{writer}-{number}@example.com', '1234567890',
+                    'USA', 'New York', '10001', '2023-01-01', '2023-01-01')
+
+        threads = [threading.Thread(target=create, args=(writer,)) for writer in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.customer_manager.get_all_customers()), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
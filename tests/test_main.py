@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from authentication.authentication import AuthenticationService
+from controllers.locks import ReadWriteLock
+from data.data import EnterpriseData
+from data.storage import StorageBackend
+from main import IPCMSApp
+
+
+class TestIPCMSApp(unittest.TestCase):
+
+    def test_dataset_is_built_once(self):
+        """Test that every component shares one IPCMSData instead of rebuilding it."""
+        with patch.object(EnterpriseData, 'load_customers', autospec=True,
+                          side_effect=EnterpriseData.load_customers) as mock_load:
+            app = IPCMSApp(for_test_mode=True)
+            # The customer objects are built on first use, once
+            self.assertIs(app.enterprise_data.customers, app.IPCMS_data.enterprise_data.customers)
+        self.assertEqual(mock_load.call_count, 1)
+        self.assertIs(app.read_ops.transformer.IPCMS_data, app.IPCMS_data)
+        self.assertIs(app.create_ops.transformer.IPCMS_data, app.IPCMS_data)
+        self.assertIs(app.create_ops.read_ops, app.read_ops)
+        self.assertIs(app.import_ops.transform_data_method.IPCMS_data, app.IPCMS_data)
+
+    def test_load_data(self):
+        """Test that the seed data is loaded into the controllers."""
+        app = IPCMSApp(for_test_mode=True)
+        self.assertEqual(len(app.customer_manager.get_all_customers()), 20)
+        self.assertEqual(len(app.product_manager.get_all_products()), 8)
+        self.assertEqual(len(app.order_manager.get_all_orders()), 30)
+
+    def test_seeding_takes_the_storage_lock_last(self):
+        """Test that seeding locks the controllers before the storage, in the lock order of every write."""
+        events = []
+        acquire_write, batch = ReadWriteLock.acquire_write, StorageBackend.batch
+
+        def locking(lock):
+            events.append('controller')
+            acquire_write(lock)
+
+        def batching(storage):
+            events.append('storage')
+            return batch(storage)
+
+        with patch.object(ReadWriteLock, 'acquire_write', locking), patch.object(StorageBackend, 'batch', batching):
+            IPCMSApp(for_test_mode=True)
+        self.assertEqual(events[:4], ['controller', 'controller', 'controller', 'storage'])
+
+    @patch('main.welcome_message')
+    @patch.object(AuthenticationService, 'login_system', return_value=False)
+    def test_storage_closed_on_exit(self, mock_login, mock_welcome):
+        """Test that leaving the app closes the storage, flushing the last logged changes."""
+        with tempfile.TemporaryDirectory() as temp_dir, self.assertLogs(level='ERROR'):
+            app = IPCMSApp(wal_path=os.path.join(temp_dir, 'ipcms.wal'))
+        self.assertTrue(app.storage.log_file.closed)
+        self.assertTrue(app.storage.stopped.is_set())
+
+
+class TestStartupTime(unittest.TestCase):
+    # Cold start budget in microseconds (about 80ms here, importing matplotlib alone takes over 300ms)
+    IMPORT_BUDGET = 250000
+    HEAVY_MODULES = ('numpy', 'matplotlib', 'docx')
+
+    def test_import_time_budget(self):
+        """Test that starting the app imports none of the heavy libraries and stays within the time budget."""
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'from main import IPCMSApp; IPCMSApp(for_test_mode=True)'],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        # Lines read "import time: self [us] | cumulative [us] | module", nested imports indented under it
+        imports = [line.split('|') for line in result.stderr.splitlines() if line.startswith('import time:')]
+        imports = [(int(cumulative), module) for _, cumulative, module in imports[1:]]
+        modules = {module.strip() for _, module in imports}
+        for name in self.HEAVY_MODULES:
+            self.assertNotIn(name, modules)
+        total = sum(cumulative for cumulative, module in imports if not module.startswith('  '))
+        self.assertLess(total, self.IMPORT_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,8 @@
+import pickle
 import unittest
+from copy import copy
 from unittest.mock import patch
+from data.loader import load_dataset
 from models.models import Customer, Product, OrderedProduct, Order
 from utils.validators import CheckValidator
 
@@ -88,6 +91,76 @@ class TestModels(unittest.TestCase):
         self.assertEqual(ordered_product.product_name, 'Laptop')
         self.assertEqual(ordered_product.total_price, 3001.98)
 
+    def test_models_are_slotted(self):
+        """Test that models carry no per-instance __dict__ and export via to_dict()."""
+        ordered_product = OrderedProduct('001', 'Laptop', 2, 1500.99, 3001.98)
+        order = Order('PO0001', '01-01-2023', 'Pending', 3001.98, [ordered_product],
+                      'Credit Card', '2023-01-01 00:00:00', '2023-01-02 00:00:00', 'john.doe@example.com')
+        for obj in (ordered_product, order):
+            self.assertFalse(hasattr(obj, '__dict__'))
+            with self.assertRaises(AttributeError):
+                obj.unknown_field = 1
+
+        order_dict = order.to_dict()
+        self.assertEqual(order_dict['order_id'], 'PO0001')
+        self.assertEqual(order_dict['order_products'], [ordered_product.to_dict()])
+        # Exporting must not replace the order's OrderedProduct objects
+        self.assertIs(order.order_products[0], ordered_product)
+        rebuilt = Order(**order_dict)
+        self.assertEqual(rebuilt.to_dict(), order_dict)
+
+    def test_categorical_fields(self):
+        """Test that categorical fields read as strings, are stored once and pickle/copy by value."""
+        customers = [
+            Customer('John', 'Doe', '1990-01-01', f'{number}@example.com', '1234567890', 'Australia',
+                     ''.join(['Mel', 'bourne']), '3000', '2023-01-01 00:00:00', '2023-01-01 00:00:00')
+            for number in range(3)
+        ]
+        self.assertEqual(customers[0].city, 'Melbourne')
+        self.assertIs(customers[0].city, customers[2].city)
+        self.assertEqual(Customer.city.count(customers), {'Melbourne': 3})
+
+        restored = pickle.loads(pickle.dumps(customers[0]))
+        self.assertEqual(restored.to_dict(), customers[0].to_dict())
+        self.assertIn(b'Melbourne', pickle.dumps(customers[0]))
+        changed = copy(customers[0])
+        changed.city = 'Sydney'
+        self.assertEqual(customers[0].city, 'Melbourne')
+        self.assertEqual(Customer.city.count(customers + [changed]), {'Melbourne': 3, 'Sydney': 1})
+
+    def test_rows(self):
+        """Test that models rebuild from their rows and that order records convert to the same rows."""
+        order_data = {
+            "order_id": "PO0001", "order_date": "01-01-2023", "order_status": "Pending", "total_price": "3001.98",
+            "order_products": [{"product_id": 1, "quantity": "2", "price_per_unit": "1500.99"}],
+            "payment_method": "Credit Card", "created_at": "2023-01-01 00:00:00",
+            "updated_at": "2023-01-02 00:00:00", "customer_email": "john.doe@example.com",
+        }
+        order = Order(**order_data)
+        row = Order.row_from_record(order_data)
+        self.assertEqual(row, order.to_row())
+        self.assertEqual(Order.from_row(row).to_dict(), order.to_dict())
+        product = Product('001', 'Laptop', 1500.99, 'Electronics', 5, '2023-01-01', '2023-01-01')
+        self.assertEqual(Product.from_row(product.to_row()).to_dict(), product.to_dict())
+
+        with self.assertRaises(TypeError):
+            Order.row_from_record(dict(order_data, extra=1))
+        with self.assertRaises(ValueError):
+            Order.row_from_record(dict(order_data, total_price='abc'))
+
+    def test_from_records(self):
+        """Test that models built column by column from records and rows equal the ones the constructors build."""
+        orders = load_dataset('orders')[:5]
+        products = load_dataset('products')
+        built = Order.from_records(orders)
+        self.assertEqual([order.to_dict() for order in built], [Order(**data).to_dict() for data in orders])
+        self.assertEqual([order.to_dict() for order in Order.from_rows([order.to_row() for order in built])],
+                         [order.to_dict() for order in built])
+        self.assertEqual([product.to_dict() for product in Product.from_records(products)],
+                         [Product(**data).to_dict() for data in products])
+        self.assertIsInstance(Product.from_records(products)[0].price, float)
+        self.assertEqual(Customer.from_records([]), [])
+
 
 if __name__ == '__main__':
     unittest.main()
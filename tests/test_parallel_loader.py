@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from controllers.controllers import CustomerController, ProductController, OrderController
+from data.data import IPCMSData
+from data.loader import SEED_DIR, dataset_path, load_dataset
+from data.parallel_loader import ParallelLoader
+
+
+class TestParallelLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.temp_dir.name, 'datasets')
+        shutil.copytree(SEED_DIR, self.data_dir)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def load(self, parallel, chunk_size=ParallelLoader.CHUNK_SIZE):
+        product_manager = ProductController()
+        order_manager = OrderController(product_manager)
+        customer_manager = CustomerController(order_manager)
+        loader = ParallelLoader(customer_manager, product_manager, order_manager, self.data_dir)
+        loader.CHUNK_SIZE = chunk_size
+        loader.load(parallel=parallel)
+        return customer_manager, product_manager, order_manager
+
+    def state(self, managers):
+        customer_manager, product_manager, order_manager = managers
+        return ([customer.to_dict() for customer in customer_manager.get_all_customers()],
+                [product.to_dict() for product in product_manager.get_all_products()],
+                [order.to_dict() for order in order_manager.get_all_orders()],
+                order_manager.get_units_sold_by_product())
+
+    def test_same_as_in_process(self):
+        """Test that loading in worker processes gives the same controllers as loading in this process."""
+        sequential = self.state(self.load(parallel=False))
+        self.assertEqual(len(sequential[0]), 20)
+        self.assertEqual(self.state(self.load(parallel=True)), sequential)
+
+    def test_chunks_merge_like_one_batch(self):
+        """Test that repeated keys across chunks and rejected records count as in one bulk insert."""
+        customers = load_dataset('customers', self.data_dir) + [dict(load_dataset('customers')[0], city='Sydney')]
+        orders = load_dataset('orders', self.data_dir) + [
+            dict(load_dataset('orders')[0], total_price='abc'),
+            dict(load_dataset('orders')[1], order_products=[{'product_id': '999', 'quantity': 1,
+                                                             'price_per_unit': 1.0}])]
+        for name, records in (('customers', customers), ('orders', orders)):
+            with open(dataset_path(name, self.data_dir), 'w') as file:
+                json.dump(records, file)
+
+        with self.assertLogs(level='INFO') as sequential_logs:
+            sequential = self.state(self.load(parallel=False))
+        with self.assertLogs(level='INFO') as parallel_logs:
+            parallel = self.state(self.load(parallel=True, chunk_size=7))
+        self.assertEqual(parallel, sequential)
+        self.assertEqual(len(parallel[0]), 20)
+        self.assertEqual(parallel[0][0]['city'], 'Sydney')
+        summaries = [message for message in sequential_logs.output if 'inserted' in message]
+        self.assertEqual(summaries, [message for message in parallel_logs.output if 'inserted' in message])
+        self.assertIn('INFO:root:Customers: 20 inserted, 1 updated, 0 rejected.', summaries)
+        self.assertIn('INFO:root:Orders: 30 inserted, 0 updated, 2 rejected.', summaries)
+
+    def test_trusted_adoption(self):
+        """Test that trusted datasets are adopted as EnterpriseData built them, like validated loading."""
+        product_manager = ProductController()
+        order_manager = OrderController(product_manager)
+        customer_manager = CustomerController(order_manager)
+        enterprise_data = IPCMSData(data_dir=self.data_dir, trusted=True).enterprise_data
+        ParallelLoader(customer_manager, product_manager, order_manager, self.data_dir).adopt(enterprise_data)
+        self.assertEqual(self.state((customer_manager, product_manager, order_manager)),
+                         self.state(self.load(parallel=False)))
+        self.assertIs(customer_manager.get_all_customers()[0], enterprise_data.customers[0])
+        self.assertIs(order_manager.get_all_orders()[-1], enterprise_data.orders[-1])
+
+    def test_worker_error(self):
+        """Test that an error in a worker process is raised by the loader."""
+        os.remove(dataset_path('orders', self.data_dir))
+        with self.assertRaises(FileNotFoundError):
+            self.load(parallel=True)
+
+    def test_small_datasets_stay_in_process(self):
+        """Test that the seed datasets are too small for worker processes."""
+        loader = ParallelLoader(None, None, None, self.data_dir)
+        self.assertFalse(loader.use_workers())
+        loader.PARALLEL_MIN_BYTES = 0
+        self.assertEqual(loader.use_workers(), loader.cpu_count() > 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from controllers.controllers import CustomerController
+from operations.read import ReadOperations
+
+
+class TestReadOperations(unittest.TestCase):
+
+    def setUp(self):
+        self.customer_manager = CustomerController(MagicMock())
+        for number in range(1, 46):
+            self.customer_manager.create_customer(
+                'John', 'Doe', '1990-01-01', f'{number}@example.com', '1234567890',
+                'Australia', 'Melbourne', '3000', '2023-01-01 00:00:00', '2023-01-01 00:00:00')
+        erp_data = MagicMock()
+        erp_data.col_widths = {'customers': {}}
+        erp_data.custom_headers = {'customers': ['No.', 'first_name', 'email']}
+        self.read_ops = ReadOperations(self.customer_manager, MagicMock(), MagicMock(), erp_data)
+
+    @patch('builtins.print')
+    @patch('builtins.input', side_effect=['', 'n', 'n', '1', 'p', '25'])
+    def test_display_customers_pages(self, mock_input, mock_print):
+        """Test that an empty search shows all customers one page at a time, numbered across pages."""
+        selected = self.read_ops.display_customers()
+        self.assertEqual(selected.email, '25@example.com')
+        printed = [call.args[0] for call in mock_print.call_args_list if call.args]
+        self.assertFalse(any('21@example.com' in line for line in printed[:22]))
+        self.assertTrue(any(line.startswith('41') and '41@example.com' in line for line in printed))
+
+    @patch('builtins.print')
+    @patch('builtins.input', side_effect=['', 'b', 'b'])
+    def test_display_customers_go_back(self, mock_input, mock_print):
+        """Test that going back from the table returns to the search, and from the search selects nothing."""
+        self.assertIsNone(self.read_ops.display_customers())
+        self.assertNotIn("'p'", mock_input.call_args_list[1].args[0])
+
+    @patch('builtins.print')
+    @patch('builtins.input', side_effect=['zoe', 'jane sm', '2'])
+    def test_display_customers_search(self, mock_input, mock_print):
+        """Test that a search lists only the matching customers to pick from."""
+        for first_name, last_name, email in (('Jane', 'Smith', 'js@example.com'), ('Jane', 'Doe', 'jd@example.com'),
+                                             ('Janet', 'Smithers', 'jsm@example.com')):
+            self.customer_manager.create_customer(
+                first_name, last_name, '1990-01-01', email, '1234567890',
+                'Australia', 'Melbourne', '3000', '2023-01-01 00:00:00', '2023-01-01 00:00:00')
+        with self.assertLogs(level='ERROR'):
+            selected = self.read_ops.display_customers()
+        self.assertEqual(selected.email, 'jsm@example.com')
+        printed = [call.args[0] for call in mock_print.call_args_list if call.args]
+        self.assertFalse(any('jd@example.com' in line for line in printed))
+        self.assertFalse(any('1@example.com' in line for line in printed))
+
+
+if __name__ == '__main__':
+    unittest.main()
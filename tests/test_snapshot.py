@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from controllers.controllers import CustomerController, ProductController, OrderController
+from data.data import IPCMSData
+from data.snapshot import Snapshot
+from main import IPCMSApp
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.temp_dir.name, 'ipcms.snapshot')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Test that a saved snapshot restores the same controller state."""
+        app = IPCMSApp(for_test_mode=True)
+        app.IPCMS_data.payslip_table.append({"ID": 1, "EmployeeID": 100000, "Full Name": "Admin User"})
+        app.IPCMS_data.currency_conversion_table[0]["Rate to AUD"] = 1.5
+        snapshot = Snapshot(self.snapshot_path)
+        snapshot.save(app.customer_manager, app.product_manager, app.order_manager, app.IPCMS_data)
+
+        product_manager = ProductController()
+        order_manager = OrderController(product_manager)
+        customer_manager = CustomerController(order_manager)
+        ipcms_data = IPCMSData()
+        snapshot.load(customer_manager, product_manager, order_manager, ipcms_data)
+
+        self.assertEqual([c.to_dict() for c in customer_manager.get_all_customers()],
+                         [c.to_dict() for c in app.customer_manager.get_all_customers()])
+        self.assertEqual([p.to_dict() for p in product_manager.get_all_products()],
+                         [p.to_dict() for p in app.product_manager.get_all_products()])
+        self.assertEqual([o.to_dict() for o in order_manager.get_all_orders()],
+                         [o.to_dict() for o in app.order_manager.get_all_orders()])
+        self.assertEqual(order_manager.get_units_sold_by_product_name(),
+                         app.order_manager.get_units_sold_by_product_name())
+        self.assertEqual(len(order_manager.get_orders_by_product_id('002')),
+                         len(app.order_manager.get_orders_by_product_id('002')))
+        self.assertEqual(ipcms_data.payslip_table, app.IPCMS_data.payslip_table)
+        self.assertEqual(ipcms_data.currency_conversion_table[0]["Rate to AUD"], 1.5)
+
+    def test_app_warm_start(self):
+        """Test that the app writes a snapshot on first start and restores it on the next one."""
+        IPCMSApp(for_test_mode=True, snapshot_path=self.snapshot_path)
+        self.assertTrue(os.path.exists(self.snapshot_path))
+        app = IPCMSApp(for_test_mode=True, snapshot_path=self.snapshot_path)
+        self.assertEqual(len(app.customer_manager.get_all_customers()), 20)
+        self.assertEqual(len(app.order_manager.get_all_orders()), 30)
+
+    @patch('builtins.input', return_value='y')
+    def test_database_wins_over_snapshot(self, mock_input):
+        """Test that with a database the changes made after the snapshot are still there after a restart."""
+        db_path = os.path.join(self.temp_dir.name, 'ipcms.db')
+        app = IPCMSApp(for_test_mode=True, db_path=db_path, snapshot_path=self.snapshot_path)
+        self.assertTrue(os.path.exists(self.snapshot_path))
+        email = app.customer_manager.get_all_customers()[0].email
+        app.customer_manager.delete_customer(email)
+        self.assertEqual(len(app.customer_manager.get_all_customers()), 19)
+        app.storage.close()
+
+        app = IPCMSApp(for_test_mode=True, db_path=db_path, snapshot_path=self.snapshot_path)
+        self.assertEqual(len(app.customer_manager.get_all_customers()), 19)
+        self.assertIsNone(app.customer_manager.get_customer_by_email(email))
+        self.assertEqual(len(app.storage.load_customers()), 19)
+        app.storage.close()
+
+    def test_rejects_other_files(self):
+        """Test that a file without the snapshot header is refused."""
+        with open(self.snapshot_path, 'wb') as other_file:
+            other_file.write(b'not a snapshot at all')
+        with self.assertRaises(ValueError):
+            Snapshot(self.snapshot_path).load(None, None, None, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
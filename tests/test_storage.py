@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from controllers.controllers import CustomerController, ProductController, OrderController
+from data.data import IPCMSData
+from data.storage import SQLiteStorage
+from operations.create import CreateOperations
+
+
+class TestSQLiteStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'ipcms.db')
+        self.storage = SQLiteStorage(self.db_path)
+        self.managers = self.make_managers(self.storage)
+
+    def tearDown(self):
+        self.storage.close()
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def make_managers(storage):
+        product_manager = ProductController(storage)
+        order_manager = OrderController(product_manager, storage)
+        customer_manager = CustomerController(order_manager, storage)
+        return customer_manager, product_manager, order_manager
+
+    def reopen(self):
+        self.storage.close()
+        self.storage = SQLiteStorage(self.db_path)
+        customer_manager, product_manager, order_manager = self.make_managers(self.storage)
+        product_manager.load_from_storage()
+        order_manager.load_from_storage()
+        customer_manager.load_from_storage()
+        return customer_manager, product_manager, order_manager
+
+    def seed(self):
+        customer_manager, product_manager, order_manager = self.managers
+        with self.storage.batch():
+            for email in ('a@example.com', 'b@example.com'):
+                customer_manager.create_customer(
+                    'John', 'Doe', '1990-01-01', email, '0412-345-678',
+                    'Australia', 'Melbourne', '3000', '2023-01-01 00:00:00', '2023-01-01 00:00:00')
+            product_manager.create_product('001', 'EMO Robot', 311.98, 'Personal', 10,
+                                           '2024-01-10 09:15:23', '2024-09-01 12:45:56')
+            product_manager.create_product('002', 'Moxie Robot', 1246.44, 'Educational', 5,
+                                           '2024-01-10 09:15:23', '2024-09-01 12:45:56')
+            for order_id, email in (('PO1', 'a@example.com'), ('PO2', 'b@example.com')):
+                order_manager.create_order(
+                    order_id, '21-08-2024', 1558.42,
+                    [{'product_id': '001', 'product_name': 'EMO Robot', 'quantity': 1, 'price_per_unit': 311.98},
+                     {'product_id': '002', 'product_name': 'Moxie Robot', 'quantity': 1,
+                      'price_per_unit': 1246.44}],
+                    'Credit Card', 'Shipped', '2024-08-21 09:00:00', '2024-09-01 12:00:00', email)
+
+    def test_data_persists_across_restarts(self):
+        """Test that created records are loaded back, in insertion order, after reopening."""
+        self.assertTrue(self.storage.is_empty())
+        self.seed()
+        self.assertFalse(self.storage.is_empty())
+        customer_manager, product_manager, order_manager = self.reopen()
+        self.assertEqual([c.email for c in customer_manager.get_all_customers()],
+                         ['a@example.com', 'b@example.com'])
+        self.assertEqual(product_manager.get_product_by_id('002').price, 1246.44)
+        order = order_manager.get_order_by_id('PO1')
+        self.assertEqual([op.product_id for op in order.order_products], ['001', '002'])
+        self.assertEqual(order.order_products[1].total_price, 1246.44)
+        self.assertEqual([o.order_id for o in order_manager.get_orders_by_product_id('001')], ['PO1', 'PO2'])
+
+    def test_updates_persist(self):
+        """Test that upserts are written through to the database."""
+        self.seed()
+        customer_manager, product_manager, order_manager = self.managers
+        customer_manager.create_customer(
+            'Jane', 'Doe', '1990-01-01', 'a@example.com', '0412-345-678',
+            'Australia', 'Sydney', '2000', '2023-01-01 00:00:00', '2023-01-01 00:00:00')
+        product_manager.create_product('001', 'EMO Robot (Lite)', 300.0, 'Personal', 7,
+                                       '2024-01-10 09:15:23', '2024-09-01 12:45:56')
+        order_manager.create_order(
+            'PO1', '22-08-2024', 300.0,
+            [{'product_id': '001', 'product_name': 'EMO Robot (Lite)', 'quantity': 1, 'price_per_unit': 300.0}],
+            'Cash', 'Delivered', '2024-08-21 09:00:00', '2024-09-01 12:00:00', 'a@example.com')
+        customer_manager, product_manager, order_manager = self.reopen()
+        self.assertEqual(customer_manager.get_customer_by_email('a@example.com').city, 'Sydney')
+        self.assertEqual(product_manager.get_product_by_id('001').stock_quantity, 7)
+        order = order_manager.get_order_by_id('PO1')
+        self.assertEqual(order.order_status, 'Delivered')
+        self.assertEqual(len(order.order_products), 1)
+        self.assertEqual([o.order_id for o in order_manager.get_all_orders()], ['PO1', 'PO2'])
+
+    @patch('builtins.input', side_effect=['y'])
+    def test_delete_customer_cascades(self, mock_input):
+        """Test that deleting a customer removes them and their orders from the database."""
+        self.seed()
+        self.managers[0].delete_customer('a@example.com')
+        customer_manager, product_manager, order_manager = self.reopen()
+        self.assertIsNone(customer_manager.get_customer_by_email('a@example.com'))
+        self.assertEqual([o.order_id for o in order_manager.get_all_orders()], ['PO2'])
+        count = self.storage.connection.execute("SELECT COUNT(*) FROM order_lines").fetchone()[0]
+        self.assertEqual(count, 2)
+
+    def test_batch_rolls_back_on_error(self):
+        """Test that a failing batch leaves the database untouched."""
+        with self.assertRaises(RuntimeError):
+            with self.storage.batch():
+                self.managers[1].create_product('001', 'EMO Robot', 311.98, 'Personal', 10,
+                                                '2024-01-10 09:15:23', '2024-09-01 12:45:56')
+                raise RuntimeError("boom")
+        self.assertTrue(self.storage.is_empty())
+
+    def test_payslips_persist(self):
+        """Test that payslips round-trip through the database."""
+        payslip = {"ID": 1, "EmployeeID": 100000, "Full Name": "Admin User", "Department": "Administration",
+                   "Title": "Administrator"}
+        self.storage.save_payslip(payslip)
+        self.storage.close()
+        self.storage = SQLiteStorage(self.db_path)
+        self.assertEqual(self.storage.load_payslips(), [payslip])
+        self.storage.delete_payslip(1)
+        self.assertEqual(self.storage.load_payslips(), [])
+
+    @patch('builtins.print')
+    def test_payslip_replaced_after_restart(self, mock_print):
+        """Test that a new payslip for an employee replaces the persisted one, also after a restart."""
+        old_payslip = {"ID": 140234567890, "EmployeeID": 100001, "Full Name": "John Doe"}
+        self.storage.save_payslip(old_payslip)
+        for _ in range(2):
+            self.storage.close()
+            self.storage = SQLiteStorage(self.db_path)
+            ipcms_data = IPCMSData(self.storage)
+            create_ops = CreateOperations(*self.make_managers(self.storage), ipcms_data, None)
+            with patch('builtins.input', return_value='100001'):
+                create_ops.create_payslip()
+        payslips = self.storage.load_payslips()
+        self.assertEqual([(payslip["ID"], payslip["EmployeeID"]) for payslip in payslips], [(100001, 100001)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import patch
 from utils.transformers import DataTransformer
+from data.data import IPCMSData
 
 
 class TestDataTransformer(unittest.TestCase):
@@ -74,6 +75,16 @@ class TestDataTransformer(unittest.TestCase):
         self.assertEqual(converted_str, "45000.0")
         self.assertEqual(curr_code, "INR")
 
+    def test_shared_data_context(self):
+        """Test that a passed-in IPCMSData is used and edits to it are seen live."""
+        ipcms_data = IPCMSData()
+        transformer = DataTransformer(ipcms_data)
+        self.assertIs(transformer.IPCMS_data, ipcms_data)
+        for each_data in ipcms_data.currency_conversion_table:
+            if each_data["Curr Code"] == "INR":
+                each_data["Rate to AUD"] = 50.0
+        self.assertEqual(transformer.currency_conversion(1000, "India"), (50000.0, "INR"))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,180 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from controllers.controllers import CustomerController, ProductController, OrderController
+from data.data import IPCMSData
+from data.snapshot import Snapshot
+from data.wal import WriteAheadLog
+from main import IPCMSApp
+
+
+class TestWriteAheadLog(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.wal_path = os.path.join(self.temp_dir.name, 'ipcms.wal')
+        self.wal = WriteAheadLog(self.wal_path)
+
+    def tearDown(self):
+        self.wal.close()
+        self.temp_dir.cleanup()
+
+    def managers(self, storage=None):
+        product_manager = ProductController(storage)
+        order_manager = OrderController(product_manager, storage)
+        customer_manager = CustomerController(order_manager, storage)
+        return customer_manager, product_manager, order_manager
+
+    def replay(self):
+        self.wal.close()
+        self.wal = WriteAheadLog(self.wal_path)
+        customer_manager, product_manager, order_manager = self.managers(self.wal)
+        ipcms_data = IPCMSData()
+        self.wal.replay(customer_manager, product_manager, order_manager, ipcms_data)
+        return customer_manager, product_manager, order_manager, ipcms_data
+
+    def seed(self):
+        customer_manager, product_manager, order_manager = self.managers(self.wal)
+        customer_manager.create_customer(
+            'John', 'Doe', '1990-01-01', 'a@example.com', '0412-345-678',
+            'Australia', 'Melbourne', '3000', '2023-01-01 00:00:00', '2023-01-01 00:00:00')
+        product_manager.create_product('001', 'EMO Robot', 311.98, 'Personal', 10,
+                                       '2024-01-10 09:15:23', '2024-09-01 12:45:56')
+        order_manager.create_order(
+            'PO1', '22-08-2024', 311.98,
+            [{'product_id': '001', 'product_name': 'EMO Robot', 'quantity': 1, 'price_per_unit': 311.98}],
+            'Credit Card', 'Pending', '2024-08-21 09:00:00', '2024-08-21 09:00:00', 'a@example.com')
+        order_manager.create_order(
+            'PO2', '23-08-2024', 623.96,
+            [{'product_id': '001', 'product_name': 'EMO Robot', 'quantity': 2, 'price_per_unit': 311.98}],
+            'Cash', 'Pending', '2024-08-22 09:00:00', '2024-08-22 09:00:00', 'b@example.com')
+        return customer_manager, product_manager, order_manager
+
+    @patch('builtins.input', side_effect=['y'])
+    def test_replay_restores_every_mutation(self, mock_input):
+        """Test that creates, updates and deletes are replayed in order."""
+        customer_manager, product_manager, order_manager = self.seed()
+        product = product_manager.get_product_by_id('001')
+        product.stock_quantity = 4
+        product_manager.update_product_by_id(product)
+        order_manager.delete_order_by_id('PO2')
+        customer_manager.delete_customer('a@example.com')
+        self.wal.save_payslip({"ID": 1, "EmployeeID": 100000})
+
+        # The deleted orders gave their 3 units back, replaying the deletes does not give them back again
+        self.assertEqual(product_manager.get_product_by_id('001').stock_quantity, 7)
+        customer_manager, product_manager, order_manager, ipcms_data = self.replay()
+        self.assertEqual(customer_manager.get_all_customers(), [])
+        self.assertEqual(product_manager.get_product_by_id('001').stock_quantity, 7)
+        self.assertEqual(order_manager.get_all_orders(), [])
+        self.assertEqual(ipcms_data.payslip_table, [{"ID": 1, "EmployeeID": 100000}])
+
+    def test_replay_is_not_logged_again(self):
+        """Test that replaying the log does not append to it."""
+        self.seed()
+        self.wal.sync()
+        size = os.path.getsize(self.wal_path)
+        self.replay()
+        self.assertEqual(self.wal.size(), size)
+
+    def test_torn_tail_is_dropped(self):
+        """Test that a half-written last record is ignored and cut off."""
+        self.seed()
+        self.wal.sync()
+        size = os.path.getsize(self.wal_path)
+        with open(self.wal_path, 'ab') as log_file:
+            log_file.write(b'\x40\x00\x00\x00\x00')
+        with self.assertLogs(level='WARNING'):
+            customer_manager, product_manager, order_manager, ipcms_data = self.replay()
+        self.assertEqual([o.order_id for o in order_manager.get_all_orders()], ['PO1', 'PO2'])
+        self.assertEqual(os.path.getsize(self.wal_path), size)
+
+    def test_checkpoint_truncates_the_log(self):
+        """Test that a checkpoint writes the snapshot and drops the records it covers."""
+        self.seed()
+        written = []
+        self.wal.checkpoint(lambda: written.append(True))
+        self.assertEqual(written, [True])
+        self.assertTrue(self.wal.is_empty())
+        self.assertFalse(os.path.exists(self.wal.compacting_path))
+
+    def test_failed_checkpoint_keeps_the_records(self):
+        """Test that records stay replayable when writing the snapshot fails."""
+        self.seed()
+
+        def fail():
+            raise OSError("disk full")
+
+        with self.assertRaises(OSError):
+            self.wal.checkpoint(fail)
+        customer_manager, product_manager, order_manager, ipcms_data = self.replay()
+        self.assertEqual(len(order_manager.get_all_orders()), 2)
+
+    def test_background_compaction(self):
+        """Test that the log compacts itself once it passes the size limit."""
+        self.wal.compact_bytes = 1
+        written = []
+        self.wal.snapshot_writer = lambda: written.append(True)
+        self.seed()
+        self.wal.compaction.join()
+        self.assertTrue(written)
+
+    def test_concurrent_checkpoints_keep_every_record(self):
+        """Test that a checkpoint started during a background compaction waits for it, losing no record."""
+        snapshot = Snapshot(os.path.join(self.temp_dir.name, 'ipcms.snapshot'))
+        customer_manager, product_manager, order_manager = self.seed()
+        state = (customer_manager, product_manager, order_manager, IPCMSData())
+        taken, release = threading.Event(), threading.Event()
+
+        def slow_writer():
+            # Takes the state now but only puts the snapshot in place once released
+            stale = Snapshot(f"{snapshot.path}.stale")
+            stale.save(*state)
+            taken.set()
+            release.wait()
+            os.replace(stale.path, snapshot.path)
+
+        self.wal.snapshot_writer = slow_writer
+        self.wal.compact_in_background()
+        taken.wait()
+        product_manager.create_product('002', 'Moxie Robot', 99.0, 'Educational', 5,
+                                       '2024-01-10 09:15:23', '2024-09-01 12:45:56')
+        checkpoint = threading.Thread(target=self.wal.checkpoint, args=(lambda: snapshot.save(*state),))
+        checkpoint.start()
+        checkpoint.join(0.2)
+        release.set()
+        checkpoint.join()
+        self.wal.compaction.join()
+        product_manager.create_product('003', 'Aibo Robot', 199.0, 'Pet', 2,
+                                       '2024-01-10 09:15:23', '2024-09-01 12:45:56')
+
+        self.wal.close()
+        self.wal = WriteAheadLog(self.wal_path)
+        customer_manager, product_manager, order_manager = self.managers(self.wal)
+        ipcms_data = IPCMSData()
+        snapshot.load(customer_manager, product_manager, order_manager, ipcms_data)
+        self.wal.replay(customer_manager, product_manager, order_manager, ipcms_data)
+        self.assertEqual(sorted(p.product_id for p in product_manager.get_all_products()), ['001', '002', '003'])
+        self.assertEqual([o.order_id for o in order_manager.get_all_orders()], ['PO1', 'PO2'])
+        # No snapshot temp file or compacting log is left behind
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ['ipcms.snapshot', 'ipcms.wal'])
+
+    def test_app_replays_on_top_of_snapshot(self):
+        """Test that the app restores its snapshot and the changes logged after it."""
+        self.wal.close()
+        app = IPCMSApp(for_test_mode=True, wal_path=self.wal_path)
+        self.assertTrue(os.path.exists(f"{self.wal_path}.snapshot"))
+        app.product_manager.create_product('009', 'New Robot', 10.0, 'Personal', 3,
+                                           '2024-01-10 09:15:23', '2024-09-01 12:45:56')
+        app.storage.close()
+
+        app = IPCMSApp(for_test_mode=True, wal_path=self.wal_path)
+        self.assertEqual(app.product_manager.get_product_by_id('009').product_name, 'New Robot')
+        self.assertEqual(len(app.order_manager.get_all_orders()), 30)
+        self.wal = app.storage
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,8 +7,16 @@ import logging
 
 # Class:: Group all transform functions
 class DataTransformer:
-    def __init__(self):
-        self.IPCMS_data = IPCMSData()
+    def __init__(self, ipcms_data=None):
+        # Share the application's IPCMSData, only build a private one if used standalone
+        self._ipcms_data = ipcms_data
+
+    # Read: the shared data context, created on first use when none was passed in
+    @property
+    def IPCMS_data(self):
+        if self._ipcms_data is None:
+            self._ipcms_data = IPCMSData()
+        return self._ipcms_data
 
     # Transfer: Pad the string to match the target width
     @staticmethod
@@ -97,3 +105,22 @@ class DataTransformer:
         converted_salary_str = str(round(converted_salary, 2))
 
         return tax_str, superannuation_str, net_salary_str, converted_salary_str, currency_code
+
+    # Transfer: an employee's payslip (the salary details calculated and formatted as above)
+    def payslip(self, payslip_id, employee):
+        base_yearly_salary = employee["Base Yearly Salary"]
+        (tax_str, superannuation_str, net_salary_str,
+         converted_salary_str, currency_code) \
+            = self.calculate_and_format_salary(base_yearly_salary, employee["Country"])
+        return {
+            "ID": payslip_id,
+            "EmployeeID": employee["EmployeeID"],
+            "Full Name": self.format_name(employee["Full Name"]),
+            "Department": employee["Department"],
+            "Title": employee["Title"],
+            "Gross Salary (AUD)": base_yearly_salary,
+            "Tax (AUD)": tax_str,
+            "Net Salary (AUD)": net_salary_str,
+            "Superannuation (AUD)": superannuation_str,
+            "Converted Net Yearly Salary": f"{currency_code} {converted_salary_str}"
+        }
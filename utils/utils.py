@@ -1,5 +1,7 @@
 # utils/utils.py
 
+from contextlib import contextmanager
+import gc
 import os
 
 
@@ -17,3 +19,16 @@ def welcome_message():
 # Function: Get sales quantity
 def get_sales_quantity(item):
     return item[1]
+
+
+# Function: Pause the cyclic garbage collector while building many new objects: they leave no garbage to
+# collect, but every burst of allocations would otherwise trigger a pass over all of them
+@contextmanager
+def paused_gc():
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_was_enabled:
+            gc.enable()
@@ -7,6 +7,9 @@ import logging
 
 # Class:: Group all validation functions
 class CheckValidator:
+    # Australian phone number and email address formats
+    PHONE_PATTERN = re.compile(r'^0\d{3}-\d{3}-\d{3}$')
+    EMAIL_PATTERN = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
 
     # Check: is an integer number
     @staticmethod
@@ -82,8 +85,7 @@ class CheckValidator:
         if value is None or value == '':
             logging.error("Input cannot be empty.")
             return False
-        pattern = r'^0\d{3}-\d{3}-\d{3}$'
-        if re.match(pattern, value):
+        if CheckValidator.PHONE_PATTERN.match(value):
             return True
         logging.error(f"'{value}' is not a valid Australian phone number. "
                       f"Suggest format: 0000-000-000")
@@ -95,8 +97,7 @@ class CheckValidator:
         if value is None or value == '':
             logging.error("Input cannot be empty.")
             return False
-        pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-        if re.match(pattern, value):
+        if CheckValidator.EMAIL_PATTERN.match(value):
             return True
         logging.error(f"'{value}' is not a valid email address. "
                       f"Suggest format: user@example.com")